@@ -7,10 +7,16 @@ Subscribers via Supabase / JSON fallback.
 from __future__ import annotations
 
 import asyncio
-import html
+import heapq
 import json
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from functools import lru_cache, wraps
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from telegram import (
     Update,
@@ -44,23 +50,30 @@ from config import (
 
 from telegram.request import HTTPXRequest
 from store import get_store
-from llm import GroqClient, analyze_single
+from llm import GroqClient, analyze_single, close_groq_clients, get_groq_client
 from browser import BrowserManager
+from commands import cmd_collect
 from helpers import format_published_date
-from functools import wraps
+import cache
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # Backend Helper
 # ═══════════════════════════════════════════════════════════════════════════
 
-def _use_supabase() -> bool:
-    return bool(SUPABASE_URL and SUPABASE_SERVICE_KEY)
+_USE_SUPABASE: bool = bool(SUPABASE_URL and SUPABASE_SERVICE_KEY)
+
+
+_db_instance = None
 
 
 def _get_db():
-    from db import SupabaseDB
-    return SupabaseDB()
+    """Shared SupabaseDB client — dibuat sekali, dipakai semua handler."""
+    global _db_instance
+    if _db_instance is None:
+        from db import SupabaseDB
+        _db_instance = SupabaseDB()
+    return _db_instance
 
 # ═══════════════════════════════════════════════════════════════════════════
 # Subscriber Store (Supabase / JSON fallback)
@@ -69,64 +82,100 @@ def _get_db():
 SUBSCRIBERS_FILE = BASE_DIR / "subscribers.json"
 
 
+# Cache isi file JSON: path -> (st_mtime_ns, data). Dibaca ulang hanya kalau file berubah.
+_json_cache: Dict[Path, tuple] = {}
+# Handler jalan di thread pool (asyncio.to_thread), jadi read-modify-write JSON
+# fallback diserialisasi lewat lock ini.
+_json_lock = threading.RLock()
+
+
+def _read_json_cached(path: Path, default: Any) -> Any:
+    with _json_lock:
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            _json_cache.pop(path, None)
+            return default
+
+        cached = _json_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, ValueError):
+            return default
+        _json_cache[path] = (mtime, data)
+        return data
+
+
+def _write_json_cached(path: Path, data: Any) -> None:
+    payload = json.dumps(data, indent=2, ensure_ascii=False)
+    with _json_lock:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        _json_cache[path] = (path.stat().st_mtime_ns, data)
+
+
 def _load_subscribers_json() -> Dict[str, Dict[str, Any]]:
-    if not SUBSCRIBERS_FILE.exists():
-        return {}
-    try:
-        with open(SUBSCRIBERS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, ValueError):
-        return {}
+    return _read_json_cached(SUBSCRIBERS_FILE, {})
 
 
 def _save_subscribers_json(subs: Dict[str, Dict[str, Any]]) -> None:
-    with open(SUBSCRIBERS_FILE, "w", encoding="utf-8") as f:
-        json.dump(subs, f, indent=2, ensure_ascii=False)
+    _write_json_cached(SUBSCRIBERS_FILE, subs)
 
 
 def add_subscriber(chat_id: int, username: str = "", first_name: str = "") -> bool:
     """Tambah/aktifkan subscriber. Return True jika baru."""
-    if _use_supabase():
+    if _USE_SUPABASE:
         try:
             return _get_db().upsert_subscriber(chat_id, username, first_name, active=True)
         except Exception as exc:
             logger.warning("⚠ Supabase subscriber failed: %s", exc)
 
     # JSON fallback
-    subs = _load_subscribers_json()
-    key = str(chat_id)
-    is_new = key not in subs or not subs[key].get("active", True)
-    subs[key] = {
-        "chat_id": chat_id,
-        "username": username,
-        "first_name": first_name,
-        "active": True,
-    }
-    _save_subscribers_json(subs)
+    with _json_lock:
+        subs = _load_subscribers_json()
+        key = str(chat_id)
+        is_new = key not in subs or not subs[key].get("active", True)
+        subs[key] = {
+            "chat_id": chat_id,
+            "username": username,
+            "first_name": first_name,
+            "active": True,
+        }
+        _save_subscribers_json(subs)
     return is_new
 
 
 def remove_subscriber(chat_id: int) -> None:
     """Nonaktifkan subscriber."""
-    if _use_supabase():
+    if _USE_SUPABASE:
         try:
             _get_db().deactivate_subscriber(chat_id)
             return
         except Exception as exc:
             logger.warning("⚠ Supabase subscriber failed: %s", exc)
 
+    with _json_lock:
+        subs = _load_subscribers_json()
+        key = str(chat_id)
+        if key in subs:
+            subs[key]["active"] = False
+            _save_subscribers_json(subs)
+
+
+def _active_subscriber_ids_json() -> List[int]:
     subs = _load_subscribers_json()
-    key = str(chat_id)
-    if key in subs:
-        subs[key]["active"] = False
-        _save_subscribers_json(subs)
+    return [d["chat_id"] for d in subs.values() if d.get("active", True)]
 
 
 def get_active_subscribers() -> List[int]:
     """Daftar chat_id subscriber aktif."""
     active = []
 
-    if _use_supabase():
+    if _USE_SUPABASE:
         try:
             active = _get_db().get_active_subscribers()
         except Exception as exc:
@@ -134,31 +183,28 @@ def get_active_subscribers() -> List[int]:
 
     if not active:
         # JSON fallback
-        subs = _load_subscribers_json()
-        active = [d["chat_id"] for d in subs.values() if d.get("active", True)]
+        active = _active_subscriber_ids_json()
 
-    # Tambah admin dari env
+    # Tambah admin dari env (set sekaligus dedup)
+    active_set = set(active)
     if TELEGRAM_CHAT_ID:
-        admin_id = int(TELEGRAM_CHAT_ID)
-        if admin_id not in active:
-            active.append(admin_id)
+        active_set.add(int(TELEGRAM_CHAT_ID))
 
-    return active
+    return list(active_set)
 
 
 def count_active_subscribers() -> int:
     """Hitung subscriber aktif."""
-    if _use_supabase():
+    if _USE_SUPABASE:
         try:
             return _get_db().count_active_subscribers()
         except Exception:
             pass
 
-    subs = _load_subscribers_json()
-    count = len([s for s in subs.values() if s.get("active", True)])
-    if TELEGRAM_CHAT_ID and str(TELEGRAM_CHAT_ID) not in subs:
-        count += 1
-    return count
+    active_set = set(_active_subscriber_ids_json())
+    if TELEGRAM_CHAT_ID:
+        active_set.add(int(TELEGRAM_CHAT_ID))
+    return len(active_set)
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -167,97 +213,102 @@ def count_active_subscribers() -> int:
 
 
 def load_sources_data() -> List[Dict[str, Any]]:
-    if _use_supabase():
+    if _USE_SUPABASE:
         try:
             return _get_db().get_sources()
         except Exception as exc:
             logger.warning("⚠ Supabase sources failed: %s", exc)
-    if not SOURCES_FILE.exists():
-        return []
-    try:
-        with open(SOURCES_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, ValueError):
-        return []
+    return _read_json_cached(SOURCES_FILE, [])
 
 
 def _save_sources_json(sources: List[Dict[str, Any]]) -> None:
-    with open(SOURCES_FILE, "w", encoding="utf-8") as f:
-        json.dump(sources, f, indent=2, ensure_ascii=False)
+    _write_json_cached(SOURCES_FILE, sources)
+
+
+# Index id -> source untuk JSON fallback, dibangun ulang hanya saat cache file berganti.
+_sources_index: Optional[tuple] = None
+
+
+def _sources_json_index() -> Dict[int, Dict[str, Any]]:
+    global _sources_index
+    with _json_lock:
+        sources = _read_json_cached(SOURCES_FILE, [])
+        entry = _json_cache.get(SOURCES_FILE)
+        if entry is None or _sources_index is None or _sources_index[0] is not entry:
+            _sources_index = (entry, {s.get("id"): s for s in sources})
+        return _sources_index[1]
 
 
 def find_source_by_id_any(source_id: int) -> Optional[Dict[str, Any]]:
-    if _use_supabase():
+    if _USE_SUPABASE:
         try:
             return _get_db().get_source_by_id(source_id)
         except Exception:
             pass
-    for s in load_sources_data():
-        if s.get("id") == source_id:
-            return s
-    return None
+    return _sources_json_index().get(source_id)
 
 
 def add_source_to_store(source: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    if _use_supabase():
+    if _USE_SUPABASE:
         try:
             return _get_db().add_source(source)
         except Exception as exc:
             logger.error("⚠ Supabase add_source failed: %s", exc)
             return None
-    sources = load_sources_data()
-    new_id = max((s.get("id", 0) for s in sources), default=0) + 1
-    source["id"] = new_id
-    sources.append(source)
-    _save_sources_json(sources)
+    with _json_lock:
+        sources = load_sources_data()
+        new_id = max((s.get("id", 0) for s in sources), default=0) + 1
+        source["id"] = new_id
+        sources.append(source)
+        _save_sources_json(sources)
     return source
 
 
 def update_source_in_store(source_id: int, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    if _use_supabase():
+    if _USE_SUPABASE:
         try:
             return _get_db().update_source(source_id, updates)
         except Exception as exc:
             logger.error("⚠ Supabase update_source failed: %s", exc)
             return None
-    sources = load_sources_data()
-    for s in sources:
-        if s.get("id") == source_id:
-            s.update(updates)
-            _save_sources_json(sources)
-            return s
-    return None
+    with _json_lock:
+        s = _sources_json_index().get(source_id)
+        if s is None:
+            return None
+        s.update(updates)
+        _save_sources_json(load_sources_data())
+    return s
 
 
 def toggle_source_in_store(source_id: int) -> Optional[Dict[str, Any]]:
-    if _use_supabase():
+    if _USE_SUPABASE:
         try:
             return _get_db().toggle_source(source_id)
         except Exception as exc:
             logger.error("⚠ Supabase toggle_source failed: %s", exc)
             return None
-    sources = load_sources_data()
-    for s in sources:
-        if s.get("id") == source_id:
-            s["is_active"] = not s.get("is_active", True)
-            _save_sources_json(sources)
-            return s
-    return None
+    with _json_lock:
+        s = _sources_json_index().get(source_id)
+        if s is None:
+            return None
+        s["is_active"] = not s.get("is_active", True)
+        _save_sources_json(load_sources_data())
+    return s
 
 
 def delete_source_from_store(source_id: int) -> bool:
-    if _use_supabase():
+    if _USE_SUPABASE:
         try:
             return _get_db().delete_source(source_id)
         except Exception as exc:
             logger.error("⚠ Supabase delete_source failed: %s", exc)
             return False
-    sources = load_sources_data()
-    new = [s for s in sources if s.get("id") != source_id]
-    if len(new) < len(sources):
+    with _json_lock:
+        if source_id not in _sources_json_index():
+            return False
+        new = [s for s in load_sources_data() if s.get("id") != source_id]
         _save_sources_json(new)
-        return True
-    return False
+    return True
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -281,6 +332,28 @@ CATEGORY_EMOJI = {
     "Disclosure": "📋",
 }
 
+# Keyboard statis untuk wizard /addsource — dibangun sekali saat import
+TYPE_KEYBOARD = InlineKeyboardMarkup(
+    [[InlineKeyboardButton(t, callback_data=f"srctype:{t}")] for t in SOURCE_TYPES]
+)
+CATEGORY_KEYBOARD = InlineKeyboardMarkup(
+    [[InlineKeyboardButton(f"{CATEGORY_EMOJI.get(c, '📁')} {c}", callback_data=f"srccat:{c}")] for c in SOURCE_CATEGORIES]
+)
+
+
+@lru_cache(maxsize=128)
+def _edit_type_keyboard(source_id: int) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        [[InlineKeyboardButton(t, callback_data=f"srcsettype:{source_id}:{t}")] for t in SOURCE_TYPES]
+    )
+
+
+@lru_cache(maxsize=128)
+def _edit_category_keyboard(source_id: int) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        [[InlineKeyboardButton(f"{CATEGORY_EMOJI.get(c, '📁')} {c}", callback_data=f"srcsetcat:{source_id}:{c}")] for c in SOURCE_CATEGORIES]
+    )
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # Helpers
@@ -288,14 +361,21 @@ CATEGORY_EMOJI = {
 
 EMOJI = {"bullish": "🟢", "bearish": "🔴", "neutral": "⚪"}
 PAGE_SIZE = 10
+SEPARATOR = "━" * 25
 
 
 def truncate(text: str, max_len: int = 200) -> str:
     return text if len(text) <= max_len else text[:max_len] + "..."
 
 
+# Sama dengan html.escape(quote=True), tapi satu pass str.translate.
+_HTML_ESCAPE_TABLE = str.maketrans({
+    "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;",
+})
+
+
 def escape(text: str) -> str:
-    return html.escape(str(text)) if text else ""
+    return str(text).translate(_HTML_ESCAPE_TABLE) if text else ""
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -304,12 +384,25 @@ def escape(text: str) -> str:
 
 
 def format_source_card(source: Dict[str, Any]) -> str:
-    sid = source.get("id", "?")
-    name = escape(source.get("name", "?"))
-    feed_url = escape(source.get("feed_url", "?"))
-    stype = escape(source.get("type", "rss"))
-    category = escape(source.get("category", "Market"))
-    is_active = source.get("is_active", True)
+    # Key = semua field yang tampil, jadi edit/toggle otomatis menghasilkan entry baru
+    return _source_card_text(
+        source.get("id", "?"),
+        source.get("name", "?"),
+        source.get("feed_url", "?"),
+        source.get("type", "rss"),
+        source.get("category", "Market"),
+        bool(source.get("is_active", True)),
+    )
+
+
+@lru_cache(maxsize=512)
+def _source_card_text(
+    sid: Any, name: str, feed_url: str, stype: str, category: str, is_active: bool,
+) -> str:
+    name = escape(name)
+    feed_url = escape(feed_url)
+    stype = escape(stype)
+    category = escape(category)
     status_emoji = "✅" if is_active else "❌"
     type_emoji = "📋" if stype == "idx_api" else "📰"
     return (
@@ -323,26 +416,28 @@ def format_source_card(source: Dict[str, Any]) -> str:
 
 def format_news_list(items: List[Dict[str, Any]], offset: int = 0) -> str:
     """Format list berita dalam 1 bubble. Dengan waktu + link."""
-    lines = []
-    for i, item in enumerate(items, start=offset + 1):
-        emoji = EMOJI.get(item.get("sentiment", "neutral"), "❓")
+    sentiment_emoji = EMOJI.get
+    category_emoji = CATEGORY_EMOJI.get
+
+    def _one(i: int, item: Dict[str, Any]) -> str:
+        emoji = sentiment_emoji(item.get("sentiment", "neutral"), "❓")
         status_icon = "✅" if item.get("status") == "analyzed" else "🟡"
         title = escape(item.get("title", "?"))
         news_id = item.get("id", "?")
-        cat_emoji = CATEGORY_EMOJI.get(item.get("category", ""), "📁")
+        cat_emoji = category_emoji(item.get("category", ""), "📁")
         cat = escape(item.get("category", "?"))
         source = escape(item.get("source_name", "?"))
         url = item.get("url", "")
         pub = format_published_date(item.get("published_at", ""))
 
-        lines.append(
+        return (
             f"<b>{i}.</b> {emoji}{status_icon} <b>{title}</b>\n"
             f"     {cat_emoji} {cat} · {source}\n"
             f"     🕐 {pub}\n"
             f"     🔗 <a href='{url}'>Baca</a> · <code>{news_id}</code>"
         )
 
-    return "\n\n".join(lines)
+    return "\n\n".join(_one(i, item) for i, item in enumerate(items, start=offset + 1))
 
 
 def format_news_detail(item: Dict[str, Any]) -> str:
@@ -381,7 +476,7 @@ def format_news_detail(item: Dict[str, Any]) -> str:
         summary = analysis.get("summary", "")
         if summary:
             lines.append("")
-            lines.append("━━━━━━━━━━━━━━━━━━━━━━━━━")
+            lines.append(SEPARATOR)
             lines.append("")
             lines.append(escape(summary))
 
@@ -408,14 +503,16 @@ def format_news_detail(item: Dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
-def format_stats_message(stats: Dict[str, int], all_news: List[Dict[str, Any]]) -> str:
+def format_stats_message(
+    stats: Dict[str, int], cats: Counter, sentiments: Counter,
+) -> str:
     active_subs = count_active_subscribers()
     sources = load_sources_data()
     active_sources = len([s for s in sources if s.get("is_active", True)])
 
     lines = [
         "📊 <b>Statistik</b>",
-        "━━━━━━━━━━━━━━━━━━━━━━━━━",
+        SEPARATOR,
         f"📰 Total berita    : <b>{stats['total']}</b>",
         f"🟡 Belum dianalisis : <b>{stats['raw']}</b>",
         f"✅ Sudah dianalisis : <b>{stats['analyzed']}</b>",
@@ -423,25 +520,17 @@ def format_stats_message(stats: Dict[str, int], all_news: List[Dict[str, Any]])
         f"📡 Sumber berita    : <b>{active_sources}</b>",
     ]
 
-    cats: Dict[str, int] = {}
-    for r in all_news:
-        c = r.get("category", "Unknown")
-        cats[c] = cats.get(c, 0) + 1
     if cats:
         lines.append("")
         lines.append("📁 <b>Kategori:</b>")
-        for c, count in sorted(cats.items(), key=lambda x: -x[1]):
+        for c, count in cats.most_common():
             ce = CATEGORY_EMOJI.get(c, "📁")
             lines.append(f"  {ce} {c}: {count}")
 
-    sentiments: Dict[str, int] = {}
-    for r in all_news:
-        s = r.get("sentiment", "neutral")
-        sentiments[s] = sentiments.get(s, 0) + 1
     if sentiments:
         lines.append("")
         lines.append("📈 <b>Sentimen:</b>")
-        for s, count in sorted(sentiments.items(), key=lambda x: -x[1]):
+        for s, count in sentiments.most_common():
             lines.append(f"  {EMOJI.get(s, '❓')} {s}: {count}")
 
     return "\n".join(lines)
@@ -452,61 +541,136 @@ def format_stats_message(stats: Dict[str, int], all_news: List[Dict[str, Any]])
 # ═══════════════════════════════════════════════════════════════════════════
 
 
+# Telegram membatasi ~30 pesan/detik per bot; broadcast dikirim per batch,
+# tempo pengiriman diatur _SendLimiter.
+BROADCAST_BATCH_SIZE = 25
+TELEGRAM_SEND_RATE = 25  # pesan/detik; batas global Telegram ~30/detik per bot
+
+
+class _SendLimiter:
+    """Rate limiter pesan keluar, dipakai bersama oleh semua event loop (bot + notifier)."""
+
+    def __init__(self, rate: int, per: float = 1.0) -> None:
+        self._interval = per / rate
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    async def __aenter__(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def __aexit__(self, *exc: Any) -> bool:
+        return False
+
+
+_outgoing = _SendLimiter(TELEGRAM_SEND_RATE)
+
+
+async def safe_send(coro):
+    """Jalankan coroutine kirim pesan (send_message / reply_text / edit) lewat rate limiter."""
+    async with _outgoing:
+        return await coro
+
+
+# Satu Bot + satu event loop khusus notifikasi. Connection pool httpx milik Bot
+# terikat ke loop tempat dia dipakai, jadi semua broadcast dijalankan di loop ini.
+_notify_bot = None
+_notify_loop: Optional[asyncio.AbstractEventLoop] = None
+_notify_lock = threading.Lock()
+
+
+def _get_notify_bot():
+    global _notify_bot
+    if _notify_bot is None:
+        from telegram import Bot
+        _notify_bot = Bot(
+            token=TELEGRAM_BOT_TOKEN,
+            request=HTTPXRequest(
+                connection_pool_size=BROADCAST_BATCH_SIZE,
+                read_timeout=30.0,
+                write_timeout=30.0,
+                connect_timeout=30.0,
+                pool_timeout=30.0,
+            ),
+        )
+    return _notify_bot
+
+
+def _get_notify_loop() -> asyncio.AbstractEventLoop:
+    global _notify_loop
+    with _notify_lock:
+        if _notify_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, daemon=True, name="notifier").start()
+            _notify_loop = loop
+    return _notify_loop
+
+
 async def send_to_all(text: str) -> None:
     if not TELEGRAM_BOT_TOKEN:
         return
-    from telegram import Bot
-    bot = Bot(token=TELEGRAM_BOT_TOKEN)
-    for chat_id in get_active_subscribers():
+    bot = _get_notify_bot()
+
+    async def _send_one(chat_id: int) -> None:
         try:
-            await bot.send_message(
+            await safe_send(bot.send_message(
                 chat_id=chat_id, text=text,
                 parse_mode=ParseMode.HTML, disable_web_page_preview=True,
-            )
+            ))
         except Exception as exc:
             logger.warning("Failed to notify %s: %s", chat_id, exc)
 
+    chat_ids = get_active_subscribers()
+    for i in range(0, len(chat_ids), BROADCAST_BATCH_SIZE):
+        batch = chat_ids[i: i + BROADCAST_BATCH_SIZE]
+        await asyncio.gather(*(_send_one(cid) for cid in batch))
+
 
 def notify_sync(text: str) -> None:
     if not TELEGRAM_BOT_TOKEN:
         return
+    future = asyncio.run_coroutine_threadsafe(send_to_all(text), _get_notify_loop())
     try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            asyncio.ensure_future(send_to_all(text))
-        else:
-            loop.run_until_complete(send_to_all(text))
+        asyncio.get_running_loop()
     except RuntimeError:
-        asyncio.run(send_to_all(text))
+        # Dipanggil dari thread sync (scheduler / executor): tunggu sampai selesai.
+        future.result()
 
 
 def notify_new_articles(articles: List[Dict[str, Any]]) -> None:
     if not articles:
         return
+    sentiment_emoji = EMOJI.get
+    category_emoji = CATEGORY_EMOJI.get
+
     lines = [f"🆕 <b>{len(articles)} berita baru!</b>\n"]
     for item in articles[:10]:
-        emoji = EMOJI.get(item.get("sentiment", "neutral"), "❓")
+        emoji = sentiment_emoji(item.get("sentiment", "neutral"), "❓")
         title = escape(item.get("title", "?"))
         news_id = item.get("id", "?")
         cat = escape(item.get("category", "?"))
-        cat_emoji = CATEGORY_EMOJI.get(item.get("category", ""), "📁")
+        cat_emoji = category_emoji(item.get("category", ""), "📁")
         url = item.get("url", "")
         pub = format_published_date(item.get("published_at", ""))
-        
-        # Ekstrak nama sumber berita
         source = escape(item.get("source_name", "?"))
 
-        lines.append(f"{emoji} <b>{title}</b>")
-        # Tambahkan ikon koran (📰) dan nama sumber di antara kategori dan waktu
-        lines.append(f"   {cat_emoji} {cat} · 📰 {source} · 🕐 {pub}")
-        lines.append(f"   🔗 <a href='{url}'>Baca</a> · <code>{news_id}</code>")
-        lines.append("")
+        # Satu blok per berita: judul, kategori · sumber · waktu, link
+        lines.append(
+            f"{emoji} <b>{title}</b>\n"
+            f"   {cat_emoji} {cat} · 📰 {source} · 🕐 {pub}\n"
+            f"   🔗 <a href='{url}'>Baca</a> · <code>{news_id}</code>\n"
+        )
 
     if len(articles) > 10:
         lines.append(f"... dan {len(articles) - 10} lainnya")
     lines.append("\n💡 /analyze <code>ID</code> untuk analisis")
     notify_sync("\n".join(lines))
-    
+
+
 def notify_analysis_result(item: Dict[str, Any]) -> None:
     notify_sync(format_news_detail(item))
 
@@ -516,11 +680,15 @@ def notify_analysis_result(item: Dict[str, Any]) -> None:
 # ═══════════════════════════════════════════════════════════════════════════
 
 
+@lru_cache(maxsize=1)
+def _get_groq() -> GroqClient:
+    """GroqClient dibuat sekali lalu dipakai ulang untuk semua /analyze."""
+    return get_groq_client(load_env())
+
+
 async def _run_analyze(record: Dict[str, Any]) -> Dict[str, Any]:
-    from datetime import datetime, timezone
-    groq = GroqClient(load_env())
-    loop = asyncio.get_event_loop()
-    analysis = await loop.run_in_executor(None, analyze_single, groq, record)
+    groq = _get_groq()
+    analysis = await asyncio.to_thread(analyze_single, groq, record)
 
     record["status"] = "analyzed"
     record["analysis"] = analysis
@@ -532,42 +700,185 @@ async def _run_analyze(record: Dict[str, Any]) -> Dict[str, Any]:
     if analysis.get("sentiment_direction"):
         record["sentiment"] = analysis["sentiment_direction"]
 
-    store = get_store()
-    store.update(record)
+    await asyncio.to_thread(get_store().update, record)
     BrowserManager.close()
     return record
 
 
+# ═══════════════════════════════════════════════════════════════════════════
+# Store Queries (sync — panggil via asyncio.to_thread dari handler)
+# ═══════════════════════════════════════════════════════════════════════════
+
+
+def _load_news_list(list_type: str) -> List[Dict[str, Any]]:
+    """Ambil berita untuk list_type: all / cat_<Category> / src_<id> (cached, shared)."""
+    return cache.get_or_set(list_type, lambda: _query_news_list(list_type))
+
+
+def _query_news_list(list_type: str) -> List[Dict[str, Any]]:
+    store = get_store()
+
+    if list_type.startswith("cat_"):
+        cat = list_type[4:]
+        # Filter di database kalau store mendukung
+        if hasattr(store, "get_by_category"):
+            return store.get_by_category(cat)
+        cat_key = itemgetter("category")
+        return [n for n in store.get_all() if cat_key(n) == cat]
+
+    if list_type.startswith("src_"):
+        try:
+            sid = int(list_type[4:])
+        except ValueError:
+            sid = 0
+        if hasattr(store, "get_by_source"):
+            return store.get_by_source(sid)
+        sid_key = itemgetter("source_id")
+        return [n for n in store.get_all() if sid_key(n) == sid]
+
+    return store.get_all()
+
+
+def _search_news(keyword: str) -> List[Dict[str, Any]]:
+    store = get_store()
+
+    # Gunakan fungsi search_news jika sudah di-update di store.py/db.py
+    # Jika tidak, gunakan fallback pencarian manual di memory
+    if hasattr(store, "search_news"):
+        return store.search_news(keyword)
+
+    kw = keyword.lower()
+    results = []
+    for n in store.get_all():
+        if kw in n.get("title", "").lower():
+            results.append(n)
+            continue
+        analysis = n.get("analysis")
+        if isinstance(analysis, dict) and kw in analysis.get("summary", "").lower():
+            results.append(n)
+    return results
+
+
+def _fetch_news_page(list_type: str, offset: int, keyword: str = "") -> Tuple[List[Dict[str, Any]], int]:
+    """Satu halaman (PAGE_SIZE) untuk list_type. Return (items, total)."""
+    if list_type == "search_result":
+        results = cache.get_or_set(f"search:{keyword.lower()}", lambda: _search_news(keyword))
+        return results[offset: offset + PAGE_SIZE], len(results)
+
+    store = get_store()
+    if not hasattr(store, "get_news_page"):
+        items = _load_news_list(list_type)
+        return items[offset: offset + PAGE_SIZE], len(items)
+
+    category: Optional[str] = None
+    source_id: Optional[int] = None
+    if list_type.startswith("cat_"):
+        category = list_type[4:]
+    elif list_type.startswith("src_"):
+        try:
+            source_id = int(list_type[4:])
+        except ValueError:
+            source_id = 0
+
+    # LIMIT/OFFSET di database; halaman yang sama dipakai bersama lewat shared cache
+    return cache.get_or_set(
+        f"{list_type}:{offset}",
+        lambda: store.get_news_page(PAGE_SIZE, offset, category=category, source_id=source_id),
+    )
+
+
+def _count_news_by_source() -> Tuple[Dict[int, Dict[str, Any]], int]:
+    """Return ({source_id: {name, count}}, total berita) (cached, shared)."""
+    return cache.get_or_set("source_counts", _query_source_counts)
+
+
+def _query_source_counts() -> Tuple[Dict[int, Dict[str, Any]], int]:
+    store = get_store()
+
+    # Kelompokkan berita berdasarkan source_id dan source_name
+    sources_map: Dict[int, Dict[str, Any]] = {}
+    if hasattr(store, "get_source_counts"):
+        rows = store.get_source_counts()
+        for r in rows:
+            if r["source_id"]:
+                sources_map[r["source_id"]] = {"name": r["source_name"], "count": r["count"]}
+        return sources_map, sum(r["count"] for r in rows)
+
+    all_news = store.get_all()
+    for r in all_news:
+        sid = r.get("source_id")
+        sname = r.get("source_name", "Unknown")
+        if not sid:
+            continue
+        if sid not in sources_map:
+            sources_map[sid] = {"name": sname, "count": 0}
+        sources_map[sid]["count"] += 1
+    return sources_map, len(all_news)
+
+
+def _count_news_by_category() -> Tuple[Dict[str, int], int]:
+    """Return ({category: count}, total berita) (cached, shared)."""
+    return cache.get_or_set("category_counts", _query_category_counts)
+
+
+def _query_category_counts() -> Tuple[Dict[str, int], int]:
+    store = get_store()
+    if hasattr(store, "group_counts"):
+        # GROUP BY di database + COUNT, tidak perlu tarik semua baris
+        return store.group_counts("category", default="Unknown"), store.stats()["total"]
+    cats: Counter = Counter()
+    all_news = store.get_all()
+    for r in all_news:
+        cats[r.get("category", "Unknown")] += 1
+    return dict(cats), len(all_news)
+
+
+def _build_stats_text() -> str:
+    store = get_store()
+    cats: Counter = Counter()
+    sentiments: Counter = Counter()
+    if hasattr(store, "group_counts"):
+        # GROUP BY di database, tidak perlu tarik semua baris
+        cats.update(store.group_counts("category", default="Unknown"))
+        sentiments.update(store.group_counts("sentiment", default="neutral"))
+    else:
+        for r in store.get_all():
+            cats[r.get("category", "Unknown")] += 1
+            sentiments[r.get("sentiment", "neutral")] += 1
+    return format_stats_message(store.stats(), cats, sentiments)
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # Paginated List Helper
 # ═══════════════════════════════════════════════════════════════════════════
 
+LIST_HEADERS = {
+    "all": "📰 Semua Berita",
+    "cat_Market": "📈 Market",
+    "cat_Macro": "🏛 Makro",
+    "cat_Commodity": "⛏ Komoditas",
+    "cat_Sectoral": "🏭 Sektoral",
+    "cat_Corporate Action": "🏢 Corporate Action",
+    "cat_Disclosure": "📋 Disclosure",
+    "search_result": "🔍 Hasil Pencarian",
+}
+LIST_FOOTER = "💡 /analyze <code>ID</code> untuk analisis"
+
 
 async def _send_news_page(
-    message, items: List[Dict[str, Any]], offset: int,
+    message, page_items: List[Dict[str, Any]], offset: int,
     total: int, list_type: str,
 ) -> None:
-    page_items = items[offset: offset + PAGE_SIZE]
     if not page_items:
         await message.reply_text("📭 Tidak ada berita lagi.")
         return
 
     text = format_news_list(page_items, offset)
 
-    header_map = {
-        "all": "📰 Semua Berita",
-        "cat_Market": "📈 Market",
-        "cat_Macro": "🏛 Makro",
-        "cat_Commodity": "⛏ Komoditas",
-        "cat_Sectoral": "🏭 Sektoral",
-        "cat_Corporate Action": "🏢 Corporate Action",
-        "cat_Disclosure": "📋 Disclosure",
-        "search_result": "🔍 Hasil Pencarian",
-    }
-    header = header_map.get(list_type)
+    header = LIST_HEADERS.get(list_type)
     if not header:
-        if list_type.startswith("src_") and items:
-            sname = escape(items[0].get("source_name", "Sumber"))
+        if list_type.startswith("src_"):
+            sname = escape(page_items[0].get("source_name", "Sumber"))
             header = f"📡 {sname}"
         else:
             header = "📰 Berita"
@@ -578,9 +889,9 @@ async def _send_news_page(
     full_text = (
         f"{header} — {current_page}/{total_pages} "
         f"({total} berita)\n"
-        f"━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+        f"{SEPARATOR}\n\n"
         f"{text}\n\n"
-        f"💡 /analyze <code>ID</code> untuk analisis"
+        f"{LIST_FOOTER}"
     )
 
     buttons = []
@@ -635,7 +946,8 @@ async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     user = update.effective_user
     
     # Simpan subscriber baru (logika lama tetap dipakai)
-    is_new = add_subscriber(
+    is_new = await asyncio.to_thread(
+        add_subscriber,
         update.effective_chat.id,
         user.username or "",
         user.first_name or "",
@@ -667,7 +979,7 @@ async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 
     # Log jika user baru
     if is_new:
-        active = count_active_subscribers()
+        active = await asyncio.to_thread(count_active_subscribers)
         logger.info(
             "👤 New subscriber: %s (total: %d)",
             user.username or update.effective_chat.id, active,
@@ -722,12 +1034,14 @@ async def cmd_help(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 
 async def cmd_subscribe(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     user = update.effective_user
-    add_subscriber(update.effective_chat.id, user.username or "", user.first_name or "")
+    await asyncio.to_thread(
+        add_subscriber, update.effective_chat.id, user.username or "", user.first_name or "",
+    )
     await update.message.reply_text("✅ Notifikasi <b>aktif</b>.", parse_mode=ParseMode.HTML)
 
 
 async def cmd_unsubscribe(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    remove_subscriber(update.effective_chat.id)
+    await asyncio.to_thread(remove_subscriber, update.effective_chat.id)
     await update.message.reply_text(
         "🔕 Notifikasi <b>dimatikan</b>. /subscribe untuk aktifkan.",
         parse_mode=ParseMode.HTML,
@@ -760,35 +1074,18 @@ async def handle_search_keyword(update: Update, context: ContextTypes.DEFAULT_TY
 
     msg = await update.message.reply_text(f"⏳ Mencari berita dengan kata kunci: <b>{escape(keyword)}</b>...", parse_mode=ParseMode.HTML)
 
-    store = get_store()
-    
-    # Gunakan fungsi search_news jika sudah di-update di store.py/db.py
-    # Jika tidak, gunakan fallback pencarian manual di memory
-    if hasattr(store, "search_news"):
-        results = store.search_news(keyword)
-    else:
-        all_news = store.get_all()
-        results = []
-        for n in all_news:
-            title = n.get("title", "").lower()
-            summary = ""
-            if n.get("analysis") and isinstance(n["analysis"], dict):
-                summary = n["analysis"].get("summary", "").lower()
-            
-            if keyword.lower() in title or keyword.lower() in summary:
-                results.append(n)
+    page_items, total = await asyncio.to_thread(_fetch_news_page, "search_result", 0, keyword)
 
-    if not results:
+    if not total:
         await msg.edit_text(f"📭 Tidak ditemukan berita untuk kata kunci: <b>{escape(keyword)}</b>.", parse_mode=ParseMode.HTML)
         return ConversationHandler.END
 
-    # Kita simpan hasil pencarian ke cache untuk Pagination (tombol Next/Prev)
-    list_type = "search_result"
-    context.user_data[f"list_cache_{list_type}"] = results
-    
+    # Cukup simpan keyword untuk Pagination (tombol Next/Prev); hasilnya di shared cache
+    context.user_data["search_keyword"] = keyword
+
     # Hapus pesan loading dan tampilkan hasilnya menggunakan fungsi list default
     await msg.delete()
-    await _send_news_page(update.message, results, 0, len(results), list_type)
+    await _send_news_page(update.message, page_items, 0, total, "search_result")
 
     return ConversationHandler.END
 
@@ -798,23 +1095,15 @@ async def cmd_search_cancel(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
 
 async def cmd_list_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    store = get_store()
-    items = store.get_all()
-    if not items:
+    page_items, total = await asyncio.to_thread(_fetch_news_page, "all", 0)
+    if not total:
         await update.message.reply_text("📭 Belum ada berita.")
         return
-    context.user_data["list_cache_all"] = items
-    await _send_news_page(update.message, items, 0, len(items), "all")
+    await _send_news_page(update.message, page_items, 0, total, "all")
 
 
 async def cmd_category_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    store = get_store()
-    all_news = store.get_all()
-
-    cats: Dict[str, int] = {}
-    for r in all_news:
-        c = r.get("category", "Unknown")
-        cats[c] = cats.get(c, 0) + 1
+    cats, total = await asyncio.to_thread(_count_news_by_category)
 
     if not cats:
         await update.message.reply_text("📭 Belum ada berita.")
@@ -840,7 +1129,7 @@ async def cmd_category_handler(update: Update, context: ContextTypes.DEFAULT_TYP
         buttons.append(row)
 
     buttons.append([
-        InlineKeyboardButton(f"📰 Semua ({len(all_news)})", callback_data="cat:all")
+        InlineKeyboardButton(f"📰 Semua ({total})", callback_data="cat:all")
     ])
 
     await update.message.reply_text(
@@ -852,9 +1141,9 @@ async def cmd_category_handler(update: Update, context: ContextTypes.DEFAULT_TYP
 
 @admin_only
 async def cmd_stats_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    store = get_store()
+    text = await asyncio.to_thread(_build_stats_text)
     await update.message.reply_text(
-        format_stats_message(store.stats(), store.get_all()),
+        text,
         parse_mode=ParseMode.HTML,
     )
 
@@ -869,8 +1158,7 @@ async def cmd_analyze_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
         return
 
     news_id = context.args[0]
-    store = get_store()
-    record = store.get_by_id(news_id)
+    record = await asyncio.to_thread(get_store().get_by_id, news_id)
 
     if not record:
         await update.message.reply_text(
@@ -904,29 +1192,20 @@ async def cmd_analyze_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
     except Exception as exc:
         await msg.edit_text(f"❌ Error: {escape(str(exc))}")
         
-async def cmd_source_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    store = get_store()
-    all_news = store.get_all()
+SOURCE_BUTTONS_PER_PAGE = 20  # batasi ukuran inline keyboard per pesan
 
-    # Kelompokkan berita berdasarkan source_id dan source_name
-    sources_map: Dict[int, Dict[str, Any]] = {}
-    for r in all_news:
-        sid = r.get("source_id")
-        sname = r.get("source_name", "Unknown")
-        if not sid:
-            continue
-        if sid not in sources_map:
-            sources_map[sid] = {"name": sname, "count": 0}
-        sources_map[sid]["count"] += 1
 
-    if not sources_map:
-        await update.message.reply_text("📭 Belum ada berita.")
-        return
+def _source_picker_markup(
+    sources_map: Dict[int, Dict[str, Any]], total_news: int, offset: int = 0
+) -> InlineKeyboardMarkup:
+    # Urutkan berdasarkan jumlah berita terbanyak — cukup ambil top (offset + K)
+    top = heapq.nlargest(
+        offset + SOURCE_BUTTONS_PER_PAGE, sources_map.items(), key=lambda x: x[1]["count"]
+    )[offset:]
 
     buttons = []
     row = []
-    # Urutkan berdasarkan jumlah berita terbanyak
-    for sid, data in sorted(sources_map.items(), key=lambda x: -x[1]["count"]):
+    for sid, data in top:
         name = escape(data["name"])
         count = data["count"]
         row.append(
@@ -941,32 +1220,43 @@ async def cmd_source_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
     if row:
         buttons.append(row)
 
+    next_offset = offset + SOURCE_BUTTONS_PER_PAGE
+    if len(sources_map) > next_offset:
+        buttons.append([
+            InlineKeyboardButton("Lainnya…", callback_data=f"srclist:{next_offset}")
+        ])
+
     buttons.append([
-        InlineKeyboardButton(f"📰 Semua ({len(all_news)})", callback_data="cat:all")
+        InlineKeyboardButton(f"📰 Semua ({total_news})", callback_data="cat:all")
     ])
+    return InlineKeyboardMarkup(buttons)
+
+
+async def cmd_source_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    sources_map, total_news = await asyncio.to_thread(_count_news_by_source)
+
+    if not sources_map:
+        await update.message.reply_text("📭 Belum ada berita.")
+        return
 
     await update.message.reply_text(
         "📡 <b>Pilih Sumber Berita</b>\n\n"
         "Tap sumber untuk melihat daftar berita:",
         parse_mode=ParseMode.HTML,
-        reply_markup=InlineKeyboardMarkup(buttons),
+        reply_markup=_source_picker_markup(sources_map, total_news),
     )
 
 @admin_only
 async def cmd_collect_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.message.reply_text("⏳ Mengumpulkan berita baru...")
     try:
-        from commands import cmd_collect
-
-        store = get_store()
-        before = store.stats().get("total", 0)
+        before = (await asyncio.to_thread(get_store().stats)).get("total", 0)
 
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, cmd_collect, load_env())
+        await asyncio.to_thread(cmd_collect, load_env())
 
-        store = get_store()
-        after = store.stats().get("total", 0)
+        after = (await asyncio.to_thread(get_store().stats)).get("total", 0)
         new_count = after - before
+        cache.invalidate_all()
 
         if new_count > 0:
             await update.message.reply_text(
@@ -994,8 +1284,8 @@ async def cmd_cleanup(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
 
     try:
         # Jalankan di thread terpisah agar tidak memblokir bot
-        loop = asyncio.get_event_loop()
-        count = await loop.run_in_executor(None, store.delete_old_news, 3)
+        count = await asyncio.to_thread(store.delete_old_news, 3)
+        cache.invalidate_all()
 
         if count > 0:
             await msg.edit_text(f"🗑 <b>Berhasil!</b>\n\n{count} berita lama telah dihapus dari database.", parse_mode=ParseMode.HTML)
@@ -1022,24 +1312,35 @@ def _source_inline_buttons(source: Dict[str, Any]) -> InlineKeyboardMarkup:
         [InlineKeyboardButton("🗑 Hapus", callback_data=f"src_delete:{sid}")],
     ])
 
+
+SOURCES_SEND_CONCURRENCY = 3
+
+
 @admin_only
 async def cmd_sources(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    sources = load_sources_data()
+    sources = await asyncio.to_thread(load_sources_data)
     if not sources:
         await update.message.reply_text("📭 Belum ada sources.\n\n/add_source untuk tambah.")
         return
 
-    active = len([s for s in sources if s.get("is_active", True)])
+    active = sum(1 for s in sources if s.get("is_active", True))
     await update.message.reply_text(
         f"📡 <b>{len(sources)} Source(s)</b> ({active} active)",
         parse_mode=ParseMode.HTML,
     )
-    for source in sources:
-        await update.message.reply_text(
-            format_source_card(source), parse_mode=ParseMode.HTML,
-            disable_web_page_preview=True,
-            reply_markup=_source_inline_buttons(source),
-        )
+    # Telegram: ~1 pesan/detik per chat (burst pendek diterima), 30/detik global.
+    # Maksimal SOURCES_SEND_CONCURRENCY kartu in-flight supaya tidak kena flood limit.
+    sem = asyncio.Semaphore(SOURCES_SEND_CONCURRENCY)
+
+    async def _send(source: Dict[str, Any]) -> None:
+        async with sem:
+            await safe_send(update.message.reply_text(
+                format_source_card(source), parse_mode=ParseMode.HTML,
+                disable_web_page_preview=True,
+                reply_markup=_source_inline_buttons(source),
+            ))
+
+    await asyncio.gather(*(_send(s) for s in sources))
 
 @admin_only
 async def cmd_toggle_source(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -1052,7 +1353,7 @@ async def cmd_toggle_source(update: Update, context: ContextTypes.DEFAULT_TYPE)
         await update.message.reply_text("❌ ID harus angka.")
         return
 
-    source = toggle_source_in_store(source_id)
+    source = await asyncio.to_thread(toggle_source_in_store, source_id)
     if source:
         status = "✅ Active" if source.get("is_active") else "❌ Inactive"
         await update.message.reply_text(
@@ -1100,11 +1401,10 @@ async def add_source_url(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         await update.message.reply_text("❌ URL harus diawali http:// atau https://. Coba lagi:")
         return ADD_URL
     context.user_data["new_source_url"] = url
-    buttons = [[InlineKeyboardButton(t, callback_data=f"srctype:{t}")] for t in SOURCE_TYPES]
     await update.message.reply_text(
         f"✅ URL: <code>{escape(url)}</code>\n\nStep 3/4: Pilih <b>type</b>:",
         parse_mode=ParseMode.HTML,
-        reply_markup=InlineKeyboardMarkup(buttons),
+        reply_markup=TYPE_KEYBOARD,
     )
     return ADD_TYPE
 
@@ -1114,11 +1414,10 @@ async def add_source_type_cb(update: Update, context: ContextTypes.DEFAULT_TYPE)
     await query.answer()
     stype = query.data.replace("srctype:", "")
     context.user_data["new_source_type"] = stype
-    buttons = [[InlineKeyboardButton(f"{CATEGORY_EMOJI.get(c, '📁')} {c}", callback_data=f"srccat:{c}")] for c in SOURCE_CATEGORIES]
     await query.edit_message_text(
         f"✅ Type: <b>{escape(stype)}</b>\n\nStep 4/4: Pilih <b>category</b>:",
         parse_mode=ParseMode.HTML,
-        reply_markup=InlineKeyboardMarkup(buttons),
+        reply_markup=CATEGORY_KEYBOARD,
     )
     return ADD_CATEGORY
 
@@ -1132,7 +1431,7 @@ async def add_source_cat_cb(update: Update, context: ContextTypes.DEFAULT_TYPE)
     url = context.user_data.pop("new_source_url", "")
     stype = context.user_data.pop("new_source_type", "rss")
 
-    result = add_source_to_store({
+    result = await asyncio.to_thread(add_source_to_store, {
         "name": name, "feed_url": url,
         "type": stype, "category": category, "is_active": True,
     })
@@ -1160,197 +1459,199 @@ async def add_source_cancel(update: Update, context: ContextTypes.DEFAULT_TYPE)
 # ════════════════════════════════════════════════════════════════��══════════
 
 
-async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    query = update.callback_query
-    await query.answer()
-    data = query.data or ""
+# ── Category selection ────────────────────────────────────────────────────
+async def _cb_category(payload: str, query, context: ContextTypes.DEFAULT_TYPE) -> None:
+    list_type = "all" if payload == "all" else f"cat_{payload}"
+    page_items, total = await asyncio.to_thread(_fetch_news_page, list_type, 0)
 
-    # ── Category selection ────────────────────────────────────────────
-    if data.startswith("cat:"):
-        cat = data[4:]
-        store = get_store()
+    if not total:
+        await query.edit_message_text("📭 Tidak ada berita di kategori ini.")
+        return
 
-        if cat == "all":
-            items = store.get_all()
-            list_type = "all"
-        else:
-            all_news = store.get_all()
-            items = [n for n in all_news if n.get("category") == cat]
-            list_type = f"cat_{cat}"
+    await _send_news_page(query.message, page_items, 0, total, list_type)
 
-        if not items:
-            await query.edit_message_text("📭 Tidak ada berita di kategori ini.")
-            return
 
-        context.user_data[f"list_cache_{list_type}"] = items
-        await _send_news_page(query.message, items, 0, len(items), list_type)
-        
-    # ── Source selection (Filter by Source) ───────────────────────────
-    elif data.startswith("src:"):
-        try:
-            source_id = int(data[4:])
-        except ValueError:
-            source_id = 0
+# ── Source selection (Filter by Source) ───────────────────────────────────
+async def _cb_source(payload: str, query, context: ContextTypes.DEFAULT_TYPE) -> None:
+    try:
+        source_id = int(payload)
+    except ValueError:
+        source_id = 0
 
-        store = get_store()
-        
-        # GUNAKAN FUNGSI DB YANG BARU AGAR LEBIH CEPAT
-        if hasattr(store, "get_by_source"):
-            items = store.get_by_source(source_id)
-        else:
-            # Fallback kalau belum update db.py
-            all_news = store.get_all()
-            items = [n for n in all_news if n.get("source_id") == source_id]
-            
-        list_type = f"src_{source_id}"
+    list_type = f"src_{source_id}"
+    page_items, total = await asyncio.to_thread(_fetch_news_page, list_type, 0)
 
-        if not items:
-            await query.edit_message_text("📭 Tidak ada berita dari sumber ini.")
-            return
+    if not total:
+        await query.edit_message_text("📭 Tidak ada berita dari sumber ini.")
+        return
 
-        context.user_data[f"list_cache_{list_type}"] = items
-        await _send_news_page(query.message, items, 0, len(items), list_type)
-
-    # ── Pagination ────────────────────────────────────────────────────
-    elif data.startswith("page:"):
-        parts = data.split(":")
-        list_type = parts[1]
-        offset = int(parts[2])
-
-        cache_key = f"list_cache_{list_type}"
-        items = context.user_data.get(cache_key)
-
-        if not items:
-            store = get_store()
-            if list_type == "all":
-                items = store.get_all()
-            elif list_type.startswith("cat_"):
-                cat_name = list_type[4:]
-                items = [n for n in store.get_all() if n.get("category") == cat_name]
-            elif list_type.startswith("src_"):
-                sid = int(list_type[4:])
-                if hasattr(store, "get_by_source"):
-                    items = store.get_by_source(sid)
-                else:
-                    items = [n for n in store.get_all() if n.get("source_id") == sid]
-            else:
-                items = store.get_all()
-            context.user_data[cache_key] = items
-
-        await _send_news_page(query.message, items, offset, len(items), list_type)
-
-    # ── Source toggle ─────────────────────────────────────────────────
-    elif data.startswith("src_toggle:"):
-        source_id = int(data.split(":")[1])
-        source = toggle_source_in_store(source_id)
-        if source:
-            await query.edit_message_text(
-                format_source_card(source), parse_mode=ParseMode.HTML,
-                reply_markup=_source_inline_buttons(source),
-            )
+    await _send_news_page(query.message, page_items, 0, total, list_type)
 
-    # ── Source edit ───────────────────────────────────────────────────
-    elif data.startswith("src_edit:"):
-        source_id = int(data.split(":")[1])
-        source = find_source_by_id_any(source_id)
-        if source:
-            markup = InlineKeyboardMarkup([
-                [
-                    InlineKeyboardButton("📝 Nama", callback_data=f"srcedit:{source_id}:name"),
-                    InlineKeyboardButton("🔗 URL", callback_data=f"srcedit:{source_id}:feed_url"),
-                ],
-                [
-                    InlineKeyboardButton("📁 Type", callback_data=f"srcedit:{source_id}:type"),
-                    InlineKeyboardButton("🏷 Category", callback_data=f"srcedit:{source_id}:category"),
-                ],
-            ])
-            await query.edit_message_text(
-                f"✏️ <b>Edit Source #{source_id}</b>\n\n{format_source_card(source)}\n\nPilih field:",
-                parse_mode=ParseMode.HTML, reply_markup=markup,
-            )
 
-    # ── Source edit field ─────────────────────────────────────────────
-    elif data.startswith("srcedit:"):
-        parts = data.split(":")
-        source_id, field = int(parts[1]), parts[2]
-        context.user_data["edit_source_id"] = source_id
-        context.user_data["edit_field"] = field
-
-        if field == "type":
-            buttons = [[InlineKeyboardButton(t, callback_data=f"srcsettype:{source_id}:{t}")] for t in SOURCE_TYPES]
-            await query.edit_message_text(
-                f"📁 Pilih type baru untuk source #{source_id}:",
-                reply_markup=InlineKeyboardMarkup(buttons),
-            )
-        elif field == "category":
-            buttons = [[InlineKeyboardButton(f"{CATEGORY_EMOJI.get(c, '📁')} {c}", callback_data=f"srcsetcat:{source_id}:{c}")] for c in SOURCE_CATEGORIES]
-            await query.edit_message_text(
-                f"🏷 Pilih category baru untuk source #{source_id}:",
-                reply_markup=InlineKeyboardMarkup(buttons),
-            )
-        else:
-            label = "nama" if field == "name" else "URL"
-            await query.edit_message_text(
-                f"📝 Kirim <b>{label}</b> baru untuk source #{source_id}:\n\n/cancel untuk batal",
-                parse_mode=ParseMode.HTML,
-            )
+# ── Source picker, halaman berikutnya ─────────────────────────────────────
+async def _cb_source_list(payload: str, query, context: ContextTypes.DEFAULT_TYPE) -> None:
+    offset = int(payload)
+    sources_map, total_news = await asyncio.to_thread(_count_news_by_source)
+    await query.edit_message_reply_markup(
+        reply_markup=_source_picker_markup(sources_map, total_news, offset)
+    )
 
-    # ── Source set type ───────────────────────────────────────────────
-    elif data.startswith("srcsettype:"):
-        parts = data.split(":")
-        source_id, new_type = int(parts[1]), parts[2]
-        source = update_source_in_store(source_id, {"type": new_type})
-        context.user_data.pop("edit_source_id", None)
-        context.user_data.pop("edit_field", None)
-        if source:
-            await query.edit_message_text(
-                f"✅ Type updated!\n\n{format_source_card(source)}", parse_mode=ParseMode.HTML,
-            )
 
-    # ── Source set category ───────────────────────────────────────────
-    elif data.startswith("srcsetcat:"):
-        parts = data.split(":")
-        source_id, new_cat = int(parts[1]), parts[2]
-        source = update_source_in_store(source_id, {"category": new_cat})
-        context.user_data.pop("edit_source_id", None)
-        context.user_data.pop("edit_field", None)
-        if source:
-            await query.edit_message_text(
-                f"✅ Category updated!\n\n{format_source_card(source)}", parse_mode=ParseMode.HTML,
-            )
+# ── Pagination ────────────────────────────────────────────────────────────
+async def _cb_page(payload: str, query, context: ContextTypes.DEFAULT_TYPE) -> None:
+    list_type, _, offset_str = payload.rpartition(":")
+    offset = int(offset_str)
 
-    # ── Source delete ─────────────────────────────────────────────────
-    elif data.startswith("src_delete:"):
-        source_id = int(data.split(":")[1])
-        source = find_source_by_id_any(source_id)
-        if source:
-            markup = InlineKeyboardMarkup([[
-                InlineKeyboardButton("✅ Ya, hapus", callback_data=f"src_del_yes:{source_id}"),
-                InlineKeyboardButton("❌ Batal", callback_data=f"src_del_no:{source_id}"),
-            ]])
-            await query.edit_message_text(
-                f"🗑 <b>Hapus source ini?</b>\n\n{format_source_card(source)}",
-                parse_mode=ParseMode.HTML, reply_markup=markup,
-            )
+    keyword = context.user_data.get("search_keyword", "")
+    page_items, total = await asyncio.to_thread(_fetch_news_page, list_type, offset, keyword)
 
-    elif data.startswith("src_del_yes:"):
-        source_id = int(data.split(":")[1])
-        source = find_source_by_id_any(source_id)
-        name = source.get("name", "?") if source else "?"
-        if delete_source_from_store(source_id):
-            await query.edit_message_text(
-                f"🗑 Source <b>{escape(name)}</b> (#{source_id}) dihapus.",
-                parse_mode=ParseMode.HTML,
-            )
-            logger.info("📡 Source deleted: [%d] %s", source_id, name)
-        else:
-            await query.edit_message_text("❌ Gagal menghapus source.")
+    await _send_news_page(query.message, page_items, offset, total, list_type)
+
+
+# ── Source toggle ─────────────────────────────────────────────────────────
+async def _cb_source_toggle(payload: str, query, context: ContextTypes.DEFAULT_TYPE) -> None:
+    source_id = int(payload)
+    source = await asyncio.to_thread(toggle_source_in_store, source_id)
+    if source:
+        await query.edit_message_text(
+            format_source_card(source), parse_mode=ParseMode.HTML,
+            reply_markup=_source_inline_buttons(source),
+        )
 
-    elif data.startswith("src_del_no:"):
-        source_id = int(data.split(":")[1])
-        source = find_source_by_id_any(source_id)
-        text = f"👍 Batal hapus.\n\n{format_source_card(source)}" if source else "👍 Batal hapus."
-        await query.edit_message_text(text, parse_mode=ParseMode.HTML)
+
+# ── Source edit ───────────────────────────────────────────────────────────
+async def _cb_source_edit(payload: str, query, context: ContextTypes.DEFAULT_TYPE) -> None:
+    source_id = int(payload)
+    source = await asyncio.to_thread(find_source_by_id_any, source_id)
+    if source:
+        markup = InlineKeyboardMarkup([
+            [
+                InlineKeyboardButton("📝 Nama", callback_data=f"srcedit:{source_id}:name"),
+                InlineKeyboardButton("🔗 URL", callback_data=f"srcedit:{source_id}:feed_url"),
+            ],
+            [
+                InlineKeyboardButton("📁 Type", callback_data=f"srcedit:{source_id}:type"),
+                InlineKeyboardButton("🏷 Category", callback_data=f"srcedit:{source_id}:category"),
+            ],
+        ])
+        await query.edit_message_text(
+            f"✏️ <b>Edit Source #{source_id}</b>\n\n{format_source_card(source)}\n\nPilih field:",
+            parse_mode=ParseMode.HTML, reply_markup=markup,
+        )
+
+
+# ── Source edit field ─────────────────────────────────────────────────────
+async def _cb_source_edit_field(payload: str, query, context: ContextTypes.DEFAULT_TYPE) -> None:
+    sid, _, field = payload.partition(":")
+    source_id = int(sid)
+    context.user_data["edit_source_id"] = source_id
+    context.user_data["edit_field"] = field
+
+    if field == "type":
+        await query.edit_message_text(
+            f"📁 Pilih type baru untuk source #{source_id}:",
+            reply_markup=_edit_type_keyboard(source_id),
+        )
+    elif field == "category":
+        await query.edit_message_text(
+            f"🏷 Pilih category baru untuk source #{source_id}:",
+            reply_markup=_edit_category_keyboard(source_id),
+        )
+    else:
+        label = "nama" if field == "name" else "URL"
+        await query.edit_message_text(
+            f"📝 Kirim <b>{label}</b> baru untuk source #{source_id}:\n\n/cancel untuk batal",
+            parse_mode=ParseMode.HTML,
+        )
+
+
+# ── Source set type ───────────────────────────────────────────────────────
+async def _cb_source_set_type(payload: str, query, context: ContextTypes.DEFAULT_TYPE) -> None:
+    sid, _, new_type = payload.partition(":")
+    source_id = int(sid)
+    source = await asyncio.to_thread(update_source_in_store, source_id, {"type": new_type})
+    context.user_data.pop("edit_source_id", None)
+    context.user_data.pop("edit_field", None)
+    if source:
+        await query.edit_message_text(
+            f"✅ Type updated!\n\n{format_source_card(source)}", parse_mode=ParseMode.HTML,
+        )
+
+
+# ── Source set category ───────────────────────────────────────────────────
+async def _cb_source_set_category(payload: str, query, context: ContextTypes.DEFAULT_TYPE) -> None:
+    sid, _, new_cat = payload.partition(":")
+    source_id = int(sid)
+    source = await asyncio.to_thread(update_source_in_store, source_id, {"category": new_cat})
+    context.user_data.pop("edit_source_id", None)
+    context.user_data.pop("edit_field", None)
+    if source:
+        await query.edit_message_text(
+            f"✅ Category updated!\n\n{format_source_card(source)}", parse_mode=ParseMode.HTML,
+        )
+
+
+# ── Source delete ─────────────────────────────────────────────────────────
+async def _cb_source_delete(payload: str, query, context: ContextTypes.DEFAULT_TYPE) -> None:
+    source_id = int(payload)
+    source = await asyncio.to_thread(find_source_by_id_any, source_id)
+    if source:
+        markup = InlineKeyboardMarkup([[
+            InlineKeyboardButton("✅ Ya, hapus", callback_data=f"src_del_yes:{source_id}"),
+            InlineKeyboardButton("❌ Batal", callback_data=f"src_del_no:{source_id}"),
+        ]])
+        await query.edit_message_text(
+            f"🗑 <b>Hapus source ini?</b>\n\n{format_source_card(source)}",
+            parse_mode=ParseMode.HTML, reply_markup=markup,
+        )
+
+
+async def _cb_source_delete_yes(payload: str, query, context: ContextTypes.DEFAULT_TYPE) -> None:
+    source_id = int(payload)
+    source = await asyncio.to_thread(find_source_by_id_any, source_id)
+    name = source.get("name", "?") if source else "?"
+    if await asyncio.to_thread(delete_source_from_store, source_id):
+        await query.edit_message_text(
+            f"🗑 Source <b>{escape(name)}</b> (#{source_id}) dihapus.",
+            parse_mode=ParseMode.HTML,
+        )
+        logger.info("📡 Source deleted: [%d] %s", source_id, name)
+    else:
+        await query.edit_message_text("❌ Gagal menghapus source.")
+
+
+async def _cb_source_delete_no(payload: str, query, context: ContextTypes.DEFAULT_TYPE) -> None:
+    source_id = int(payload)
+    source = await asyncio.to_thread(find_source_by_id_any, source_id)
+    text = f"👍 Batal hapus.\n\n{format_source_card(source)}" if source else "👍 Batal hapus."
+    await query.edit_message_text(text, parse_mode=ParseMode.HTML)
+
+
+# Prefix callback_data (sebelum ":" pertama) → handler
+CALLBACK_HANDLERS = {
+    "cat": _cb_category,
+    "src": _cb_source,
+    "srclist": _cb_source_list,
+    "page": _cb_page,
+    "src_toggle": _cb_source_toggle,
+    "src_edit": _cb_source_edit,
+    "srcedit": _cb_source_edit_field,
+    "srcsettype": _cb_source_set_type,
+    "srcsetcat": _cb_source_set_category,
+    "src_delete": _cb_source_delete,
+    "src_del_yes": _cb_source_delete_yes,
+    "src_del_no": _cb_source_delete_no,
+}
+
+
+async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    query = update.callback_query
+    await query.answer()
+    action, _, payload = (query.data or "").partition(":")
+
+    handler = CALLBACK_HANDLERS.get(action)
+    if handler:
+        await handler(payload, query, context)
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -1373,7 +1674,7 @@ async def text_message_handler(update: Update, context: ContextTypes.DEFAULT_TYP
         await update.message.reply_text("❌ URL harus diawali http:// atau https://. Coba lagi:")
         return
 
-    source = update_source_in_store(edit_id, {edit_field: new_value})
+    source = await asyncio.to_thread(update_source_in_store, edit_id, {edit_field: new_value})
     context.user_data.pop("edit_source_id", None)
     context.user_data.pop("edit_field", None)
 
@@ -1458,8 +1759,8 @@ def run_bot() -> None:
     logger.info("🤖 Starting Telegram bot...")
 
     # Start scheduler
-    from scheduler import start_scheduler
-    start_scheduler()
+    from scheduler import start_scheduler, stop_scheduler
+    scheduler_thread = start_scheduler()
 
     # ══════════════════════════════════════════════════════════════════
     # FIX: Konfigurasi Timeout untuk Koneksi Lambat / Indonesia
@@ -1523,4 +1824,8 @@ def run_bot() -> None:
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, text_message_handler))
 
     logger.info("🤖 Bot is running! Press Ctrl+C to stop.")
-    app.run_polling(drop_pending_updates=True)
\ No newline at end of file
+    try:
+        app.run_polling(drop_pending_updates=True)
+    finally:
+        stop_scheduler(scheduler_thread)
+        close_groq_clients()
\ No newline at end of file
@@ -22,6 +22,7 @@ class BrowserManager:
         self._playwright: Any = None
         self._pw_context: Any = None
         self._browser: Any = None
+        self._context: Any = None
         self._stealth: Any = None
         self._request_count: int = 0
         self._thread_id: Optional[int] = None
@@ -51,6 +52,17 @@ class BrowserManager:
                 "--disable-gpu",
             ],
         )
+        # Satu context dipakai ulang untuk semua fetch; per URL cukup buka page baru.
+        self._context = self._browser.new_context(
+            user_agent=(
+                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                "AppleWebKit/537.36 (KHTML, like Gecko) "
+                "Chrome/131.0.0.0 Safari/537.36"
+            ),
+            viewport={"width": 1920, "height": 1080},
+            locale="id-ID",
+            timezone_id="Asia/Jakarta",
+        )
         self._thread_id = threading.current_thread().ident
         logger.info("🌐 Stealth browser launched.")
 
@@ -61,17 +73,7 @@ class BrowserManager:
             time.sleep(BROWSER_DELAY)
         self._request_count += 1
 
-        context = self._browser.new_context(
-            user_agent=(
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/131.0.0.0 Safari/537.36"
-            ),
-            viewport={"width": 1920, "height": 1080},
-            locale="id-ID",
-            timezone_id="Asia/Jakarta",
-        )
-        page = context.new_page()
+        page = self._context.new_page()
         self._stealth.apply_stealth_sync(page)
 
         try:
@@ -88,13 +90,14 @@ class BrowserManager:
             return html
         finally:
             page.close()
-            context.close()
 
     @classmethod
     def close(cls) -> None:
         with cls._lock:
             if cls._instance:
                 try:
+                    if cls._instance._context:
+                        cls._instance._context.close()
                     if cls._instance._browser:
                         cls._instance._browser.close()
                     if cls._instance._playwright:
@@ -105,27 +108,6 @@ class BrowserManager:
                 cls._instance = None
 
 
-def _run_in_thread(func, *args):
-    """Jalankan fungsi sync di thread baru, return result."""
-    result = [None]
-    error = [None]
-
-    def _worker():
-        try:
-            result[0] = func(*args)
-        except Exception as e:
-            error[0] = e
-
-    t = threading.Thread(target=_worker)
-    t.start()
-    t.join(timeout=120)
-
-    if error[0]:
-        raise error[0]
-    return result[0]
-
-
 async def run_sync_in_thread(func, *args):
     """Jalankan fungsi sync (Playwright) di thread terpisah dari async context."""
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, func, *args)
\ No newline at end of file
+    return await asyncio.to_thread(func, *args)
\ No newline at end of file
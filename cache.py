@@ -0,0 +1,41 @@
+"""
+In-process TTL Cache — hasil query store yang dibaca berulang (list berita,
+per sumber, per kategori) dipakai bersama oleh semua user bot.
+Di-invalidate setelah collect / cleanup.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+DEFAULT_TTL = 60  # detik
+
+_cache: Dict[str, Tuple[float, Any]] = {}
+_lock = threading.Lock()
+
+
+def get_or_set(key: str, loader: Callable[[], Any], ttl: float = DEFAULT_TTL) -> Any:
+    """Return nilai cache untuk key; panggil loader() kalau belum ada / expired."""
+    now = time.monotonic()
+    with _lock:
+        hit = _cache.get(key)
+    if hit is not None and now - hit[0] < ttl:
+        return hit[1]
+
+    # Loader (query DB) dijalankan di luar lock supaya key lain tidak ikut menunggu
+    value = loader()
+    with _lock:
+        _cache[key] = (time.monotonic(), value)
+    return value
+
+
+def invalidate(key: str) -> None:
+    with _lock:
+        _cache.pop(key, None)
+
+
+def invalidate_all() -> None:
+    with _lock:
+        _cache.clear()
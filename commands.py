@@ -4,12 +4,19 @@ CLI Commands — collect, list, analyze, stats
 
 from __future__ import annotations
 
+import heapq
+import sys
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
+from operator import itemgetter
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from config import logger
-from helpers import parse_published_date, time_ago, generate_id
+from config import COLLECT_MAX_WORKERS, GROQ_MAX_CONCURRENCY, logger
+from helpers import generate_id, parse_published_date, time_ago
 from store import get_store
 from state import load_state, save_state
 from sources import (
@@ -17,17 +24,107 @@ from sources import (
     parse_feed,
     fetch_idx_announcements,
     get_new_entries,
-    extract_rss_summary,
+    summary_extractor,
 )
 from browser import BrowserManager
-from llm import GroqClient, filter_news_batch, analyze_single
+import notifier
+from llm import get_groq_client, filter_news_batch, analyze_many
 from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_exception_type
 
 
+SENTIMENT_EMOJI = {"bullish": "🟢", "bearish": "🔴", "neutral": "⚪"}
+
+
 # ---------------------------------------------------------------------------
 # Phase 1-4: Collect → Parse → Filter → Store
 # ---------------------------------------------------------------------------
 
+
+def _fetch_source(
+    source: Dict[str, Any], last_link: Optional[str], validators: Dict[str, Any]
+) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]], Optional[str]]]:
+    """
+    Phase 1 untuk satu source. Return (source, new_entries, top_link) atau None.
+    validators ({etag, last_modified}) dipakai untuk conditional GET dan di-update in-place.
+    """
+    name = source.get("name", "?")
+    feed_url = source.get("feed_url", "")
+    stype = source.get("type", "rss")
+
+    logger.info("Checking: %s [%s]", name, stype)
+
+    try:
+        if stype == "idx_api":
+            entries = fetch_idx_announcements(feed_url)
+        elif stype == "stockbit_api":
+            from sources import fetch_stockbit_news
+            entries = fetch_stockbit_news(feed_url, validators)
+        elif stype == "sitemap.xml":
+            from sources import fetch_investor_sitemap
+            entries = fetch_investor_sitemap(feed_url, validators)
+        else:
+            entries = parse_feed(feed_url, validators)
+    except Exception as exc:
+        # Error saat fetch data per sumber tidak akan membatalkan seluruh collect,
+        # hanya di-skip.
+        logger.error("  ✗ [%s] Failed: %s", name, exc)
+        return None
+
+    if not entries:
+        return None
+
+    new_entries, top_link = get_new_entries(entries, last_link)
+
+    if not new_entries:
+        logger.info("  ✓ [%s] Up to date.", name)
+        return None
+
+    logger.info("  🆕 [%s] %d new.", name, len(new_entries))
+    return source, new_entries, top_link
+
+
+@lru_cache(maxsize=4096)
+def _to_epoch(published_at: str) -> int:
+    """ISO-8601 → epoch detik (0 kalau tidak valid). Di-cache: tanggal sering berulang per feed."""
+    try:
+        return int(datetime.fromisoformat(published_at).timestamp())
+    except (TypeError, ValueError):
+        return 0
+
+
+def _merge_validators(
+    state: Dict[str, Any], validators: Dict[str, Dict[str, Any]]
+) -> bool:
+    """Salin ETag / Last-Modified terbaru ke state. Return True kalau ada yang berubah."""
+    changed = False
+    for sid, v in validators.items():
+        entry = state.setdefault(sid, {})
+        for key in ("etag", "last_modified"):
+            if v.get(key) and entry.get(key) != v[key]:
+                entry[key] = v[key]
+                changed = True
+    return changed
+
+
+def _save_collect_state(
+    state: Dict[str, Any],
+    all_new: List[Tuple[Dict[str, Any], List[Dict[str, Any]], str]],
+    validators: Dict[str, Dict[str, Any]],
+    db: Any,
+) -> None:
+    """Simpan last_top_link + ETag/Last-Modified setelah source selesai diproses."""
+    scraped_at = datetime.now(timezone.utc).isoformat()
+    for source, _, top_link in all_new:
+        sid = str(source["id"])
+        state[sid] = {
+            "last_top_link": top_link,
+            "last_scraped_at": scraped_at,
+            "name": source.get("name", ""),
+        }
+    _merge_validators(state, validators)
+    save_state(state, db)
+
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_fixed(5),
@@ -46,7 +143,7 @@ def cmd_collect(groq_api_key: str) -> None:
     """Phase 1-4: Collect → Parse → Filter → Store. Support RSS, IDX, Stockbit JSON."""
     
     # --- AWAL DARI KODEMU ASLI ---
-    groq = GroqClient(groq_api_key)
+    groq = get_groq_client(groq_api_key)
     store = get_store()
 
     is_supabase = hasattr(store, "load_state")
@@ -56,48 +153,39 @@ def cmd_collect(groq_api_key: str) -> None:
     state = load_state(db)
     logger.info("Found %d active source(s).", len(sources))
 
+    # ──────── SCRAPE SEMUA SUMBER (paralel, I/O-bound) ─────────
     all_new: List[Tuple[Dict[str, Any], List[Dict[str, Any]], str]] = []
-
-    # ──────── SCRAPE SEMUA SUMBER ─────────
-    for source in sources:
-        name = source.get("name", "?")
-        feed_url = source.get("feed_url", "")
-        sid = str(source.get("id", ""))
-        stype = source.get("type", "rss")
-
-        logger.info("Checking: %s [%s]", name, stype)
-
-        try:
-            if stype == "idx_api":
-                entries = fetch_idx_announcements(feed_url)
-            elif stype == "stockbit_api":
-                from sources import fetch_stockbit_news
-                entries = fetch_stockbit_news(feed_url)
-            elif stype == "sitemap.xml":
-                from sources import fetch_investor_sitemap
-                entries = fetch_investor_sitemap(feed_url)
-            else:
-                entries = parse_feed(feed_url)
-        except Exception as exc:
-            # Error saat fetch data per sumber tidak akan membatalkan seluruh collect,
-            # hanya di-skip. Ini perilaku aslimu.
-            logger.error("  ✗ Failed: %s", exc)
-            continue
-
-        if not entries:
-            continue
-
-        last_link = state.get(sid, {}).get("last_top_link")
-        new_entries, top_link = get_new_entries(entries, last_link)
-
-        if not new_entries:
-            logger.info("  ✓ Up to date.")
-            continue
-
-        logger.info("  🆕 %d new.", len(new_entries))
-        all_new.append((source, new_entries, top_link))
+    # ETag / Last-Modified per source; baru disimpan ke state bersama last_top_link
+    validators: Dict[str, Dict[str, Any]] = {}
+    last_links = {sid: (v or {}).get("last_top_link") for sid, v in state.items()}
+    for s in sources:
+        prev = state.get(str(s.get("id", ""))) or {}
+        validators[str(s.get("id", ""))] = {
+            "etag": prev.get("etag"),
+            "last_modified": prev.get("last_modified"),
+        }
+    if sources:
+        started = time.monotonic()
+        workers = min(COLLECT_MAX_WORKERS, len(sources))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="collect") as ex:
+            # map() menjaga urutan hasil sesuai urutan sources (bukan urutan selesai)
+            results = ex.map(
+                lambda s: _fetch_source(
+                    s, last_links.get(str(s.get("id", ""))), validators[str(s.get("id", ""))]
+                ),
+                sources,
+            )
+            for result in results:
+                if result:
+                    all_new.append(result)
+        logger.info(
+            "Scraped %d source(s) in %.1fs (%d worker(s)).",
+            len(sources), time.monotonic() - started, workers,
+        )
 
     if not all_new:
+        if _merge_validators(state, validators):
+            save_state(state, db)
         logger.info("═" * 50)
         logger.info("No new articles. Done.")
         return
@@ -109,21 +197,28 @@ def cmd_collect(groq_api_key: str) -> None:
 
     parsed: List[Dict[str, Any]] = []
     for source, entries, _ in all_new:
+        # Nilai per-source dihitung sekali, bukan per entry
         stype = source.get("type", "rss")
+        src_id = int(source.get("id", 0))
+        src_name = source.get("name", "")
+        src_cat = source.get("category", "Market")
+        extract_summary = summary_extractor(entries)
         for entry in entries:
             url = entry.get("link") or entry.get("titleurl", "")
             if not url:
                 continue
+            published_at = parse_published_date(entry, source_type=stype)
             parsed.append({
                 "title": entry.get("title", ""),
                 "url": url,
-                "published_at": parse_published_date(entry, source_type=stype),
-                "source_id": int(source.get("id", 0)),
-                "source_name": source.get("name", ""),
+                "published_at": published_at,
+                "_sort_ts": _to_epoch(published_at) if published_at else 0,
+                "source_id": src_id,
+                "source_name": src_name,
                 "source_type": stype,
-                "_rss_summary": extract_rss_summary(entry),
-                "_source_name": source.get("name", ""),
-                "_source_category": source.get("category", "Market"),
+                "_rss_summary": extract_summary(entry),
+                "_source_name": src_name,
+                "_source_category": src_cat,
                 "_emiten": entry.get("_emiten", ""),
                 "_attachments": entry.get("_attachments", []),
                 "_no_pengumuman": entry.get("_no_pengumuman", ""),
@@ -134,6 +229,12 @@ def cmd_collect(groq_api_key: str) -> None:
                 "_sb_created": entry.get("created", ""),    
             })
 
+    if not parsed:
+        # Semua entry tanpa URL — tidak perlu panggil LLM, cukup tandai sudah diproses
+        logger.info("No parseable entries. Done.")
+        _save_collect_state(state, all_new, validators, db)
+        return
+
     # ──────── PHASE 3: LLM FILTER ───────────
     logger.info("═" * 50)
     logger.info("Phase 3: LLM Filter (%d entries)...", len(parsed))
@@ -142,36 +243,47 @@ def cmd_collect(groq_api_key: str) -> None:
     relevant: List[Dict[str, Any]] = []
     filtered_out = 0
 
-    for i in range(0, len(parsed), batch_size):
+    def _filter_batch(i: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
         batch = parsed[i : i + batch_size]
         logger.info("  Batch %d-%d...", i + 1, min(i + batch_size, len(parsed)))
-        result = filter_news_batch(groq, batch)
-        relevant.extend(result)
-        filtered_out += len(batch) - len(result)
-        if i + batch_size < len(parsed):
-            time.sleep(1)
+        return batch, filter_news_batch(groq, batch)
+
+    # Beberapa batch in-flight sekaligus; jarak antar request dijaga rate limiter GroqClient
+    starts = range(0, len(parsed), batch_size)
+    workers = max(1, min(GROQ_MAX_CONCURRENCY, len(starts)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="filter") as ex:
+        for batch, result in ex.map(_filter_batch, starts):
+            relevant.extend(result)
+            filtered_out += len(batch) - len(result)
 
     logger.info("  ✓ %d relevant, %d filtered out.", len(relevant), filtered_out)
 
-    relevant.sort(key=lambda x: x.get("published_at", "") or "", reverse=True)
+    # Urut pakai _sort_ts (epoch, dihitung sekali di Phase 2). Feed umumnya sudah
+    # urut terbaru-dulu, jadi sort per source nyaris linear, lalu K-way merge.
+    sort_key = itemgetter("_sort_ts")
+    by_source: Dict[Any, List[Dict[str, Any]]] = {}
+    for entry in relevant:
+        by_source.setdefault(entry.get("source_id"), []).append(entry)
+    for items in by_source.values():
+        items.sort(key=sort_key, reverse=True)
+    relevant = list(heapq.merge(*by_source.values(), key=sort_key, reverse=True))
 
     # ──────── PHASE 4: STORE TO DB ───────────
     logger.info("═" * 50)
     logger.info("Phase 4: Storing (Sorted by Date)...")
 
-    inserted = 0
-    skipped = 0
-    inserted_records: List[Dict[str, Any]] = []
+    records: List[Dict[str, Any]] = []
+    # Satu timestamp untuk seluruh batch collect ini
+    collected_at = datetime.now(timezone.utc).isoformat()
 
     for entry in relevant:
         cat = entry.get("_filter_category", entry.get("_source_category", "Market"))
         sentiment = entry.get("_filter_sentiment", "neutral")
         sub_category = entry.get("_filter_sub_category")
 
-        ticker = None
+        # Kode emiten IDX: 4 huruf ASCII (isascii() cek byte, lebih murah dari isalpha saja)
         emiten = entry.get("_emiten", "")
-        if emiten and len(emiten) == 4 and emiten.isalpha():
-            ticker = emiten.upper()
+        ticker = emiten.upper() if len(emiten) == 4 and emiten.isascii() and emiten.isalpha() else None
 
         url = entry["url"]
         if entry.get("_is_lapkeu"):
@@ -183,6 +295,7 @@ def cmd_collect(groq_api_key: str) -> None:
             logger.info("  📊 Lapkeu: using primary PDF only")
 
         record = {
+            "id": generate_id(url),
             "title": entry["title"],
             "url": url,
             "published_at": entry.get("published_at"),
@@ -195,7 +308,7 @@ def cmd_collect(groq_api_key: str) -> None:
             "filter_reason": entry.get("_filter_reason", ""),
             "rss_summary": entry.get("_rss_summary", ""),
             "status": "raw",
-            "collected_at": datetime.now(timezone.utc).isoformat(),
+            "collected_at": collected_at,
             "analysis": None,
             "analyzed_at": None,
         }
@@ -203,43 +316,44 @@ def cmd_collect(groq_api_key: str) -> None:
         if sub_category:
             record["sub_category"] = sub_category
 
-        if store.save(record):
-            inserted += 1
-            emoji = {"bullish": "🟢", "bearish": "🔴", "neutral": "⚪"}.get(sentiment, "❓")
-            sub_label = f" [{sub_category}]" if sub_category else ""
-            logger.info(
-                "  %s [%s] %s%s",
-                emoji,
-                record.get("id", "?")[:8],
-                entry["title"][:55],
-                sub_label,
-            )
-            saved = store.get_by_id(generate_id(entry["url"]))
-            if saved:
-                inserted_records.append(saved)
-        else:
-            skipped += 1
+        records.append(record)
+
+    if hasattr(store, "save_many"):
+        saved_records = store.save_many(records)
+    else:
+        saved_records = [r for r in records if store.save(r)]
+
+    inserted = len(saved_records)
+    skipped = len(records) - inserted
+    inserted_records: List[Dict[str, Any]] = []
+
+    for record in saved_records:
+        sentiment = record.get("sentiment", "neutral")
+        sub_category = record.get("sub_category")
+        emoji = SENTIMENT_EMOJI.get(sentiment, "❓")
+        sub_label = f" [{sub_category}]" if sub_category else ""
+        logger.info(
+            "  %s [%s] %s%s",
+            emoji,
+            record.get("id", "?")[:8],
+            record["title"][:55],
+            sub_label,
+        )
+        # Record lokal sudah lengkap (id di-set saat save) — tidak perlu baca ulang dari DB
+        inserted_records.append(dict(record))
 
     # ──────── NOTIF TELEGRAM ────────────────
+    # Dikirim di background (notifier); error Telegram di-log oleh worker dan
+    # tidak lagi mengulang seluruh collect — berita sudah tersimpan di titik ini.
     if inserted_records:
         try:
             from bot import notify_new_articles
-            notify_new_articles(inserted_records)
+            notifier.enqueue(notify_new_articles, inserted_records)
         except Exception as exc:
-            # Jika Telegram error (seperti getaddrinfo failed), ini akan me-raise error
-            # dan ditangkap oleh decorator @retry di atas, sehingga seluruh fungsi cmd_collect diulang.
             logger.warning("Telegram notification failed: %s", exc)
-            raise exc # Sengaja dilempar agar tenacity menangkapnya dan melakukan retry
 
     # ──────── UPDATE STATE LAST PROCESSED ───
-    for source, _, top_link in all_new:
-        sid = str(source["id"])
-        state[sid] = {
-            "last_top_link": top_link,
-            "last_scraped_at": datetime.now(timezone.utc).isoformat(),
-            "name": source.get("name", ""),
-        }
-    save_state(state, db)
+    _save_collect_state(state, all_new, validators, db)
 
     stats = store.stats()
     logger.info("═" * 50)
@@ -274,10 +388,14 @@ def cmd_list(status_filter: Optional[str] = None) -> None:
         print("\n  Tidak ada berita.\n")
         return
 
+    # Kumpulkan semua baris lalu tulis sekali ke stdout (bukan print per baris)
+    out: List[str] = []
+    emit = out.append
+
     status_label = f" ({status_filter})" if status_filter else ""
-    print(f"\n{'═' * 70}")
-    print(f"  📰 News Feed{status_label} — {len(items)} article(s)")
-    print(f"{'═' * 70}\n")
+    emit(f"\n{'═' * 70}")
+    emit(f"  📰 News Feed{status_label} — {len(items)} article(s)")
+    emit(f"{'═' * 70}\n")
 
     for item in items:
         news_id = item.get("id", "?")
@@ -297,24 +415,20 @@ def cmd_list(status_filter: Optional[str] = None) -> None:
                 if analysis
                 else sentiment
             )
-            emoji = {"bullish": "🟢", "bearish": "🔴", "neutral": "⚪"}.get(
-                direction, "❓"
-            )
+            emoji = SENTIMENT_EMOJI.get(direction, "❓")
             status_str = f"{emoji} ANALYZED | {direction.upper()}"
         else:
-            emoji = {"bullish": "🟢", "bearish": "🔴", "neutral": "⚪"}.get(
-                sentiment, "❓"
-            )
+            emoji = SENTIMENT_EMOJI.get(sentiment, "❓")
             status_str = f"{emoji} RAW | {sentiment.upper()}"
 
         cat_display = f"{category}"
         if sub_cat:
             cat_display += f" ({sub_cat})"
 
-        print(f"  ┌─ ID: {news_id}")
-        print(f"  │  {status_str} | {cat_display}")
-        print(f"  │  {title}")
-        print(f"  │  {source} • {ago}")
+        emit(f"  ┌─ ID: {news_id}")
+        emit(f"  │  {status_str} | {cat_display}")
+        emit(f"  │  {title}")
+        emit(f"  │  {source} • {ago}")
 
         if status == "analyzed" and item.get("analysis"):
             analysis = item["analysis"]
@@ -323,17 +437,19 @@ def cmd_list(status_filter: Optional[str] = None) -> None:
                 lines = summary.split("\n")
                 for line in lines[:3]:
                     if line.strip():
-                        print(f"  │  {line.strip()}")
+                        emit(f"  │  {line.strip()}")
                 if len(lines) > 3:
-                    print("  │  ...")
+                    emit("  │  ...")
             key_data = analysis.get("key_data", [])
             if key_data:
-                print(f"  │  📊 {' | '.join(key_data[:3])}")
+                emit(f"  │  📊 {' | '.join(key_data[:3])}")
 
-        print("  │")
+        emit("  │")
         if status == "raw":
-            print(f"  │  → python main.py analyze {news_id}")
-        print(f"  └{'─' * 60}\n")
+            emit(f"  │  → python main.py analyze {news_id}")
+        emit(f"  └{'─' * 60}\n")
+
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 # ---------------------------------------------------------------------------
@@ -344,14 +460,22 @@ def cmd_list(status_filter: Optional[str] = None) -> None:
 def cmd_analyze(
     groq_api_key: str, target: str, limit: Optional[int] = None
 ) -> None:
-    groq = GroqClient(groq_api_key)
+    groq = get_groq_client(groq_api_key)
     store = get_store()
 
+    items: Iterable[Dict[str, Any]]
+    use_cache = True
     if target == "all":
-        items = store.get_by_status("raw", limit=limit)
-        if not items:
+        # Stream per halaman kalau store mendukung — analisis pertama langsung jalan
+        if hasattr(store, "iter_by_status"):
+            stream = store.iter_by_status("raw", limit=limit)
+        else:
+            stream = iter(store.get_by_status("raw", limit=limit))
+        first = next(stream, None)
+        if first is None:
             print("\n  Tidak ada berita raw untuk dianalisis.\n")
             return
+        items = chain([first], stream)
     else:
         item = store.get_by_id(target)
         if not item:
@@ -368,21 +492,15 @@ def cmd_analyze(
             reanalyze = input("  Analyze ulang? (y/n): ").strip().lower()
             if reanalyze != "y":
                 return
+            use_cache = False
         items = [item]
 
     logger.info("═" * 50)
-    logger.info("Phase 5: Analyzing %d article(s)...", len(items))
+    logger.info("Phase 5: Analyzing article(s)...")
 
     analyzed = 0
 
-    for i, record in enumerate(items, 1):
-        title = record.get("title", "")
-        news_id = record.get("id", "?")
-        logger.info("─" * 50)
-        logger.info("[%d/%d] [%s] %s", i, len(items), news_id, title[:70])
-
-        analysis = analyze_single(groq, record)
-
+    def _apply(record: Dict[str, Any], analysis: Dict[str, Any]) -> Dict[str, Any]:
         record["status"] = "analyzed"
         record["analysis"] = analysis
         record["analyzed_at"] = datetime.now(timezone.utc).isoformat()
@@ -394,12 +512,16 @@ def cmd_analyze(
             record["sentiment"] = analysis["sentiment_direction"]
 
         store.update(record)
-        analyzed += 1
+        return record
+
+    def _report(record: Dict[str, Any]) -> None:
+        analysis = record["analysis"]
+
+        logger.info("─" * 50)
+        logger.info("[%s] %s", record.get("id", "?"), record.get("title", "")[:70])
 
         direction = analysis.get("sentiment_direction", "neutral")
-        emoji = {"bullish": "🟢", "bearish": "🔴", "neutral": "⚪"}.get(
-            direction, "❓"
-        )
+        emoji = SENTIMENT_EMOJI.get(direction, "❓")
         print(
             f"\n  {emoji} {direction.upper()} | {analysis.get('category', '?')}"
         )
@@ -423,12 +545,15 @@ def cmd_analyze(
 
         try:
             from bot import notify_analysis_result
-            notify_analysis_result(record)
+            notifier.enqueue(notify_analysis_result, record)
         except Exception:
             pass
 
-        if i < len(items):
-            time.sleep(1)
+    # Artikel dianalisis paralel di analyze_many (scraper pakai browser sendiri
+    # per panggilan); hasil datang sesuai urutan items.
+    for record, analysis in analyze_many(groq, items, use_cache=use_cache):
+        _report(_apply(record, analysis))
+        analyzed += 1
 
     BrowserManager.close()
     logger.info("═" * 50)
@@ -452,35 +577,36 @@ def cmd_stats() -> None:
     print(f"  Analyzed       : {stats['analyzed']}")
     print(f"{'─' * 50}")
 
-    store_all = store.get_all()
+    cats: Counter = Counter()
+    sub_cats: Counter = Counter()
+    sentiments: Counter = Counter()
+    if hasattr(store, "group_counts"):
+        # GROUP BY di database — hanya hasil hitungan yang dikirim
+        cats.update(store.group_counts("category", default="Unknown"))
+        sub_cats.update(store.group_counts("sub_category"))
+        sentiments.update(store.group_counts("sentiment", default="neutral"))
+    else:
+        # Satu pass untuk ketiga agregat
+        for r in store.get_all():
+            cats[r.get("category", "Unknown")] += 1
+            sc = r.get("sub_category", "")
+            if sc:
+                sub_cats[sc] += 1
+            sentiments[r.get("sentiment", "neutral")] += 1
 
-    cats: Dict[str, int] = {}
-    for r in store_all:
-        c = r.get("category", "Unknown")
-        cats[c] = cats.get(c, 0) + 1
     if cats:
         print("\n  📁 By Category:")
-        for c, count in sorted(cats.items(), key=lambda x: -x[1]):
+        for c, count in cats.most_common():
             print(f"     {c:20s} : {count}")
 
-    sub_cats: Dict[str, int] = {}
-    for r in store_all:
-        sc = r.get("sub_category", "")
-        if sc:
-            sub_cats[sc] = sub_cats.get(sc, 0) + 1
     if sub_cats:
         print("\n  📋 IDX Sub-category:")
-        for sc, count in sorted(sub_cats.items(), key=lambda x: -x[1]):
+        for sc, count in sub_cats.most_common():
             print(f"     {sc:20s} : {count}")
 
-    sentiments: Dict[str, int] = {}
-    for r in store_all:
-        s = r.get("sentiment", "neutral")
-        sentiments[s] = sentiments.get(s, 0) + 1
     if sentiments:
         print("\n  📈 Sentiment:")
-        emoji_map = {"bullish": "🟢", "bearish": "🔴", "neutral": "⚪"}
-        for s, count in sorted(sentiments.items(), key=lambda x: -x[1]):
-            print(f"     {emoji_map.get(s, '❓')} {s:10s} : {count}")
+        for s, count in sentiments.most_common():
+            print(f"     {SENTIMENT_EMOJI.get(s, '❓')} {s:10s} : {count}")
 
     print(f"\n{'═' * 50}\n")
\ No newline at end of file
@@ -3,8 +3,10 @@ Constants & Environment Configuration
 """
 
 import os
+import re
 import sys
 import logging
+from functools import lru_cache
 from pathlib import Path
 from typing import FrozenSet
 
@@ -34,6 +36,7 @@ BASE_DIR = Path(__file__).parent
 SOURCES_FILE = BASE_DIR / "sources.json"
 STATE_FILE = BASE_DIR / "state.json"
 NEWS_DIR = BASE_DIR / "news"
+LLM_CACHE_FILE = BASE_DIR / "llm_cache.sqlite3"
 
 # ---------------------------------------------------------------------------
 # LLM
@@ -41,13 +44,35 @@ NEWS_DIR = BASE_DIR / "news"
 GROQ_MODEL = "openai/gpt-oss-120b"
 GROQ_FILTER_MAX_TOKENS = 2048
 GROQ_ANALYSIS_MAX_TOKENS = 3072
+GROQ_RPM = 30  # batas request/menit Groq (free tier)
+GROQ_TPM = 8000  # batas token/menit Groq (free tier); 0 = tanpa token bucket
+GROQ_MAX_RETRIES = 3  # retry saat kena 429
+GROQ_MAX_CONCURRENCY = 5  # request Groq in-flight bersamaan
+GROQ_ANALYSIS_BATCH_SIZE = 3  # artikel per request analisis (analyze_many)
+GROQ_ANALYSIS_BATCH_MAX_TOKENS = 4096  # budget output satu request batch (prompt + ini < GROQ_TPM)
+ANALYSIS_MAX_CHARS = 4000  # isi artikel di prompt analisis single (setelah buang boilerplate)
+ANALYSIS_BATCH_CHARS = 2000  # isi artikel per item di prompt batch
 
 # ---------------------------------------------------------------------------
 # Scraping
 # ---------------------------------------------------------------------------
 MIN_CONTENT_LENGTH = 100
+SCRAPE_MAX_CHARS = 12000  # paragraf artikel berhenti dikumpulkan setelah ini (analisis pakai ~4000)
 BROWSER_DELAY = 3.0
+BROWSER_POOL_SIZE = 2  # Chromium warm (satu per worker thread) untuk fallback scraping
+BROWSER_CONTEXT_REUSE = 20  # URL per BrowserContext sebelum dirotasi (cookie/fingerprint baru)
+# Resource type Playwright yang di-abort (hanya DOM yang dibutuhkan);
+# kosongkan (frozenset()) kalau ada situs yang butuh layout dari CSS
+BROWSER_BLOCKED_RESOURCES: FrozenSet[str] = frozenset({"image", "media", "font", "stylesheet"})
+PDF_PARALLEL_MIN_PAGES = 32  # PDF sebesar ini diekstrak paralel per rentang halaman
+PDF_WORKERS = min(4, os.cpu_count() or 1)  # proses worker ekstraksi PDF
+PDF_MAX_BYTES = 50 * 1024 * 1024  # download PDF lebih besar dari ini dibatalkan
 SIMILARITY_THRESHOLD = 0.75
+# Pre-filter MinHash-LSH judul (datasketch): kandidat dicek dulu, tidak ada yang
+# cocok → tetap scan exact penuh (konfirmasi selalu pakai SIMILARITY_THRESHOLD)
+TITLE_LSH_THRESHOLD = 0.4
+TITLE_LSH_PERM = 64
+COLLECT_MAX_WORKERS = 8  # fetch source paralel di Phase 1
 
 # ---------------------------------------------------------------------------
 # Categories & Sentiments
@@ -65,6 +90,10 @@ CLOUDFLARE_MARKERS = [
     "einen moment", "un momento", "aguarde",
     "challenge-platform", "cf-challenge", "cf_chl_opt",
 ]
+# Satu regex alternation: HTML di-scan sekali, tanpa .lower() copy
+CLOUDFLARE_RE = re.compile(
+    "|".join(re.escape(m) for m in CLOUDFLARE_MARKERS), re.IGNORECASE
+)
 
 # ---------------------------------------------------------------------------
 # Supabase
@@ -83,8 +112,12 @@ TELEGRAM_ADMIN_ID = os.environ.get("TELEGRAM_ADMIN_ID", "")
 # ---------------------------------------------------------------------------
 # Environment
 # ---------------------------------------------------------------------------
+@lru_cache(maxsize=1)
 def load_env() -> str:
-    """Load and validate GROQ_API_KEY from environment."""
+    """
+    Load and validate GROQ_API_KEY from environment.
+    Di-cache per proses (scheduler memanggil tiap run); ganti key → restart proses.
+    """
     groq_api_key = os.environ.get("GROQ_API_KEY", "")
     if not groq_api_key:
         logger.critical("Missing GROQ_API_KEY in .env")
@@ -5,11 +5,92 @@ Database Client — Supabase
 from __future__ import annotations
 
 import os
+import time
 from datetime import datetime, timezone, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from config import SIMILARITY_THRESHOLD, logger
-from helpers import generate_id, similarity
+from helpers import find_similar_title, find_similar_titles, generate_id
+
+# Kolom news yang boleh dipakai group_counts (nama kolom dikirim ke RPC)
+GROUPABLE_COLUMNS = frozenset({"category", "sub_category", "sentiment", "status", "source_type"})
+DEDUP_CACHE_TTL = 300  # detik sebelum cache id/judul di-resync penuh dari DB
+NEWS_PAGE_SIZE = 1000  # baris per request saat stream tabel news (= default max-rows PostgREST)
+STATE_UPSERT_CHUNK = 500  # baris per request upsert pipeline_state
+NEWS_INSERT_CHUNK = 200  # record per request insert batch news
+
+
+# (kolom news, key di dict analysis, default) — dipakai kedua serializer
+_ANALYSIS_COLUMNS = (
+    ("analysis_summary", "summary", ""),
+    ("analysis_sentiment", "sentiment_direction", ""),
+    ("analysis_reasoning", "sentiment_reasoning", ""),
+    ("analysis_category", "category", ""),
+    ("analysis_ticker", "ticker", None),
+    ("analysis_tags", "tags", []),
+    ("analysis_key_data", "key_data", []),
+)
+
+
+# Kode error PostgREST/Postgres untuk kolom / function yang belum ada
+_MISSING_COLUMN_CODES = frozenset({"42703", "PGRST204"})
+_MISSING_FUNCTION_CODES = frozenset({"42883", "PGRST202"})
+
+
+def _is_missing_column(exc: Exception, *columns: str) -> bool:
+    """
+    True kalau exc = error kolom tidak ada (bukan error jaringan/timeout).
+    Dengan columns: hanya kalau salah satu nama kolom itu disebut di pesan.
+    """
+    code = str(getattr(exc, "code", "") or "")
+    message = str(getattr(exc, "message", "") or exc)
+    if code not in _MISSING_COLUMN_CODES and not (
+        "column" in message and ("does not exist" in message or "Could not find" in message)
+    ):
+        return False
+    return not columns or any(col in message for col in columns)
+
+
+def _is_missing_function(exc: Exception) -> bool:
+    """True kalau exc = RPC/function tidak ada di database (bukan error sementara)."""
+    code = str(getattr(exc, "code", "") or "")
+    message = str(getattr(exc, "message", "") or exc)
+    return code in _MISSING_FUNCTION_CODES or "Could not find the function" in message
+
+
+def _flatten_analysis(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    get = analysis.get
+    return {col: get(key, default) for col, key, default in _ANALYSIS_COLUMNS}
+
+
+def _pooled_client_options() -> Dict[str, Any]:
+    """
+    Satu httpx.Client bersama dengan keep-alive pool (dan HTTP/2 kalau paket
+    h2 terpasang) untuk semua request PostgREST — thread collect/analyze
+    memakai ulang koneksi TLS, bukan handshake baru.
+    Supabase versi lama tanpa opsi httpx_client → pakai default client.
+    """
+    try:
+        import httpx
+        from supabase import ClientOptions
+    except ImportError:
+        return {}
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+
+    http = httpx.Client(
+        http2=http2,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+        timeout=httpx.Timeout(60.0, connect=10.0),
+    )
+    try:
+        return {"options": ClientOptions(httpx_client=http)}
+    except TypeError:
+        http.close()
+        return {}
 
 
 class SupabaseDB:
@@ -22,41 +103,74 @@ class SupabaseDB:
         if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
             raise ValueError("Missing SUPABASE_URL or SUPABASE_SERVICE_KEY in .env")
 
-        self._client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+        self._client = create_client(
+            SUPABASE_URL, SUPABASE_SERVICE_KEY, **_pooled_client_options()
+        )
         self._titles_cache: Optional[List[str]] = None
-        self._urls_cache: Optional[set] = None
+        self._lower_titles_cache: Optional[List[str]] = None
+        self._dedup_loaded_at = 0.0
+        self._state_has_validators = True
+        self._has_search_tsv = True
+        # RPC opsional yang tidak ada di database; tidak dicoba lagi di proses ini
+        self._missing_rpcs: set = set()
 
     # ==================================================================
     # News — Read
     # ==================================================================
 
     def get_by_id(self, news_id: str) -> Optional[Dict[str, Any]]:
-        resp = self._client.table("news").select("*").eq("id", news_id).execute()
-        if resp.data:
-            return self._deserialize(resp.data[0])
-
+        # Exact match + prefix match dalam satu range query di PK:
+        # id hex lowercase, jadi semua id berawalan news_id ada di [news_id, news_id + "g")
         resp = (
             self._client.table("news")
             .select("*")
-            .like("id", f"{news_id}%")
+            .gte("id", news_id)
+            .lt("id", news_id + "g")
+            .limit(10)
             .execute()
         )
-        if resp.data and len(resp.data) == 1:
-            return self._deserialize(resp.data[0])
-        if resp.data and len(resp.data) > 1:
-            ids = [r["id"] for r in resp.data]
+        rows = resp.data or []
+        exact = next((r for r in rows if r["id"] == news_id), None)
+        if exact is not None:
+            return self._deserialize(exact)
+        if len(rows) == 1:
+            return self._deserialize(rows[0])
+        if len(rows) > 1:
+            ids = [r["id"] for r in rows]
             logger.error("Ambiguous ID '%s'. Matches: %s", news_id, ids)
             return None
         return None
 
+    def _iter_rows(
+        self, columns: str = "*", page_size: int = NEWS_PAGE_SIZE
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream baris news per halaman (Range header), terbaru dulu.
+        PostgREST membatasi satu response (max-rows), jadi tabel besar
+        memang harus diambil bertahap.
+        """
+        offset = 0
+        while True:
+            resp = (
+                self._client.table("news")
+                .select(columns)
+                .order("published_at", desc=True)
+                .order("id", desc=True)
+                .range(offset, offset + page_size - 1)
+                .execute()
+            )
+            rows = resp.data or []
+            yield from rows
+            if len(rows) < page_size:
+                return
+            offset += page_size
+
+    def iter_all(self, page_size: int = NEWS_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        for row in self._iter_rows("*", page_size):
+            yield self._deserialize(row)
+
     def get_all(self) -> List[Dict[str, Any]]:
-        resp = (
-            self._client.table("news")
-            .select("*")
-            .order("published_at", desc=True)
-            .execute()
-        )
-        return [self._deserialize(r) for r in resp.data]
+        return list(self.iter_all())
 
     def get_by_status(
         self, status: str, limit: Optional[int] = None
@@ -72,6 +186,46 @@ class SupabaseDB:
         resp = query.execute()
         return [self._deserialize(r) for r in resp.data]
     
+    def iter_by_status(
+        self, status: str, limit: Optional[int] = None, page_size: int = 200
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Seperti get_by_status tapi di-stream per halaman.
+        Pakai keyset (published_at, id) — bukan offset — karena status record
+        bisa berubah selama iterasi (raw → analyzed) dan offset akan melompati baris.
+        """
+        yielded = 0
+        cursor: Optional[Tuple[Optional[str], str]] = None
+        while limit is None or yielded < limit:
+            size = page_size if limit is None else min(page_size, limit - yielded)
+            query = (
+                self._client.table("news")
+                .select("*")
+                .eq("status", status)
+            )
+            if cursor is not None:
+                pub, last_id = cursor
+                if pub is None:
+                    query = query.is_("published_at", "null").lt("id", last_id)
+                else:
+                    query = query.or_(
+                        f'published_at.lt."{pub}",published_at.is.null,'
+                        f'and(published_at.eq."{pub}",id.lt.{last_id})'
+                    )
+            resp = (
+                query.order("published_at", desc=True, nullsfirst=False)
+                .order("id", desc=True)
+                .limit(size)
+                .execute()
+            )
+            rows = resp.data or []
+            for row in rows:
+                yield self._deserialize(row)
+            yielded += len(rows)
+            if len(rows) < size:
+                return
+            cursor = (rows[-1].get("published_at"), rows[-1]["id"])
+
     def get_by_source(self, source_id: int, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Ambil berita spesifik berdasarkan source_id langsung dari database."""
         try:
@@ -90,20 +244,79 @@ class SupabaseDB:
             logger.error("✗ get_by_source failed: %s", exc)
             return []
 
-    def get_all_urls(self) -> set:
-        if self._urls_cache is not None:
-            return self._urls_cache
-        resp = self._client.table("news").select("url").execute()
-        self._urls_cache = {r["url"] for r in resp.data}
-        return self._urls_cache
+    def get_by_category(self, category: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Ambil berita spesifik berdasarkan category langsung dari database."""
+        try:
+            query = (
+                self._client.table("news")
+                .select("*")
+                .eq("category", category)
+                .order("published_at", desc=True)
+            )
+            if limit:
+                query = query.limit(limit)
+            resp = query.execute()
+            return [self._deserialize(r) for r in resp.data]
+        except Exception as exc:
+            logger.error("✗ get_by_category failed: %s", exc)
+            return []
+
+    def get_news_page(
+        self,
+        limit: int,
+        offset: int = 0,
+        category: Optional[str] = None,
+        source_id: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Satu halaman berita (LIMIT/OFFSET di database). Return (items, total)."""
+        try:
+            query = self._client.table("news").select("*", count="exact")
+            if category:
+                query = query.eq("category", category)
+            if source_id is not None:
+                query = query.eq("source_id", source_id)
+            resp = (
+                query.order("published_at", desc=True)
+                .range(offset, offset + limit - 1)
+                .execute()
+            )
+            return [self._deserialize(r) for r in resp.data], resp.count or 0
+        except Exception as exc:
+            logger.error("✗ get_news_page failed: %s", exc)
+            return [], 0
+
+    def _load_dedup_caches(self) -> None:
+        """
+        Muat judul untuk cek redundansi. Setelah itu cache di-maintain
+        incremental oleh save/delete; resync penuh hanya tiap DEDUP_CACHE_TTL.
+        (Duplikat URL ditolak DB lewat ON CONFLICT (id), tidak perlu cache URL.)
+        """
+        if (
+            self._titles_cache is not None
+            and time.monotonic() - self._dedup_loaded_at < DEDUP_CACHE_TTL
+        ):
+            return
+        self._titles_cache = [r["title"] for r in self._iter_rows("title")]
+        self._lower_titles_cache = [t.lower() for t in self._titles_cache]
+        self._dedup_loaded_at = time.monotonic()
+
+    def _remember_saved(self, records: List[Dict[str, Any]]) -> None:
+        """Tambahkan record yang baru ter-insert ke cache dedup (tanpa re-fetch)."""
+        if self._titles_cache is None:
+            return
+        for r in records:
+            title = r.get("title", "")
+            self._titles_cache.append(title)
+            self._lower_titles_cache.append(title.lower())
 
     def get_all_titles(self) -> List[str]:
-        if self._titles_cache is not None:
-            return self._titles_cache
-        resp = self._client.table("news").select("title").execute()
-        self._titles_cache = [r["title"] for r in resp.data]
+        self._load_dedup_caches()
         return self._titles_cache
 
+    def _get_lower_titles(self) -> List[str]:
+        self._load_dedup_caches()
+        return self._lower_titles_cache
+
     def stats(self) -> Dict[str, int]:
         try:
             resp = self._client.table("news_stats").select("*").execute()
@@ -117,31 +330,97 @@ class SupabaseDB:
         except Exception:
             pass
 
-        all_news = self.get_all()
-        raw = sum(1 for r in all_news if r.get("status") == "raw")
-        analyzed = sum(1 for r in all_news if r.get("status") == "analyzed")
-        return {"total": len(all_news), "raw": raw, "analyzed": analyzed}
+        # Fallback: COUNT via header Content-Range (head=True), tanpa menarik baris
+        return {
+            "total": self._count_news(),
+            "raw": self._count_news("raw"),
+            "analyzed": self._count_news("analyzed"),
+        }
+
+    def count(self) -> int:
+        """Total berita (satu COUNT head request, tanpa view stats)."""
+        try:
+            return self._count_news()
+        except Exception as exc:
+            logger.error("✗ Count news error: %s", exc)
+            return 0
+
+    def _count_news(self, status: Optional[str] = None) -> int:
+        query = self._client.table("news").select("id", count="exact", head=True)
+        if status:
+            query = query.eq("status", status)
+        return query.execute().count or 0
+
+    def get_source_counts(self) -> List[Dict[str, Any]]:
+        """
+        Jumlah berita per source: [{source_id, source_name, count}, ...].
+        Pakai view `news_source_stats` (GROUP BY di Postgres), fallback hitung
+        di client dari kolom source_id/source_name saja.
+        """
+        try:
+            resp = self._client.table("news_source_stats").select("*").execute()
+            if resp.data:
+                return [
+                    {
+                        "source_id": r.get("source_id"),
+                        "source_name": r.get("source_name", "Unknown"),
+                        "count": r.get("count", 0),
+                    }
+                    for r in resp.data
+                ]
+        except Exception:
+            pass
+
+        # Per halaman: satu select dipotong PostgREST di max-rows
+        counts: Dict[Any, Dict[str, Any]] = {}
+        for r in self._iter_rows("source_id,source_name"):
+            sid = r.get("source_id")
+            if sid not in counts:
+                counts[sid] = {
+                    "source_id": sid,
+                    "source_name": r.get("source_name", "Unknown"),
+                    "count": 0,
+                }
+            counts[sid]["count"] += 1
+        return list(counts.values())
+
+    def group_counts(
+        self, column: str, default: Optional[str] = None
+    ) -> Dict[str, int]:
+        """
+        Jumlah berita per nilai kolom (GROUP BY di Postgres via RPC `group_counts`).
+        Nilai NULL dihitung sebagai `default`, atau dilewati kalau default None.
+        Fallback: ambil kolom itu saja lalu hitung di client.
+        """
+        if column not in GROUPABLE_COLUMNS:
+            raise ValueError(f"Kolom tidak bisa di-group: {column}")
+
+        try:
+            resp = self._client.rpc("group_counts", {"col": column}).execute()
+            rows = [(r.get("key"), r.get("n", 0)) for r in resp.data or []]
+        except Exception:
+            rows = [(r.get(column), 1) for r in self._iter_rows(column)]
+
+        counts: Dict[str, int] = {}
+        for key, n in rows:
+            key = key or default
+            if key is not None:
+                counts[key] = counts.get(key, 0) + n
+        return counts
 
     # ==================================================================
     # News — Write
     # ==================================================================
 
-    def is_duplicate_url(self, url: str) -> bool:
-        return url in self.get_all_urls()
-
     def is_redundant_title(self, title: str) -> Tuple[bool, Optional[str]]:
-        for existing in self.get_all_titles():
-            if similarity(title, existing) >= SIMILARITY_THRESHOLD:
-                return True, existing
-        return False, None
+        idx = find_similar_title(title, self._get_lower_titles())
+        if idx is None:
+            return False, None
+        return True, self.get_all_titles()[idx]
 
     def save(self, record: Dict[str, Any]) -> bool:
         url = record.get("url", "")
 
-        if self.is_duplicate_url(url):
-            logger.warning("    ⚠ Duplicate URL: %s", url[:60])
-            return False
-
         is_redundant, matched = self.is_redundant_title(record.get("title", ""))
         if is_redundant:
             logger.warning(
@@ -151,19 +430,108 @@ class SupabaseDB:
             )
             return False
 
-        news_id = generate_id(url)
-        record["id"] = news_id
+        # Pakai id dari caller kalau sudah di-set (cmd_collect), jangan hash ulang
+        record["id"] = record.get("id") or generate_id(url)
         db_record = self._serialize_for_insert(record)
 
         try:
-            self._client.table("news").insert(db_record).execute()
-            self._urls_cache = None
-            self._titles_cache = None
+            # id = generate_id(url) → ON CONFLICT (id) DO NOTHING menolak URL duplikat
+            # secara atomik; response kosong berarti baris sudah ada.
+            resp = (
+                self._client.table("news")
+                .upsert(db_record, on_conflict="id", ignore_duplicates=True)
+                .execute()
+            )
+            if not resp.data:
+                logger.warning("    ⚠ Duplicate URL: %s", url[:60])
+                return False
+            self._remember_saved([record])
             return True
         except Exception as exc:
             logger.error("    ✗ DB insert failed: %s", exc)
             return False
 
+    def save_many(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Simpan banyak berita dengan UPSERT per NEWS_INSERT_CHUNK record.
+        Dedup judul dicek di sisi client, termasuk terhadap record lain dalam
+        batch yang sama; duplikat URL ditolak DB (ON CONFLICT (id) DO NOTHING).
+        Return record yang berhasil disimpan.
+        """
+        seen_ids = set()
+        self._load_dedup_caches()
+        titles = self._titles_cache
+        # Semua judul batch vs judul di DB dihitung sekali (batch, paralel);
+        # antar-record dalam batch dicek terpisah terhadap yang sudah diterima.
+        db_matches = find_similar_titles(
+            [r.get("title", "") for r in records], self._lower_titles_cache
+        )
+        batch_titles: List[str] = []
+        batch_lower: List[str] = []
+        accepted: List[Dict[str, Any]] = []
+
+        for record, db_idx in zip(records, db_matches):
+            url = record.get("url", "")
+            url_id = generate_id(url)
+            if url_id in seen_ids:
+                logger.warning("    ⚠ Duplicate URL: %s", url[:60])
+                continue
+
+            title = record.get("title", "")
+            if db_idx is not None:
+                matched = titles[db_idx]
+            else:
+                idx = find_similar_title(title, batch_lower)
+                matched = batch_titles[idx] if idx is not None else None
+            if matched is not None:
+                logger.warning(
+                    "    ⚠ Redundant (~%s): '%s'",
+                    f"{SIMILARITY_THRESHOLD:.0%}",
+                    matched[:50],
+                )
+                continue
+
+            record["id"] = record.get("id") or url_id
+            seen_ids.add(url_id)
+            batch_titles.append(title)
+            batch_lower.append(title.lower())
+            accepted.append(record)
+
+        if not accepted:
+            return []
+
+        # Per chunk: satu chunk gagal hanya melewatkan record chunk itu,
+        # record dari chunk lain yang sudah ter-insert tetap dikembalikan
+        inserted: List[Dict[str, Any]] = []
+        for start in range(0, len(accepted), NEWS_INSERT_CHUNK):
+            chunk = accepted[start:start + NEWS_INSERT_CHUNK]
+            try:
+                # ignore_duplicates: baris dengan id yang sudah ada (mis. collect paralel
+                # dari scheduler + /collect) dilewati, bukan menimpa hasil analisis.
+                # Response hanya berisi baris yang benar-benar ter-insert.
+                resp = (
+                    self._client.table("news")
+                    .upsert(
+                        [self._serialize_for_insert(r) for r in chunk],
+                        on_conflict="id",
+                        ignore_duplicates=True,
+                    )
+                    .execute()
+                )
+            except Exception as exc:
+                logger.error(
+                    "    ✗ DB batch insert failed (%d record dilewati): %s", len(chunk), exc
+                )
+                continue
+            inserted_ids = {r["id"] for r in resp.data or []}
+            for r in chunk:
+                if r["id"] in inserted_ids:
+                    inserted.append(r)
+                else:
+                    logger.warning("    ⚠ Duplicate URL: %s", r.get("url", "")[:60])
+        self._remember_saved(inserted)
+        return inserted
+
     def update(self, record: Dict[str, Any]) -> None:
         news_id = record.get("id")
         if not news_id:
@@ -174,8 +542,6 @@ class SupabaseDB:
 
         try:
             self._client.table("news").update(db_record).eq("id", news_id).execute()
-            self._urls_cache = None
-            self._titles_cache = None
         except Exception as exc:
             logger.error("    ✗ DB update failed: %s", exc)
 
@@ -191,10 +557,18 @@ class SupabaseDB:
                 "last_top_link": row.get("last_top_link"),
                 "last_scraped_at": row.get("last_scraped_at"),
                 "name": row.get("source_name", ""),
+                "etag": row.get("etag"),
+                "last_modified": row.get("last_modified"),
             }
         return state
 
-    def save_state(self, state: Dict[str, Any]) -> None:
+    def save_state(self, state: Dict[str, Any]) -> bool:
+        """
+        Upsert state dalam satu request per chunk (bukan satu per source).
+        Return False kalau ada chunk yang gagal disimpan.
+        """
+        ok = True
+        records = []
         for source_id, data in state.items():
             record = {
                 "source_id": str(source_id),
@@ -202,10 +576,33 @@ class SupabaseDB:
                 "last_scraped_at": data.get("last_scraped_at"),
                 "source_name": data.get("name", ""),
             }
+            if self._state_has_validators:
+                record["etag"] = data.get("etag")
+                record["last_modified"] = data.get("last_modified")
+            records.append(record)
+
+        for start in range(0, len(records), STATE_UPSERT_CHUNK):
+            chunk = records[start:start + STATE_UPSERT_CHUNK]
             try:
-                self._client.table("pipeline_state").upsert(record).execute()
+                self._client.table("pipeline_state").upsert(chunk).execute()
             except Exception as exc:
+                if self._state_has_validators and _is_missing_column(
+                    exc, "etag", "last_modified"
+                ):
+                    # Kolom etag/last_modified belum ada di pipeline_state → simpan tanpa itu
+                    logger.warning("    ⚠ pipeline_state tanpa kolom etag/last_modified: %s", exc)
+                    self._state_has_validators = False
+                    for record in records:
+                        record.pop("etag", None)
+                        record.pop("last_modified", None)
+                    try:
+                        self._client.table("pipeline_state").upsert(chunk).execute()
+                        continue
+                    except Exception as exc2:
+                        exc = exc2
                 logger.error("    ✗ State save failed: %s", exc)
+                ok = False
+        return ok
 
     # ==================================================================
     # Sources CRUD
@@ -313,13 +710,7 @@ class SupabaseDB:
 
         analysis = clean.pop("analysis", None)
         if analysis and isinstance(analysis, dict):
-            clean["analysis_summary"] = analysis.get("summary", "")
-            clean["analysis_sentiment"] = analysis.get("sentiment_direction", "")
-            clean["analysis_reasoning"] = analysis.get("sentiment_reasoning", "")
-            clean["analysis_category"] = analysis.get("category", "")
-            clean["analysis_ticker"] = analysis.get("ticker")
-            clean["analysis_tags"] = analysis.get("tags", [])
-            clean["analysis_key_data"] = analysis.get("key_data", [])
+            clean.update(_flatten_analysis(analysis))
 
         if clean.get("analyzed_at") is None:
             clean.pop("analyzed_at", None)
@@ -337,45 +728,68 @@ class SupabaseDB:
 
         analysis = record.get("analysis")
         if analysis and isinstance(analysis, dict):
-            update_data["analysis_summary"] = analysis.get("summary", "")
-            update_data["analysis_sentiment"] = analysis.get("sentiment_direction", "")
-            update_data["analysis_reasoning"] = analysis.get("sentiment_reasoning", "")
-            update_data["analysis_category"] = analysis.get("category", "")
-            update_data["analysis_ticker"] = analysis.get("ticker")
-            update_data["analysis_tags"] = analysis.get("tags", [])
-            update_data["analysis_key_data"] = analysis.get("key_data", [])
+            update_data.update(_flatten_analysis(analysis))
 
         return {k: v for k, v in update_data.items() if v is not None}
 
     def _deserialize(self, row: Dict[str, Any]) -> Dict[str, Any]:
-        record = dict(row)
-
-        if record.get("analysis_summary") or record.get("analysis_sentiment"):
-            record["analysis"] = {
-                "summary": record.get("analysis_summary", ""),
-                "sentiment_direction": record.get("analysis_sentiment", "neutral"),
-                "sentiment_reasoning": record.get("analysis_reasoning", ""),
-                "category": record.get("analysis_category", ""),
-                "ticker": record.get("analysis_ticker"),
-                "tags": record.get("analysis_tags", []),
-                "key_data": record.get("analysis_key_data", []),
+        # Row dari resp.data adalah dict hasil json.loads milik response ini
+        # sendiri (tidak di-share), jadi langsung di-extend tanpa dict(row) copy.
+        get = row.get
+        if get("analysis_summary") or get("analysis_sentiment"):
+            row["analysis"] = {
+                "summary": get("analysis_summary", ""),
+                "sentiment_direction": get("analysis_sentiment", "neutral"),
+                "sentiment_reasoning": get("analysis_reasoning", ""),
+                "category": get("analysis_category", ""),
+                "ticker": get("analysis_ticker"),
+                "tags": get("analysis_tags", []),
+                "key_data": get("analysis_key_data", []),
             }
         else:
-            record["analysis"] = None
+            row["analysis"] = None
 
-        return record
+        return row
     
     # ==================================================================
     # Subscribers CRUD
     # ==================================================================
 
+    def _optional_rpc(
+        self, name: str, params: Optional[Dict[str, Any]] = None
+    ) -> Tuple[bool, Any]:
+        """
+        Panggil RPC yang belum tentu ada di database.
+        Return (True, data) kalau berhasil; (False, None) kalau gagal — pemanggil
+        pakai fallback. Hanya RPC yang memang tidak ada yang tidak dicoba lagi;
+        error sementara (timeout, koneksi) dicoba lagi di panggilan berikutnya.
+        """
+        if name in self._missing_rpcs:
+            return False, None
+        try:
+            return True, self._client.rpc(name, params or {}).execute().data
+        except Exception as exc:
+            if _is_missing_function(exc):
+                logger.warning("    ⚠ RPC %s tidak tersedia: %s", name, exc)
+                self._missing_rpcs.add(name)
+            else:
+                logger.warning("    ⚠ RPC %s gagal, pakai fallback: %s", name, exc)
+            return False, None
+
     def get_subscribers(self) -> List[Dict[str, Any]]:
         """Ambil semua subscriber."""
         resp = self._client.table("subscribers").select("*").execute()
         return resp.data
 
     def get_active_subscribers(self) -> List[int]:
-        """Ambil chat_id subscriber aktif."""
+        """
+        Ambil chat_id subscriber aktif. Via RPC `active_chat_ids` (satu int[]
+        dari partial index subscribers WHERE active), fallback SELECT biasa.
+        """
+        ok, data = self._optional_rpc("active_chat_ids")
+        if ok:
+            return list(data or [])
+
         resp = (
             self._client.table("subscribers")
             .select("chat_id")
@@ -397,7 +811,21 @@ class SupabaseDB:
     def upsert_subscriber(
         self, chat_id: int, username: str = "", first_name: str = "", active: bool = True
     ) -> bool:
-        """Insert atau update subscriber. Return True jika baru."""
+        """
+        Insert atau update subscriber. Return True jika baru (atau aktif kembali).
+        Satu round-trip via RPC `upsert_subscriber` (INSERT ... ON CONFLICT yang
+        me-return apakah baris baru / sebelumnya nonaktif).
+        Fallback: SELECT lalu UPSERT.
+        """
+        ok, data = self._optional_rpc("upsert_subscriber", {
+            "p_chat_id": chat_id,
+            "p_username": username,
+            "p_first_name": first_name,
+            "p_active": active,
+        })
+        if ok:
+            return bool(data)
+
         existing = self.get_subscriber(chat_id)
         is_new = existing is None or not existing.get("active", True)
 
@@ -429,25 +857,34 @@ class SupabaseDB:
     # ============================= Delete Old News ==================================== #
     
     def delete_old_news(self, days: int = 3) -> int:
-        """Hapus berita yang lebih tua dari X hari berdasarkan published_at."""
-        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
-        cutoff_str = cutoff.isoformat()
-
+        """
+        Hapus berita yang lebih tua dari X hari berdasarkan published_at.
+        Hanya jumlah baris yang dikirim balik (RPC `delete_news_older`, atau
+        DELETE dengan Prefer: return=minimal + count=exact), bukan baris yang terhapus.
+        """
         try:
-            # Hapus data yang published_at < cutoff
-            resp = (
-                self._client.table("news")
-                .delete()
-                .lt("published_at", cutoff_str)
-                .execute()
-            )
-            deleted_count = len(resp.data) if resp.data else 0
+            ok, data = self._optional_rpc("delete_news_older", {"days": days})
+            if ok:
+                deleted_count = int(data or 0)
+            else:
+                from postgrest.types import CountMethod, ReturnMethod
+
+                cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+                # Hapus data yang published_at < cutoff
+                resp = (
+                    self._client.table("news")
+                    .delete(count=CountMethod.exact, returning=ReturnMethod.minimal)
+                    .lt("published_at", cutoff.isoformat())
+                    .execute()
+                )
+                deleted_count = resp.count or 0
             logger.info("🗑 Cleanup: %d news older than %d days deleted.", deleted_count, days)
-            
-            # Clear cache karena data berubah
-            self._urls_cache = None
-            self._titles_cache = None
-            
+
+            # Judul yang terhapus tidak diketahui → cache dedup di-resync saat dipakai lagi
+            if deleted_count:
+                self._titles_cache = None
+                self._lower_titles_cache = None
+
             return deleted_count
         except Exception as exc:
             logger.error("✗ Cleanup failed: %s", exc)
@@ -455,7 +892,33 @@ class SupabaseDB:
     
     # ============================= Search News ==================================== #
     def search_news(self, keyword: str) -> List[Dict[str, Any]]:
-        """Mencari berita berdasarkan keyword pada judul ATAU rss_summary."""
+        """
+        Mencari berita berdasarkan keyword pada judul ATAU rss_summary.
+        Pakai full-text search di kolom `search_tsv` (GIN index) kalau ada;
+        fallback ke ILIKE (sequential scan) kalau kolomnya belum dibuat.
+        """
+        if self._has_search_tsv:
+            try:
+                resp = (
+                    self._client.table("news")
+                    .select("*")
+                    # order() sebelum text_search(): builder hasil filter tidak punya .order()
+                    .order("published_at", desc=True)
+                    .text_search(
+                        "search_tsv", keyword,
+                        options={"type": "web_search", "config": "indonesian"},
+                    )
+                    .execute()
+                )
+                return [self._deserialize(r) for r in resp.data]
+            except Exception as exc:
+                if _is_missing_column(exc, "search_tsv"):
+                    logger.warning("    ⚠ Kolom search_tsv belum ada, pakai ILIKE: %s", exc)
+                    self._has_search_tsv = False
+                else:
+                    # Error sementara: ILIKE untuk kali ini saja, FTS dicoba lagi nanti
+                    logger.warning("    ⚠ Full-text search gagal, pakai ILIKE: %s", exc)
+
         try:
             resp = (
                 self._client.table("news")
@@ -467,6 +930,5 @@ class SupabaseDB:
             )
             return [self._deserialize(r) for r in resp.data]
         except Exception as exc:
-            from config import logger
             logger.error("✗ Search failed: %s", exc)
-            return []
\ No newline at end of file
+            return []
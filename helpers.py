@@ -4,58 +4,453 @@ Utility / Helper Functions
 
 from __future__ import annotations
 
+import atexit
+import calendar
 import hashlib
+import json
+import mmap
+import os
 import re
-from datetime import datetime, timezone
+import tempfile
+from datetime import datetime, timedelta, timezone
 from difflib import SequenceMatcher
-from typing import Any, Dict, Optional
+from fractions import Fraction
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from dateutil import parser as dateutil_parser
 
-from config import CLOUDFLARE_MARKERS
+from config import (
+    CLOUDFLARE_RE,
+    SIMILARITY_THRESHOLD,
+    TITLE_LSH_PERM,
+    TITLE_LSH_THRESHOLD,
+)
+
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:  # fallback ke difflib (pure Python, jauh lebih lambat)
+    fuzz = process = None
+
+try:
+    import httpx
+    import h2  # noqa: F401 — HTTP/2 di httpx butuh paket h2
+except ImportError:  # fallback ke requests.Session (HTTP/1.1 keep-alive)
+    httpx = None
+
+try:
+    import orjson
+except ImportError:  # fallback ke stdlib json
+    orjson = None
+
+try:
+    from datasketch import MinHash, MinHashLSH
+except ImportError:  # fallback ke scan linear find_similar_title
+    MinHash = MinHashLSH = None
+
+
+def json_loads(data: Any) -> Any:
+    """json.loads via orjson kalau ada (bytes/str). Error parse → ValueError."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_line(data: Any) -> bytes:
+    """Satu baris JSONL (compact, UTF-8, diakhiri newline); nilai non-JSON lewat str()."""
+    if orjson is not None:
+        return orjson.dumps(
+            data,
+            default=str,
+            option=orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_APPEND_NEWLINE,
+        )
+    return (json.dumps(data, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+
+_MMAP_MIN_BYTES = 64 * 1024  # file sebesar ini di-mmap (orjson parse langsung dari page cache)
+
+
+def read_json(path: Union[str, Path]) -> Any:
+    """
+    Parse file JSON langsung dari bytes (orjson kalau ada). Error parse → ValueError.
+    File besar di-mmap dan di-parse orjson lewat memoryview, tanpa salinan bytes;
+    stdlib json tidak menerima memoryview, jadi tanpa orjson tetap baca penuh.
+    """
+    with open(path, "rb") as f:
+        if orjson is None:
+            return json.loads(f.read())
+        if os.fstat(f.fileno()).st_size < _MMAP_MIN_BYTES:
+            return orjson.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+
+
+def write_json(path: Path, data: Any, pretty: bool = True) -> None:
+    """
+    Tulis JSON (indent 2 kalau pretty, else compact), UTF-8 apa adanya
+    (= ensure_ascii=False), nilai non-JSON lewat str(). Datetime juga lewat str()
+    supaya format file sama dengan versi stdlib.
+    Atomic: tulis ke temp file di folder yang sama lalu os.replace — crash di tengah
+    tulis tidak meninggalkan file setengah jadi (tanpa fsync; cukup untuk crash proses).
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        payload = orjson.dumps(data, default=str, option=option)
+    else:
+        payload = json.dumps(
+            data,
+            indent=2 if pretty else None,
+            separators=None if pretty else (",", ":"),
+            ensure_ascii=False,
+            default=str,
+        ).encode("utf-8")
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        # mkstemp selalu 0600 → samakan dengan file lama (atau 0644 untuk file baru)
+        try:
+            os.chmod(tmp, path.stat().st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(tmp, 0o644)
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
 
 
+@lru_cache(maxsize=8192)
 def generate_id(url: str) -> str:
-    """Generate short unique ID dari URL. 8 karakter hex."""
+    """
+    Generate short unique ID dari URL. 8 karakter hex (prefix MD5) — jangan
+    diganti hash lain: id record lama di DB/file dan link di Telegram ikut berubah.
+    """
     return hashlib.md5(url.encode()).hexdigest()[:8]
 
 
+@lru_cache(maxsize=8192)
+def normalize_url(url: str) -> str:
+    """
+    Bentuk kanonik URL untuk cek duplikat: scheme+host lowercase, fragment
+    dibuang, query diurutkan, trailing "/" di path dibuang. Hanya untuk
+    perbandingan — id tetap generate_id(url asli) supaya id lama tidak berubah.
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path.rstrip("/"),
+        query,
+        "",
+    ))
+
+
+BROWSER_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/131.0.0.0 Safari/537.36"
+)
+
+
+@lru_cache(maxsize=1)
+def get_http_session() -> requests.Session:
+    """
+    requests.Session bersama per proses (scrape artikel/PDF, IDX, feed):
+    koneksi keep-alive di-pool per host, bukan TCP+TLS handshake baru per URL.
+    Header spesifik (Accept, Referer, dll.) dikirim per request.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(total=2, backoff_factor=0.3),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = BROWSER_USER_AGENT
+    return session
+
+
+@lru_cache(maxsize=1)
+def get_http2_client() -> Optional[Any]:
+    """
+    httpx.Client HTTP/2 bersama per proses: request ke host yang sama (IDX,
+    portal berita) di-multiplex dalam satu koneksi. None kalau httpx/h2 tidak ada.
+    """
+    if httpx is None:
+        return None
+    client = httpx.Client(
+        http2=True,
+        follow_redirects=True,  # samakan dengan requests
+        headers={"User-Agent": BROWSER_USER_AGENT},
+        timeout=httpx.Timeout(15.0, connect=10.0),
+        transport=httpx.HTTPTransport(
+            http2=True,
+            retries=2,  # retry connect error saja
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        ),
+    )
+    atexit.register(client.close)
+    return client
+
+
+def http_get(url: str, **kwargs: Any) -> Any:
+    """
+    GET lewat client HTTP/2 kalau tersedia, else session requests. Response
+    dipakai lewat API yang sama di keduanya (status_code, headers, content, text).
+    """
+    client = get_http2_client()
+    if client is None:
+        return get_http_session().get(url, **kwargs)
+    return client.get(url, **kwargs)
+
+
+def http_download(
+    url: str, max_bytes: int, content_type: str = "", timeout: float = 30
+) -> Optional[bytes]:
+    """
+    GET streaming: status & content-type dicek sebelum body dibaca, body dibaca
+    per chunk sampai max_bytes. None kalau bukan 200, content-type tidak cocok,
+    atau body melebihi max_bytes (body terpotong tidak berguna).
+    """
+    client = get_http2_client()
+    if client is None:
+        ctx = get_http_session().get(url, stream=True, timeout=timeout)
+    else:
+        ctx = client.stream("GET", url, timeout=timeout)
+
+    with ctx as resp:
+        if resp.status_code != 200:
+            return None
+        if content_type and content_type not in resp.headers.get("content-type", "").lower():
+            return None
+        chunks = resp.iter_content(1 << 16) if client is None else resp.iter_bytes(1 << 16)
+        buf = bytearray()
+        for chunk in chunks:
+            buf += chunk
+            if len(buf) > max_bytes:
+                return None
+        return bytes(buf)
+
+
 def is_cloudflare_blocked(text: str) -> bool:
     """Cek apakah HTML response adalah Cloudflare challenge page."""
-    lower = text[:3000].lower()
-    return any(marker in lower for marker in CLOUDFLARE_MARKERS)
+    return CLOUDFLARE_RE.search(text, 0, 3000) is not None
+
+
+# 3+ newline → 2 newline, 2+ spasi/tab → 1 spasi; satu pass untuk keduanya
+_WHITESPACE_RE = re.compile(r"(\n{3,})|[ \t]{2,}")
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def _collapse_whitespace(m: "re.Match[str]") -> str:
+    return "\n\n" if m.group(1) else " "
 
 
 def clean_text(text: str) -> str:
     """Bersihkan whitespace berlebihan."""
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    text = re.sub(r"[ \t]{2,}", " ", text)
-    return text.strip()
+    return _WHITESPACE_RE.sub(_collapse_whitespace, text).strip()
 
 
 def strip_html(html: str) -> str:
     """Strip HTML tags, return plain text."""
-    return re.sub(r"<[^>]+>", " ", html).strip()
+    return _TAG_RE.sub(" ", html).strip()
+
+
+def html_to_text(html: str, cap: int) -> str:
+    """
+    clean_text(strip_html(html))[:cap] tanpa memproses seluruh HTML: cukup
+    prefix ~4×cap (tag tidak menambah teks); dokumen yang teksnya ternyata
+    kurang dari cap di prefix itu diproses penuh.
+    """
+    window = cap * 4
+    if len(html) > window:
+        head = html[:window]
+        lt = head.rfind("<")
+        if lt > head.rfind(">"):
+            head = head[:lt]  # jangan bawa tag yang terpotong di ujung
+        text = clean_text(strip_html(head))
+        if len(text) > cap:
+            return text[:cap]
+    return clean_text(strip_html(html))[:cap]
 
 
 def similarity(a: str, b: str) -> float:
     """Hitung similarity ratio antara 2 string."""
+    if fuzz is not None:
+        return fuzz.ratio(a.lower(), b.lower()) / 100
     return SequenceMatcher(None, a.lower(), b.lower()).ratio()
 
 
+# SIMILARITY_THRESHOLD sebagai pecahan int (0.75 → 3/4): batas panjang di loop
+# difflib jadi perbandingan int murni
+_THRESHOLD_NUM, _THRESHOLD_DEN = (
+    Fraction(SIMILARITY_THRESHOLD).limit_denominator(1000).as_integer_ratio()
+)
+
+
+def find_similar_title(title: str, titles_lower: List[str]) -> Optional[int]:
+    """
+    Cari judul yang mirip (>= SIMILARITY_THRESHOLD) di titles_lower (sudah lowercase).
+    Return index judul yang cocok atau None. Dengan rapidfuzz seluruh list
+    di-scan sekali di C, bukan satu SequenceMatcher per judul.
+    """
+    needle = title.lower()
+    if process is not None:
+        match = process.extractOne(
+            needle, titles_lower, scorer=fuzz.ratio,
+            score_cutoff=SIMILARITY_THRESHOLD * 100,
+        )
+        return match[2] if match else None
+    # Fallback difflib: pre-screen pakai upper bound murah sebelum ratio() yang
+    # mahal; kandidat yang jelas beda langsung gugur. Batas panjang
+    # (ratio <= 2*min/(n+m)) dicek inline sebagai perbandingan int — tanpa
+    # method call untuk mayoritas judul.
+    # needle tetap seq1 (urutan lama): ratio() SequenceMatcher tidak simetris,
+    # menukar seq1/seq2 bisa mengubah hasil cek redundan.
+    matcher = SequenceMatcher(None, needle)
+    n = len(needle)
+    num, den = _THRESHOLD_NUM, _THRESHOLD_DEN
+    threshold = SIMILARITY_THRESHOLD
+    for i, existing in enumerate(titles_lower):
+        m = len(existing)
+        if 2 * min(n, m) * den < num * (n + m):
+            continue
+        matcher.set_seq2(existing)
+        if matcher.quick_ratio() >= threshold and matcher.ratio() >= threshold:
+            return i
+    return None
+
+
+def find_similar_titles(
+    titles: List[str], titles_lower: List[str]
+) -> List[Optional[int]]:
+    """
+    Versi batch find_similar_title: satu index (atau None) per judul di titles.
+    Dengan rapidfuzz matriks skor dihitung sekali via process.cdist, paralel
+    di semua core (workers=-1). Butuh numpy; tanpa itu fallback per judul.
+    """
+    if process is not None and titles and titles_lower:
+        needles = [t.lower() for t in titles]
+        cutoff = SIMILARITY_THRESHOLD * 100
+        try:
+            scores = process.cdist(
+                needles, titles_lower, scorer=fuzz.ratio,
+                score_cutoff=cutoff, workers=-1,
+            )
+        except ImportError:
+            scores = None
+        if scores is not None:
+            result: List[Optional[int]] = []
+            for row in scores:
+                j = int(row.argmax())
+                result.append(j if row[j] >= cutoff else None)
+            return result
+    return [find_similar_title(t, titles_lower) for t in titles]
+
+
+def _title_minhash(title_lower: str) -> Any:
+    """MinHash dari shingle 3-karakter judul (judul < 3 karakter = satu shingle)."""
+    shingles = {title_lower[i:i + 3] for i in range(len(title_lower) - 2)} or {title_lower}
+    mh = MinHash(num_perm=TITLE_LSH_PERM)
+    mh.update_batch([s.encode("utf-8") for s in shingles])
+    return mh
+
+
+class TitleIndex:
+    """
+    Judul tersimpan (asli + lowercase) untuk cek redundan. Dengan datasketch,
+    kandidat MinHash-LSH dicek dulu (duplikat umumnya ketemu di sini); LSH
+    hanya pre-filter, jadi kalau tidak ada kandidat yang cocok tetap scan
+    exact penuh — hasil redundan/tidak sama persis dengan find_similar_title.
+    Index hasil find() = posisi di .titles.
+    """
+
+    def __init__(self, titles: Iterable[str] = ()) -> None:
+        self.titles: List[str] = []
+        self.titles_lower: List[str] = []
+        self._lsh = (
+            MinHashLSH(threshold=TITLE_LSH_THRESHOLD, num_perm=TITLE_LSH_PERM)
+            if MinHashLSH is not None
+            else None
+        )
+        for title in titles:
+            self.add(title)
+
+    def add(self, title: str) -> None:
+        lower = title.lower()
+        if self._lsh is not None:
+            self._lsh.insert(len(self.titles), _title_minhash(lower))
+        self.titles.append(title)
+        self.titles_lower.append(lower)
+
+    def find(self, title: str) -> Optional[int]:
+        if self._lsh is None:
+            return find_similar_title(title, self.titles_lower)
+        # Urut index → kalau lebih dari satu cocok, yang paling awal menang (sama dgn scan)
+        candidates = sorted(self._lsh.query(_title_minhash(title.lower())))
+        if candidates:
+            idx = find_similar_title(title, [self.titles_lower[i] for i in candidates])
+            if idx is not None:
+                return candidates[idx]
+        # Jaccard 3-gram bisa rendah walau ratio >= threshold → jangan andalkan LSH
+        return find_similar_title(title, self.titles_lower)
+
+
+_WIB = timezone(timedelta(hours=7))
+
+# Fast path "YYYY-MM-DD[T ]HH:MM:SS[.ffffff][Z|±HH:MM]" (Stockbit, sitemap, DB)
+# tanpa lewat dateutil
+_ISO_RE = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})"
+    r"(?:\.(\d{1,6})\d*)?\s*(Z|[+-]\d{2}:?\d{2})?"
+)
+
+
+def _parse_iso_fast(raw: str) -> Optional[datetime]:
+    m = _ISO_RE.fullmatch(raw.strip())
+    if not m:
+        return None
+    year, month, day, hour, minute, second, frac, tz = m.groups()
+    try:
+        dt = datetime(
+            int(year), int(month), int(day), int(hour), int(minute), int(second),
+            int(frac.ljust(6, "0")) if frac else 0,
+        )
+    except ValueError:
+        return None
+    if tz == "Z":
+        return dt.replace(tzinfo=timezone.utc)
+    if tz:
+        sign = -1 if tz[0] == "-" else 1
+        offset = timedelta(hours=int(tz[1:3]), minutes=int(tz[-2:]))
+        return dt.replace(tzinfo=timezone(sign * offset))
+    return dt
+
+
 def parse_published_date(entry: dict, source_type: str = "rss") -> str:
     """
     Parse tanggal publish dari RSS, IDX, atau Stockbit secara cerdas.
     Mencegah double-conversion timezone yang membuat waktu loncat.
     """
-    from datetime import datetime, timezone, timedelta
-    import re
-    
-    try:
-        from dateutil.parser import parse as dateutil_parse
-    except ImportError:
-        dateutil_parse = None
-
     # 1. Ambil raw string berdasarkan source_type
     if source_type == "stockbit_api":
         # Stockbit menggunakan 'created' (Contoh: "2026-02-14 13:00:08")
@@ -65,7 +460,6 @@ def parse_published_date(entry: dict, source_type: str = "rss") -> str:
     
     # 2. Cek apakah ini struct_time dari feedparser (Khusus RSS)
     if "published_parsed" in entry and entry["published_parsed"]:
-        import calendar
         ts = calendar.timegm(entry["published_parsed"])
         return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
     
@@ -74,7 +468,7 @@ def parse_published_date(entry: dict, source_type: str = "rss") -> str:
 
     # Definisi Timezone
     utc = timezone.utc
-    wib = timezone(timedelta(hours=7))
+    wib = _WIB
 
     # ---------------------------------------------------------
     # KHUSUS IDX API (Format Epoch Microsoft)
@@ -88,13 +482,13 @@ def parse_published_date(entry: dict, source_type: str = "rss") -> str:
     # ---------------------------------------------------------
     # PARSING STRING (Universal: IDX, Stockbit, RSS)
     # ---------------------------------------------------------
-    dt = None
+    dt = _parse_iso_fast(raw)
 
     # Cara 1: dateutil (Paling robust untuk format aneh)
-    if dateutil_parse:
+    if dt is None:
         try:
-            dt = dateutil_parse(raw)
-        except (ValueError, TypeError):
+            dt = dateutil_parser.parse(raw)
+        except (ValueError, TypeError, OverflowError):
             pass
 
     # Cara 2: Fallback Manual (Format "2026-02-14 13:00:08" masuk ke sini)
@@ -136,10 +530,16 @@ def parse_published_date(entry: dict, source_type: str = "rss") -> str:
         return dt.astimezone(utc).isoformat()
 
 
+@lru_cache(maxsize=4096)
+def _parse_iso_cached(iso_str: str) -> datetime:
+    """Parse ISO timestamp (hasil parse_published_date) — di-cache per string."""
+    return _parse_iso_fast(iso_str) or dateutil_parser.parse(iso_str)
+
+
 def time_ago(iso_str: str) -> str:
     """Convert ISO timestamp ke '2 jam lalu' format."""
     try:
-        dt = dateutil_parser.parse(iso_str)
+        dt = _parse_iso_cached(iso_str)
         now = datetime.now(timezone.utc)
         diff = now - dt
         minutes = int(diff.total_seconds() / 60)
@@ -155,53 +555,74 @@ def time_ago(iso_str: str) -> str:
     except Exception:
         return ""
 
-def format_published_date(date_str: str) -> str:
-    """Format tanggal publish ke format Indonesia yang readable dengan relative time."""
-    if not date_str:
-        return ""
 
-    try:
-        from datetime import datetime, timezone, timedelta
+_HARI = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
+_BULAN = [
+    "", "Jan", "Feb", "Mar", "Apr", "Mei", "Jun",
+    "Jul", "Agu", "Sep", "Okt", "Nov", "Des",
+]
+_DISPLAY_FORMATS = [
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%S.%f%z",
+    "%Y-%m-%dT%H:%M:%S+00:00",
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%Y-%m-%dT%H:%M:%S.%fZ",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S%z",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d",
+    "%a, %d %b %Y %H:%M:%S %z",
+    "%a, %d %b %Y %H:%M:%S %Z",
+]
+
+
+@lru_cache(maxsize=4096)
+def _display_date(date_str: str) -> Optional[Tuple[datetime, str]]:
+    """
+    Parse date_str → (datetime WIB, "Senin, 1 Jan 2026 · 10:00 WIB").
+    Di-cache per string; bagian relative ("5 menit lalu") tetap dihitung
+    tiap panggilan supaya selalu akurat.
+    """
+    dt = None
+    for fmt in _DISPLAY_FORMATS:
+        try:
+            dt = datetime.strptime(date_str.strip(), fmt)
+            break
+        except ValueError:
+            continue
 
-        dt = None
+    if dt is None:
+        try:
+            dt = dateutil_parser.parse(date_str)
+        except Exception:
+            return None
 
-        # ISO format (paling umum dari parse_published_date)
-        formats = [
-            "%Y-%m-%dT%H:%M:%S%z",
-            "%Y-%m-%dT%H:%M:%S.%f%z",
-            "%Y-%m-%dT%H:%M:%S+00:00",
-            "%Y-%m-%dT%H:%M:%SZ",
-            "%Y-%m-%dT%H:%M:%S.%fZ",
-            "%Y-%m-%dT%H:%M:%S",
-            "%Y-%m-%d %H:%M:%S%z",
-            "%Y-%m-%d %H:%M:%S",
-            "%Y-%m-%d",
-            "%a, %d %b %Y %H:%M:%S %z",
-            "%a, %d %b %Y %H:%M:%S %Z",
-        ]
+    # Pastikan ada timezone
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
 
-        for fmt in formats:
-            try:
-                dt = datetime.strptime(date_str.strip(), fmt)
-                break
-            except ValueError:
-                continue
+    # Convert ke WIB (UTC+7)
+    dt_wib = dt.astimezone(_WIB)
 
-        if dt is None:
-            try:
-                from dateutil.parser import parse as dateutil_parse
-                dt = dateutil_parse(date_str)
-            except Exception:
-                return date_str[:19]
+    # Format hari & bulan Indonesia
+    label = (
+        f"{_HARI[dt_wib.weekday()]}, {dt_wib.day} {_BULAN[dt_wib.month]} {dt_wib.year} "
+        f"· {dt_wib.strftime('%H:%M')} WIB"
+    )
+    return dt_wib, label
 
-        # Pastikan ada timezone
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
 
-        # Convert ke WIB (UTC+7)
-        wib = timezone(timedelta(hours=7))
-        dt_wib = dt.astimezone(wib)
-        now_wib = datetime.now(wib)
+def format_published_date(date_str: str) -> str:
+    """Format tanggal publish ke format Indonesia yang readable dengan relative time."""
+    if not date_str:
+        return ""
+
+    try:
+        parsed = _display_date(date_str)
+        if parsed is None:
+            return date_str[:19]
+        dt_wib, date_str_fmt = parsed
+        now_wib = datetime.now(_WIB)
 
         # Relative time
         diff = now_wib - dt_wib
@@ -227,22 +648,9 @@ def format_published_date(date_str: str) -> str:
         else:
             relative = None
 
-        # Format hari & bulan Indonesia
-        hari = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
-        bulan = [
-            "", "Jan", "Feb", "Mar", "Apr", "Mei", "Jun",
-            "Jul", "Agu", "Sep", "Okt", "Nov", "Des",
-        ]
-
-        day_name = hari[dt_wib.weekday()]
-        date_str_fmt = (
-            f"{day_name}, {dt_wib.day} {bulan[dt_wib.month]} {dt_wib.year} "
-            f"· {dt_wib.strftime('%H:%M')} WIB"
-        )
-
         if relative:
             return f"{date_str_fmt} ({relative})"
         return date_str_fmt
 
     except Exception:
-        return date_str[:19] if len(date_str) > 19 else date_str
\ No newline at end of file
+        return date_str[:19] if len(date_str) > 19 else date_str
@@ -5,88 +5,357 @@ LLM Client + Filter + Analysis
 from __future__ import annotations
 
 import json
-from typing import Any, Dict, List
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Deque, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
 
 from config import (
+    ANALYSIS_BATCH_CHARS,
+    ANALYSIS_MAX_CHARS,
+    GROQ_ANALYSIS_BATCH_MAX_TOKENS,
+    GROQ_ANALYSIS_BATCH_SIZE,
     GROQ_ANALYSIS_MAX_TOKENS,
     GROQ_FILTER_MAX_TOKENS,
+    GROQ_MAX_CONCURRENCY,
+    GROQ_MAX_RETRIES,
     GROQ_MODEL,
+    GROQ_RPM,
+    GROQ_TPM,
     MIN_CONTENT_LENGTH,
     VALID_CATEGORIES,
     VALID_SENTIMENTS,
     logger,
 )
+import llm_cache
 from scraper import scrape_article
 
+try:
+    from orjson import loads as _json_loads  # parser Rust, jauh lebih cepat
+except ImportError:  # fallback ke stdlib
+    _json_loads = json.loads
+
+try:
+    import msgspec
+except ImportError:  # fallback ke json + validasi manual per field
+    msgspec = None
+
 
 # ---------------------------------------------------------------------------
 # Groq Client
 # ---------------------------------------------------------------------------
 
 
+class _RateLimiter:
+    """
+    Jaga jarak antar request (RPM) + token bucket untuk TPM (thread-safe).
+    Token dipesan di muka dari estimasi (prompt/4 + max_tokens), maksimal
+    separuh TPM per request — estimasi max_tokens jauh di atas pemakaian
+    nyata, dan pesanan sebesar TPM penuh membuat semua worker antre satu per
+    satu. Setelah usage diketahui, settle() mengembalikan sisa pesanan (atau
+    menagih kekurangannya; saldo boleh minus → request berikutnya menunggu).
+    """
+
+    def __init__(self, rpm: int, tpm: int = 0) -> None:
+        self._interval = 60.0 / rpm
+        self._next_slot = 0.0
+        self._tpm = tpm
+        self._max_reserve = tpm // 2
+        self._tokens = float(tpm)
+        self._refilled_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self, tokens: int = 0) -> int:
+        """Tunggu slot RPM + pesan token; return jumlah token yang dipesan."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        if slot > now:
+            time.sleep(slot - now)
+        if not (self._tpm and tokens):
+            return 0
+        reserved = min(tokens, self._max_reserve)
+        self._take(reserved)
+        return reserved
+
+    def _take(self, tokens: int) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._tpm,
+                    self._tokens + (now - self._refilled_at) * self._tpm / 60.0,
+                )
+                self._refilled_at = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                delay = (tokens - self._tokens) * 60.0 / self._tpm
+            time.sleep(delay)
+
+    def refund(self, tokens: int) -> None:
+        if self._tpm and tokens > 0:
+            with self._lock:
+                self._tokens = min(self._tpm, self._tokens + tokens)
+
+    def settle(self, reserved: int, used: int) -> None:
+        """Selisih pesanan vs usage nyata: sisa dikembalikan, kekurangan ditagih."""
+        if self._tpm and reserved != used:
+            with self._lock:
+                self._tokens = min(self._tpm, self._tokens + reserved - used)
+
+    def penalize(self, seconds: float) -> None:
+        """Kena 429: tahan semua request berikutnya sampai retry-after lewat."""
+        with self._lock:
+            self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
+
+# Dipakai bersama oleh semua GroqClient dalam proses (limit Groq per API key)
+_groq_limiter = _RateLimiter(GROQ_RPM, GROQ_TPM)
+
+
+def _estimate_tokens(system_prompt: str, user_prompt: str, max_tokens: int) -> int:
+    # ~4 karakter per token untuk prompt, plus budget output penuh
+    return (len(system_prompt) + len(user_prompt)) // 4 + max_tokens
+
+
+def _retry_after(exc: Exception) -> float:
+    """Detik tunggu dari header retry-after respon 429 (default 5 detik)."""
+    response = getattr(exc, "response", None)
+    try:
+        return float(response.headers.get("retry-after", 5))
+    except (AttributeError, TypeError, ValueError):
+        return 5.0
+
+
+def _pooled_http_client() -> Optional[Any]:
+    """
+    httpx.Client long-lived dengan keep-alive pool (HTTP/2 kalau paket h2
+    terpasang) — request filter/analyze memakai ulang koneksi TLS ke Groq.
+    """
+    try:
+        import httpx
+    except ImportError:
+        return None
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+    return httpx.Client(
+        http2=http2,
+        limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60),
+        timeout=httpx.Timeout(60.0, connect=10.0),
+    )
+
+
 class GroqClient:
     def __init__(self, api_key: str) -> None:
         from groq import Groq
 
-        self._client = Groq(api_key=api_key)
+        # Retry 429 ditangani _create (lewat limiter bersama), bukan retry internal SDK
+        self._http = _pooled_http_client()
+        if self._http is not None:
+            self._client = Groq(api_key=api_key, http_client=self._http, max_retries=0)
+        else:
+            self._client = Groq(api_key=api_key, max_retries=0)
+
+    def close(self) -> None:
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+
+    def _create(
+        self, system_prompt: str, user_prompt: str, max_tokens: int, **kwargs: Any
+    ) -> Tuple[Any, int]:
+        """
+        chat.completions.create lewat rate limiter; 429 → tunggu retry-after
+        (berlaku untuk semua thread) lalu coba lagi. Error transien (koneksi,
+        timeout, 5xx) → exponential backoff + jitter. Return (resp, token dipesan).
+        """
+        from groq import APIConnectionError, InternalServerError, RateLimitError
+
+        estimate = _estimate_tokens(system_prompt, user_prompt, max_tokens)
+        for attempt in range(GROQ_MAX_RETRIES + 1):
+            reserved = _groq_limiter.wait(estimate)
+            try:
+                resp = self._client.chat.completions.create(
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    model=GROQ_MODEL,
+                    temperature=0.1,
+                    max_tokens=max_tokens,
+                    **kwargs,
+                )
+                return resp, reserved
+            except RateLimitError as exc:
+                _groq_limiter.refund(reserved)
+                if attempt == GROQ_MAX_RETRIES:
+                    raise
+                delay = _retry_after(exc)
+                logger.warning("    ⚠ Groq 429, retry dalam %.1f detik", delay)
+                _groq_limiter.penalize(delay)
+            except (APIConnectionError, InternalServerError) as exc:
+                _groq_limiter.refund(reserved)
+                if attempt == GROQ_MAX_RETRIES:
+                    raise
+                delay = random.uniform(1.0, min(30.0, 2.0 ** (attempt + 1)))
+                logger.warning(
+                    "    ⚠ Groq error transien (%s), retry dalam %.1f detik",
+                    type(exc).__name__, delay,
+                )
+                time.sleep(delay)
+        raise RuntimeError("unreachable")
+
+    # False setelah endpoint menolak json_schema → sisa proses pakai json_object
+    _schema_supported = True
 
     def chat(
-        self, system_prompt: str, user_prompt: str, max_tokens: int = 2048
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int = 2048,
+        schema: Optional[Dict[str, Any]] = None,
     ) -> str:
-        resp = self._client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            model=GROQ_MODEL,
-            temperature=0.1,
-            max_tokens=max_tokens,
-            response_format={"type": "json_object"},
-        )
+        """
+        schema: JSON Schema (strict) → decoding dibatasi grammar di sisi server,
+        output pasti sesuai skema. Tanpa schema / tidak didukung → JSON mode biasa.
+        """
+        if schema is not None and GroqClient._schema_supported:
+            from groq import BadRequestError
+
+            try:
+                resp, reserved = self._create(
+                    system_prompt, user_prompt, max_tokens,
+                    response_format={
+                        "type": "json_schema",
+                        "json_schema": {"name": "response", "strict": True, "schema": schema},
+                    },
+                )
+            except BadRequestError as exc:
+                if "json_schema" in str(exc) or "response_format" in str(exc):
+                    GroqClient._schema_supported = False
+                logger.warning("    ⚠ json_schema ditolak (%s), pakai JSON mode", exc)
+                return self.chat(system_prompt, user_prompt, max_tokens)
+        else:
+            resp, reserved = self._create(
+                system_prompt, user_prompt, max_tokens,
+                response_format={"type": "json_object"},
+            )
+        usage = getattr(resp, "usage", None)
+        if usage is not None and getattr(usage, "total_tokens", None):
+            _groq_limiter.settle(reserved, usage.total_tokens)
         return resp.choices[0].message.content
 
+    def chat_stream(
+        self, system_prompt: str, user_prompt: str, max_tokens: int = 2048
+    ) -> Iterator[str]:
+        """
+        Versi streaming dari chat(): yield potongan teks (delta) begitu datang.
+        JSON mode Groq tidak mendukung stream → tanpa response_format;
+        pemanggil mengekstrak objek JSON sendiri (_read_json_stream).
+        Pesanan token di-settle saat stream selesai/ditutup: pakai usage dari
+        chunk terakhir kalau ada, kalau tidak (berhenti lebih awal) estimasi
+        prompt + jumlah potongan yang sudah keluar (~1 token per potongan).
+        """
+        stream, reserved = self._create(system_prompt, user_prompt, max_tokens, stream=True)
+        used = _estimate_tokens(system_prompt, user_prompt, 0)
+        total = None
+        try:
+            for chunk in stream:
+                usage = getattr(chunk, "usage", None) or getattr(
+                    getattr(chunk, "x_groq", None), "usage", None
+                )
+                if usage is not None and getattr(usage, "total_tokens", None):
+                    total = usage.total_tokens
+                if chunk.choices:
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        used += 1
+                        yield delta
+        finally:
+            # Stop lebih awal (objek JSON sudah lengkap) → tutup koneksi stream
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+            _groq_limiter.settle(reserved, total or used)
+
+
+def _read_json_stream(chunks: Iterable[str], max_chunks: int) -> Optional[str]:
+    """
+    Baca stream sampai objek JSON top-level pertama lengkap (kurung kurawal
+    seimbang di luar string), lalu berhenti — sisa stream tidak ditunggu.
+    Teks sebelum '{' (mis. ```json) diabaikan. None kalau objek belum selesai
+    setelah max_chunks potongan / stream habis.
+    """
+    text = ""
+    start = -1
+    depth = 0
+    in_string = escaped = False
+    for n, chunk in enumerate(chunks, 1):
+        offset = len(text)
+        text += chunk
+        for i in range(offset, len(text)):
+            ch = text[i]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == "{":
+                if depth == 0:
+                    start = i
+                depth += 1
+            elif depth and ch == '"':
+                in_string = True
+            elif depth and ch == "}":
+                depth -= 1
+                if depth == 0:
+                    return text[start: i + 1]
+        if n >= max_chunks:
+            break
+    return None
+
+
+_open_clients: List[GroqClient] = []
+
+
+@lru_cache(maxsize=4)
+def get_groq_client(api_key: str) -> GroqClient:
+    """GroqClient per API key, dipakai ulang supaya koneksi HTTP (keep-alive) tidak dibuat ulang."""
+    client = GroqClient(api_key)
+    _open_clients.append(client)
+    return client
+
+
+def close_groq_clients() -> None:
+    """Tutup koneksi HTTP semua GroqClient yang di-cache (dipanggil saat shutdown)."""
+    for client in _open_clients:
+        client.close()
+    _open_clients.clear()
+    get_groq_client.cache_clear()
+
 
 # ---------------------------------------------------------------------------
 # Phase 3: LLM Filter (Split: Berita vs IDX)
 # ---------------------------------------------------------------------------
 
+# System prompt statis (tanpa interpolasi) di level modul: prefix request
+# identik byte-per-byte antar panggilan → prefix cache di sisi provider kena.
+# Semua bagian dinamis (jumlah item, daftar berita) hanya di user prompt.
 
-def filter_news_batch(
-    groq: GroqClient, entries: List[Dict[str, Any]]
-) -> List[Dict[str, Any]]:
-    """Router: pisah entries ke filter berita vs filter IDX."""
-    if not entries:
-        return []
-
-    news_entries = [e for e in entries if e.get("source_type") != "idx_api"]
-    idx_entries = [e for e in entries if e.get("source_type") == "idx_api"]
-
-    relevant: List[Dict[str, Any]] = []
-
-    if news_entries:
-        logger.info("  📰 Filtering %d berita...", len(news_entries))
-        relevant.extend(_filter_news(groq, news_entries))
-
-    if idx_entries:
-        logger.info("  📋 Filtering %d IDX announcements...", len(idx_entries))
-        relevant.extend(_filter_idx(groq, idx_entries))
-
-    return relevant
-
-
-def _filter_news(
-    groq: GroqClient, entries: List[Dict[str, Any]]
-) -> List[Dict[str, Any]]:
-    """Filter berita dari situs berita (RSS)."""
-    news_list = []
-    for i, e in enumerate(entries):
-        item = f'{i + 1}. [{e.get("_source_name", "")}] {e.get("title", "")}'
-        summary = e.get("_rss_summary", "")
-        if summary:
-            item += f"\n   {summary[:200]}"
-        news_list.append(item)
-
-    system = """Kamu editor berita keuangan Indonesia.
+_SYSTEM_FILTER_NEWS = """Kamu editor berita keuangan Indonesia.
 Filter berita yang RELEVAN untuk investor saham.
 
 RELEVAN:
@@ -110,40 +379,7 @@ TIDAK RELEVAN:
 
 SELALU respond valid JSON."""
 
-    user = f"""Berikut {len(entries)} berita:
-
-{chr(10).join(news_list)}
-
-Untuk SETIAP berita tentukan:
-1. relevant: true/false
-2. category: Market/Macro/Commodity/Sectoral/Corporate Action
-3. sentiment: bullish/bearish/neutral
-4. reason: alasan singkat (1 kalimat)
-
-JSON format:
-{{
-  "results": [
-    {{"index": 1, "relevant": true, "category": "Market", "sentiment": "bullish", "reason": "IHSG menguat"}},
-    {{"index": 2, "relevant": false, "category": null, "sentiment": null, "reason": "Berita hiburan"}}
-  ]
-}}"""
-
-    return _run_filter(groq, system, user, entries)
-
-
-def _filter_idx(
-    groq: GroqClient, entries: List[Dict[str, Any]]
-) -> List[Dict[str, Any]]:
-    """Filter keterbukaan informasi dari IDX."""
-    news_list = []
-    for i, e in enumerate(entries):
-        title = e.get("title", "")
-        attachments = e.get("_attachments", [])
-        att_count = len(attachments)
-        att_info = f" ({att_count} file)" if att_count > 0 else ""
-        news_list.append(f"{i + 1}. {title}{att_info}")
-
-    system = """Kamu analis pasar modal Indonesia.
+_SYSTEM_FILTER_IDX = """Kamu analis pasar modal Indonesia.
 Filter keterbukaan informasi IDX yang PENTING untuk investor.
 
 ═══ PENTING — LOLOSKAN ═══
@@ -176,9 +412,82 @@ Filter keterbukaan informasi IDX yang PENTING untuk investor.
 
 SELALU respond valid JSON."""
 
-    user = f"""Berikut {len(entries)} keterbukaan informasi IDX:
 
-{chr(10).join(news_list)}
+# Rule gate deterministik sebelum LLM: pola yang pasti buang / pasti loloskan
+# tidak perlu dikirim ke Groq. Sengaja sempit — kasus abu-abu tetap ke LLM.
+_REJECT_IDX = re.compile(
+    r"Laporan Bulanan Registrasi|Bukti Iklan"
+    r"|Penggunaan Dana Hasil Penawaran Umum"
+    r"|perubahan (alamat|logo|nama singkat)",
+    re.I,
+)
+_REJECT_NEWS = re.compile(
+    r"\b(sinetron|selebriti|seleb|sepak ?bola|zodiak|ramalan bintang|resep masakan)\b",
+    re.I,
+)
+# (pola, kategori) — berita yang otomatis relevan
+_ACCEPT_NEWS = (
+    (re.compile(r"\bIHSG\b"), "Market"),
+    (re.compile(r"\bBI[- ]?Rate\b|suku bunga acuan", re.I), "Macro"),
+)
+
+
+def _apply_rules(
+    entries: List[Dict[str, Any]],
+    reject: "re.Pattern[str]",
+    accept: Tuple[Tuple["re.Pattern[str]", str], ...] = (),
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Partisi entries berdasarkan judul: (lolos via rule, perlu LLM).
+    Entry yang kena reject dibuang dan tidak dikirim ke LLM.
+    """
+    accepted: List[Dict[str, Any]] = []
+    todo: List[Dict[str, Any]] = []
+    rejected = 0
+    for e in entries:
+        title = e.get("title", "")
+        for pattern, cat in accept:
+            if pattern.search(title):
+                e["_filter_category"] = cat
+                e["_filter_sentiment"] = "neutral"
+                e["_filter_reason"] = "rule: topik pasar inti"
+                accepted.append(e)
+                break
+        else:
+            if reject.search(title):
+                e["_filter_reason"] = "rule: tidak relevan / administratif rutin"
+                rejected += 1
+            else:
+                todo.append(e)
+
+    if accepted or rejected:
+        logger.info(
+            "  ⚡ Rule gate: %d lolos, %d dibuang, %d ke LLM",
+            len(accepted), rejected, len(todo),
+        )
+    return accepted, todo
+
+
+# Bagian statis user prompt filter: hanya jumlah item (%d) dan daftar yang berubah
+_USER_NEWS_HEAD = "Berikut %d berita:\n\n"
+_USER_NEWS_TAIL = """
+
+Untuk SETIAP berita tentukan:
+1. relevant: true/false
+2. category: Market/Macro/Commodity/Sectoral/Corporate Action
+3. sentiment: bullish/bearish/neutral
+4. reason: alasan singkat (1 kalimat)
+
+JSON format:
+{
+  "results": [
+    {"index": 1, "relevant": true, "category": "Market", "sentiment": "bullish", "reason": "IHSG menguat"},
+    {"index": 2, "relevant": false, "category": null, "sentiment": null, "reason": "Berita hiburan"}
+  ]
+}"""
+
+_USER_IDX_HEAD = "Berikut %d keterbukaan informasi IDX:\n\n"
+_USER_IDX_TAIL = """
 
 Untuk SETIAP item tentukan:
 1. relevant: true/false
@@ -187,14 +496,139 @@ Untuk SETIAP item tentukan:
 4. reason: alasan singkat (1 kalimat)
 
 JSON format:
-{{
+{
   "results": [
-    {{"index": 1, "relevant": true, "sub_category": "dividen", "sentiment": "bullish", "reason": "Pembagian dividen tunai"}},
-    {{"index": 2, "relevant": false, "sub_category": null, "sentiment": null, "reason": "Laporan bulanan registrasi rutin"}}
+    {"index": 1, "relevant": true, "sub_category": "dividen", "sentiment": "bullish", "reason": "Pembagian dividen tunai"},
+    {"index": 2, "relevant": false, "sub_category": null, "sentiment": null, "reason": "Laporan bulanan registrasi rutin"}
   ]
-}}"""
+}"""
+
+
+def filter_news_batch(
+    groq: GroqClient, entries: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Router: pisah entries ke filter berita vs filter IDX."""
+    if not entries:
+        return []
+
+    # Berita sindikasi (judul sama di beberapa feed) cukup dinilai sekali;
+    # duplikat mewarisi hasil filter salinan pertamanya.
+    entries, duplicates = _dedup_titles(entries)
+    if duplicates:
+        logger.info("  ♻ %d judul duplikat di batch, tidak dikirim ke LLM", len(duplicates))
+        return _inherit_filter(_route_filter(groq, entries), duplicates)
+    return _route_filter(groq, entries)
+
+
+_NON_WORD_RE = re.compile(r"\W+")
+_FILTER_FIELDS = (
+    "_filter_category", "_filter_sub_category", "_filter_sentiment",
+    "_filter_reason", "_is_lapkeu",
+)
+
 
-    return _run_filter(groq, system, user, entries, is_idx=True)
+def _title_key(title: str) -> str:
+    return _NON_WORD_RE.sub(" ", title.lower()).strip()
+
+
+def _dedup_titles(
+    entries: List[Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], List[Tuple[Dict[str, Any], Dict[str, Any]]]]:
+    """(entries unik, [(duplikat, salinan pertama), ...]) berdasarkan judul ternormalisasi."""
+    first: Dict[str, Dict[str, Any]] = {}
+    unique: List[Dict[str, Any]] = []
+    duplicates: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+    for e in entries:
+        key = _title_key(e.get("title", ""))
+        kept = first.get(key) if key else None
+        if kept is None:
+            if key:
+                first[key] = e
+            unique.append(e)
+        else:
+            duplicates.append((e, kept))
+    return unique, duplicates
+
+
+def _inherit_filter(
+    relevant: List[Dict[str, Any]],
+    duplicates: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+) -> List[Dict[str, Any]]:
+    """Tambahkan duplikat yang salinan pertamanya lolos filter (field _filter_* disalin)."""
+    passed = {id(e) for e in relevant}
+    for dup, kept in duplicates:
+        if id(kept) in passed:
+            for field in _FILTER_FIELDS:
+                if field in kept:
+                    dup[field] = kept[field]
+            relevant.append(dup)
+    return relevant
+
+
+def _route_filter(
+    groq: GroqClient, entries: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    news_entries = [e for e in entries if e.get("source_type") != "idx_api"]
+    idx_entries = [e for e in entries if e.get("source_type") == "idx_api"]
+
+    if news_entries:
+        logger.info("  📰 Filtering %d berita...", len(news_entries))
+    if idx_entries:
+        logger.info("  📋 Filtering %d IDX announcements...", len(idx_entries))
+
+    if news_entries and idx_entries:
+        # Dua request Groq independen → jalan bersamaan (I/O-bound);
+        # rate limiter GroqClient tetap menjaga RPM. Urutan hasil: berita, lalu IDX.
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="filter") as ex:
+            news_future = ex.submit(_filter_news, groq, news_entries)
+            idx_future = ex.submit(_filter_idx, groq, idx_entries)
+            return news_future.result() + idx_future.result()
+
+    if news_entries:
+        return _filter_news(groq, news_entries)
+    return _filter_idx(groq, idx_entries)
+
+
+def _filter_news(
+    groq: GroqClient, entries: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Filter berita dari situs berita (RSS)."""
+    accepted, entries = _apply_rules(entries, _REJECT_NEWS, _ACCEPT_NEWS)
+    if not entries:
+        return accepted
+
+    news_list = "\n".join(
+        f'{i}. [{e.get("_source_name", "")}] {e.get("title", "")}'
+        + (f"\n   {e['_rss_summary'][:200]}" if e.get("_rss_summary") else "")
+        for i, e in enumerate(entries, 1)
+    )
+
+    user = "".join((_USER_NEWS_HEAD % len(entries), news_list, _USER_NEWS_TAIL))
+
+    return accepted + _run_filter(
+        groq, _SYSTEM_FILTER_NEWS, user, entries, schema=_FILTER_NEWS_SCHEMA
+    )
+
+
+def _filter_idx(
+    groq: GroqClient, entries: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Filter keterbukaan informasi dari IDX."""
+    _, entries = _apply_rules(entries, _REJECT_IDX)
+    if not entries:
+        return []
+
+    news_list = "\n".join(
+        f'{i}. {e.get("title", "")}'
+        + (f' ({len(e["_attachments"])} file)' if e.get("_attachments") else "")
+        for i, e in enumerate(entries, 1)
+    )
+
+    user = "".join((_USER_IDX_HEAD % len(entries), news_list, _USER_IDX_TAIL))
+
+    return _run_filter(
+        groq, _SYSTEM_FILTER_IDX, user, entries, is_idx=True, schema=_FILTER_IDX_SCHEMA
+    )
 
 
 # def _run_filter(
@@ -241,20 +675,141 @@ JSON format:
 #         logger.error("  ✗ Filter error: %s", exc)
 #         return entries
 
+# JSON Schema (strict) untuk structured output Groq: semua field required,
+# nullable lewat union dengan "null", tanpa properti tambahan.
+def _strict_object(properties: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+def _results_schema(item: Dict[str, Any]) -> Dict[str, Any]:
+    return _strict_object({"results": {"type": "array", "items": item}})
+
+
+_NULLABLE_STR = {"type": ["string", "null"]}
+_CATEGORY_ENUM = sorted(VALID_CATEGORIES)
+_SENTIMENT_ENUM = sorted(VALID_SENTIMENTS)
+
+_FILTER_NEWS_SCHEMA = _results_schema(_strict_object({
+    "index": {"type": "integer"},
+    "relevant": {"type": "boolean"},
+    "category": {"type": ["string", "null"], "enum": _CATEGORY_ENUM + [None]},
+    "sentiment": {"type": ["string", "null"], "enum": _SENTIMENT_ENUM + [None]},
+    "reason": {"type": "string"},
+}))
+_FILTER_IDX_SCHEMA = _results_schema(_strict_object({
+    "index": {"type": "integer"},
+    "relevant": {"type": "boolean"},
+    "sub_category": _NULLABLE_STR,
+    "sentiment": {"type": ["string", "null"], "enum": _SENTIMENT_ENUM + [None]},
+    "reason": {"type": "string"},
+}))
+
+_ANALYSIS_PROPERTIES: Dict[str, Any] = {
+    "summary": {"type": "string"},
+    "sentiment_direction": {"type": "string", "enum": _SENTIMENT_ENUM},
+    "sentiment_reasoning": {"type": "string"},
+    "category": {"type": "string", "enum": _CATEGORY_ENUM},
+    "tags": {"type": "array", "items": {"type": "string"}},
+    "ticker": _NULLABLE_STR,
+    "key_data": {"type": "array", "items": {"type": "string"}},
+}
+_ANALYSIS_SCHEMA = _strict_object(_ANALYSIS_PROPERTIES)
+_BATCH_ANALYSIS_SCHEMA = _results_schema(
+    _strict_object({"index": {"type": "integer"}, **_ANALYSIS_PROPERTIES})
+)
+
+
+# Skema respon LLM: decode + validasi tipe dalam satu pass (C) kalau msgspec
+# terpasang. Respon yang menyimpang dari skema → jalur lenient (json + .get).
+if msgspec is not None:
+
+    class _FilterItem(msgspec.Struct):
+        index: int
+        relevant: bool = False
+        category: Optional[str] = None
+        sub_category: Optional[str] = None
+        sentiment: Optional[str] = None
+        reason: Optional[str] = ""
+
+    class _FilterPayload(msgspec.Struct):
+        results: List[_FilterItem] = []
+
+    class _AnalysisPayload(msgspec.Struct):
+        summary: str = ""
+        sentiment_direction: Optional[str] = None
+        sentiment_reasoning: str = ""
+        category: Optional[str] = None
+        tags: List[str] = []
+        ticker: Optional[str] = None
+        key_data: List[Any] = []
+
+    _filter_decoder = msgspec.json.Decoder(_FilterPayload)
+    _analysis_decoder = msgspec.json.Decoder(_AnalysisPayload)
+
+
+def _parse_filter_results(raw: str) -> Any:
+    """List item hasil filter (dict); bukan list kalau format LLM salah."""
+    if msgspec is not None:
+        try:
+            payload = _filter_decoder.decode(raw)
+            return [msgspec.structs.asdict(r) for r in payload.results]
+        except msgspec.DecodeError:
+            pass  # ada item menyimpang → jalur lenient (item rusak di-skip)
+    return _json_loads(raw).get("results", [])
+
+
+def _parse_analysis(raw: str) -> Dict[str, Any]:
+    if msgspec is not None:
+        try:
+            return msgspec.structs.asdict(_analysis_decoder.decode(raw))
+        except msgspec.DecodeError:
+            pass
+    return _json_loads(raw)
+
+
+# Satu objek string per kategori/sentimen: hasil decode LLM diganti instance
+# kanonik (interned) → semua entry berbagi objek yang sama, == jadi cek pointer.
+_CANONICAL: Dict[str, str] = {
+    v: sys.intern(v) for v in VALID_CATEGORIES | VALID_SENTIMENTS
+}
+
+
+def _valid_or(value: Any, valid: FrozenSet[str], default: Any) -> Any:
+    """Instance kanonik value kalau termasuk himpunan valid, else default."""
+    if isinstance(value, str) and value in valid:
+        return _CANONICAL[value]
+    return default
+
+
 def _run_filter(
     groq: GroqClient,
     system: str,
     user: str,
     entries: List[Dict[str, Any]],
     is_idx: bool = False,
+    schema: Optional[Dict[str, Any]] = None,
 ) -> List[Dict[str, Any]]:
     """Eksekusi LLM filter dan parse hasilnya."""
     try:
-        raw = groq.chat(system, user, max_tokens=GROQ_FILTER_MAX_TOKENS)
-        data = json.loads(raw)
+        cache_key = llm_cache.make_key(system, user)
+        raw = llm_cache.get(cache_key, llm_cache.FILTER_TTL)
+        if raw is None:
+            raw = groq.chat(
+                system, user, max_tokens=GROQ_FILTER_MAX_TOKENS, schema=schema
+            )
+            results_list = _parse_filter_results(raw)
+            llm_cache.put(cache_key, raw)
+        else:
+            logger.info("  ♻ Filter result from cache")
+            results_list = _parse_filter_results(raw)
 
         relevant = []
-        results_list = data.get("results", [])
+        seen = set()  # index yang sudah diproses (LLM kadang mengulang item)
         
         # PROTEKSI 1: Pastikan data 'results' benar-benar sebuah List
         if not isinstance(results_list, list):
@@ -267,7 +822,11 @@ def _run_filter(
                 logger.warning("  ⚠ Format item salah (bukan dictionary), item diabaikan.")
                 continue # Lewati item yang rusak, lanjut ke item berikutnya
             
-            idx = r.get("index", 0) - 1
+            idx = r.get("index", 0)
+            if not isinstance(idx, int) or idx in seen:
+                continue
+            seen.add(idx)
+            idx -= 1
             if 0 <= idx < len(entries) and r.get("relevant", False):
                 entry = entries[idx]
 
@@ -279,108 +838,328 @@ def _run_filter(
                     if sub in ("lapkeu_tahunan", "lapkeu_kuartal"):
                         entry["_is_lapkeu"] = True
                 else:
-                    cat = r.get("category", "Market")
-                    if cat not in VALID_CATEGORIES:
-                        cat = "Market"
-                    entry["_filter_category"] = cat
-
-                sentiment = r.get("sentiment", "neutral")
-                if sentiment not in VALID_SENTIMENTS:
-                    sentiment = "neutral"
-                entry["_filter_sentiment"] = sentiment
+                    entry["_filter_category"] = _valid_or(
+                        r.get("category"), VALID_CATEGORIES, "Market"
+                    )
+
+                entry["_filter_sentiment"] = _valid_or(
+                    r.get("sentiment"), VALID_SENTIMENTS, "neutral"
+                )
                 entry["_filter_reason"] = r.get("reason", "")
                 relevant.append(entry)
 
         return relevant
 
     except Exception as exc:
-        # Jika JSON gagal diparse sama sekali, fallback ke semua entries (sesuai kodemu sebelumnya)
-        logger.error("  ✗ Filter error: %s", exc)
-        return entries
+        # Retry transien sudah habis di GroqClient: jangan loloskan semua entries
+        # (buang budget scrape/analisis). Yang lolos rule gate sudah dikembalikan caller.
+        logger.error("  ✗ Filter error: %s — %d entries dibuang", exc, len(entries))
+        return []
 
 # ---------------------------------------------------------------------------
 # Phase 5: Deep Analysis
 # ---------------------------------------------------------------------------
 
-
-def analyze_single(groq: GroqClient, record: Dict[str, Any]) -> Dict[str, Any]:
-    """Analyze satu berita. Thread-safe (scraper handles its own browser)."""
-    url = record.get("url", "")
-    title = record.get("title", "")
-
-    logger.info("    📰 Scraping full article...")
-    content = scrape_article(url)
-
-    if not content or len(content) < MIN_CONTENT_LENGTH:
-        logger.warning("    ⚠ Using title + RSS summary")
-        content = f"{title}\n\n{record.get('rss_summary', '')}"
-
-    system_prompt = """Kamu adalah analis berita keuangan Indonesia yang berpengalaman.
+_SYSTEM_ANALYSIS = """Kamu adalah analis berita keuangan Indonesia yang berpengalaman.
 Analisis artikel berita ini secara mendalam.
 SELALU respond dengan valid JSON."""
 
-    user_prompt = f"""Analisis artikel berita keuangan berikut secara mendalam dan profesional.
-
-JUDUL: {title}
-
-ISI ARTIKEL:
-{content[:5000]}
-
-Respond dengan JSON format berikut:
-{{
-  "summary": "Tulis ringkasan naratif yang profesional dan informatif (3-5 paragraf pendek). Paragraf pertama berisi inti berita. Paragraf selanjutnya memuat detail penting seperti angka, data, dampak, dan konteks. Gunakan gaya jurnalistik yang mudah dipahami investor. Pisahkan paragraf dengan baris baru (\\n\\n). Jangan gunakan bullet point. Paragraf terakhir berisi kesimpulan implikasi bagi pasar atau investor.",
+# Spesifikasi field JSON + panduan summary, dipakai prompt single & batch
+_ANALYSIS_FIELDS = """  "summary": "Tulis ringkasan naratif yang profesional dan informatif (3-5 paragraf pendek). Paragraf pertama berisi inti berita. Paragraf selanjutnya memuat detail penting seperti angka, data, dampak, dan konteks. Gunakan gaya jurnalistik yang mudah dipahami investor. Pisahkan paragraf dengan baris baru (\\n\\n). Jangan gunakan bullet point. Paragraf terakhir berisi kesimpulan implikasi bagi pasar atau investor.",
   "sentiment_direction": "bullish/bearish/neutral",
   "sentiment_reasoning": "Jelaskan dalam 2-3 kalimat mengapa sentimen ini relevan bagi investor dan apa implikasinya terhadap pasar atau saham terkait.",
   "category": "Market/Macro/Commodity/Sectoral/Corporate Action/Disclosure",
   "tags": ["keyword1", "keyword2", "keyword3"],
   "ticker": "BBRI atau null (kode saham 4 huruf UPPERCASE jika relevan dengan emiten tertentu)",
-  "key_data": ["IHSG +1.22%", "Net buy asing Rp1.8T", "BI rate 5.75%"]
-}}
+  "key_data": ["IHSG +1.22%", "Net buy asing Rp1.8T", "BI rate 5.75%"]"""
 
-PANDUAN PENULISAN SUMMARY:
+_ANALYSIS_GUIDE = """PANDUAN PENULISAN SUMMARY:
 - Tulis seolah kamu analis riset yang menulis untuk klien investor
 - Sertakan angka dan data spesifik dari artikel
 - Jelaskan konteks dan dampak terhadap pasar/investor
 - Hindari kalimat generik, fokus pada fakta dan implikasi
 - Gunakan bahasa Indonesia yang profesional dan mudah dipahami"""
 
+# Bagian statis user prompt analisis (dirangkai dengan judul/isi saat call)
+_USER_ANALYSIS_HEAD = (
+    "Analisis artikel berita keuangan berikut secara mendalam dan profesional."
+    "\n\nJUDUL: "
+)
+_USER_ANALYSIS_MID = "\n\nISI ARTIKEL:\n"
+_USER_ANALYSIS_TAIL = f"""
+
+Respond dengan JSON format berikut:
+{{
+{_ANALYSIS_FIELDS}
+}}
+
+{_ANALYSIS_GUIDE}"""
+
+_USER_BATCH_HEAD = (
+    "Analisis %d artikel berita keuangan berikut secara mendalam dan profesional."
+    " Analisis SETIAP artikel secara terpisah.\n\n"
+)
+_USER_BATCH_TAIL = f"""
+
+Respond dengan JSON format berikut (satu objek per artikel, "index" = nomor ARTIKEL):
+{{
+  "results": [
+    {{
+  "index": 1,
+{_ANALYSIS_FIELDS}
+    }}
+  ]
+}}
+
+{_ANALYSIS_GUIDE}"""
+
+
+
+_BOILERPLATE_RE = re.compile(r"(Baca juga|Lihat juga|Ikuti kami|TAGS:)", re.I)
+_SIGNAL_RE = re.compile(r"[\d.,:;!?%()\"'-]")
+
+
+def _prep_content(content: str) -> str:
+    """
+    Buang chrome halaman sebelum masuk prompt: baris menu/navigasi pendek
+    (< 30 char tanpa angka/tanda baca), "Baca juga"/"TAGS:", dan whitespace berlebih.
+    Jendela ANALYSIS_MAX_CHARS jadi berisi isi artikel, bukan navigasi.
+    """
+    kept: List[str] = []
+    for raw_line in content.splitlines():
+        line = " ".join(raw_line.split())
+        if not line:
+            if kept and kept[-1]:
+                kept.append("")  # pertahankan satu baris kosong antar paragraf
+            continue
+        if _BOILERPLATE_RE.match(line):
+            continue
+        if len(line) < 30 and not _SIGNAL_RE.search(line):
+            continue
+        kept.append(line)
+    return "\n".join(kept).strip()
+
+
+def _scrape_content(record: Dict[str, Any]) -> str:
+    """Isi artikel untuk dianalisis; fallback ke judul + RSS summary."""
+    title = record.get("title", "")
+
+    logger.info("    📰 Scraping full article...")
+    content = scrape_article(record.get("url", ""))
+    if content:
+        content = _prep_content(content)
+
+    if not content or len(content) < MIN_CONTENT_LENGTH:
+        logger.warning("    ⚠ Using title + RSS summary")
+        content = f"{title}\n\n{record.get('rss_summary', '')}"
+    return content
+
+
+def _validate_analysis(
+    analysis: Dict[str, Any], record: Dict[str, Any]
+) -> Dict[str, Any]:
+    analysis["category"] = _valid_or(
+        analysis.get("category"), VALID_CATEGORIES, record.get("category", "Market")
+    )
+    analysis["sentiment_direction"] = _valid_or(
+        analysis.get("sentiment_direction"), VALID_SENTIMENTS, "neutral"
+    )
+
+    ticker = analysis.get("ticker")
+    if ticker and (not isinstance(ticker, str) or len(ticker) != 4):
+        ticker = None
+    analysis["ticker"] = ticker.upper() if ticker else None
+
+    tags = analysis.get("tags", [])
+    analysis["tags"] = (
+        [str(t).lower().strip() for t in tags if t]
+        if isinstance(tags, list)
+        else []
+    )
+
+    return analysis
+
+
+def _empty_analysis(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "summary": "",
+        "sentiment_direction": "neutral",
+        "sentiment_reasoning": "",
+        "category": record.get("category", "Market"),
+        "tags": [],
+        "ticker": None,
+        "key_data": [],
+    }
+
+
+def _analysis_cache_key(record: Dict[str, Any], content: str) -> str:
+    return llm_cache.make_key(
+        record.get("url", ""), record.get("title", ""), content[:2000]
+    )
+
+
+def _stream_analysis(groq: GroqClient, user_prompt: str) -> str:
+    """
+    Request analisis via streaming: berhenti begitu objek JSON lengkap, batalkan
+    kalau melewati ~1.1 × GROQ_ANALYSIS_MAX_TOKENS potongan. Stream gagal /
+    JSON tidak valid → ulang sekali dengan JSON mode biasa (non-stream).
+    """
     try:
-        raw = groq.chat(
-            system_prompt, user_prompt, max_tokens=GROQ_ANALYSIS_MAX_TOKENS
-        )
-        analysis = json.loads(raw)
-
-        cat = analysis.get("category", record.get("category", "Market"))
-        if cat not in VALID_CATEGORIES:
-            cat = record.get("category", "Market")
-        analysis["category"] = cat
-
-        direction = analysis.get("sentiment_direction", "neutral")
-        if direction not in VALID_SENTIMENTS:
-            direction = "neutral"
-        analysis["sentiment_direction"] = direction
-
-        ticker = analysis.get("ticker")
-        if ticker and (not isinstance(ticker, str) or len(ticker) != 4):
-            ticker = None
-        analysis["ticker"] = ticker.upper() if ticker else None
-
-        tags = analysis.get("tags", [])
-        analysis["tags"] = (
-            [str(t).lower().strip() for t in tags if t]
-            if isinstance(tags, list)
-            else []
+        raw = _read_json_stream(
+            groq.chat_stream(
+                _SYSTEM_ANALYSIS, user_prompt, max_tokens=GROQ_ANALYSIS_MAX_TOKENS
+            ),
+            max_chunks=int(GROQ_ANALYSIS_MAX_TOKENS * 1.1),
         )
+        if raw is not None:
+            _json_loads(raw)  # validasi sebelum dipakai / di-cache
+            return raw
+        logger.warning("    ⚠ Stream tanpa JSON lengkap, retry non-stream")
+    except Exception as exc:
+        logger.warning("    ⚠ Stream analysis gagal (%s), retry non-stream", exc)
+    return groq.chat(
+        _SYSTEM_ANALYSIS, user_prompt,
+        max_tokens=GROQ_ANALYSIS_MAX_TOKENS, schema=_ANALYSIS_SCHEMA,
+    )
+
 
-        return analysis
+def analyze_single(
+    groq: GroqClient,
+    record: Dict[str, Any],
+    use_cache: bool = True,
+    content: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Analyze satu berita. Thread-safe (scraper handles its own browser).
+    use_cache=False memaksa request baru ke LLM (mis. "analyze ulang").
+    content: isi artikel yang sudah di-scrape (skip scraping ulang).
+    """
+    title = record.get("title", "")
+    if content is None:
+        content = _scrape_content(record)
+
+    user_prompt = "".join(
+        (_USER_ANALYSIS_HEAD, title, _USER_ANALYSIS_MID,
+         content[:ANALYSIS_MAX_CHARS], _USER_ANALYSIS_TAIL)
+    )
+
+    try:
+        cache_key = _analysis_cache_key(record, content)
+        raw = llm_cache.get(cache_key, llm_cache.ANALYSIS_TTL) if use_cache else None
+        if raw is None:
+            raw = _stream_analysis(groq, user_prompt)
+            analysis = _parse_analysis(raw)
+            llm_cache.put(cache_key, raw)
+        else:
+            logger.info("    ♻ Analysis from cache")
+            analysis = _parse_analysis(raw)
+
+        return _validate_analysis(analysis, record)
     except Exception as exc:
         logger.error("    ✗ Analysis error: %s", exc)
-        return {
-            "summary": "",
-            "sentiment_direction": "neutral",
-            "sentiment_reasoning": "",
-            "category": record.get("category", "Market"),
-            "tags": [],
-            "ticker": None,
-            "key_data": [],
-        }
\ No newline at end of file
+        return _empty_analysis(record)
+
+
+def analyze_batch(
+    groq: GroqClient, records: List[Dict[str, Any]], use_cache: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Analyze beberapa berita dalam SATU request Groq (results[] per artikel,
+    pola yang sama dengan filter). Isi artikel dipotong ANALYSIS_BATCH_CHARS.
+    Artikel yang tidak ada di respon (atau JSON gagal) di-analyze satu per satu.
+    Return analysis sejajar dengan records.
+    """
+    if len(records) == 1:
+        return [analyze_single(groq, records[0], use_cache=use_cache)]
+
+    contents = [_scrape_content(r) for r in records]
+    keys = [_analysis_cache_key(r, c) for r, c in zip(records, contents)]
+    results: List[Optional[Dict[str, Any]]] = [None] * len(records)
+
+    if use_cache:
+        for i, key in enumerate(keys):
+            raw = llm_cache.get(key, llm_cache.ANALYSIS_TTL)
+            if raw is not None:
+                try:
+                    results[i] = _validate_analysis(_parse_analysis(raw), records[i])
+                except ValueError:
+                    pass
+
+    todo = [i for i, r in enumerate(results) if r is None]
+    if todo:
+        blocks = "\n\n".join(
+            f"=== ARTIKEL {n} ===\nJUDUL: {records[i].get('title', '')}\n\n"
+            f"ISI ARTIKEL:\n{contents[i][:ANALYSIS_BATCH_CHARS]}"
+            for n, i in enumerate(todo, 1)
+        )
+        user_prompt = "".join(
+            (_USER_BATCH_HEAD % len(todo), blocks, _USER_BATCH_TAIL)
+        )
+
+        try:
+            raw = groq.chat(
+                _SYSTEM_ANALYSIS, user_prompt,
+                max_tokens=min(
+                    GROQ_ANALYSIS_MAX_TOKENS * len(todo), GROQ_ANALYSIS_BATCH_MAX_TOKENS
+                ),
+                schema=_BATCH_ANALYSIS_SCHEMA,
+            )
+            items = _json_loads(raw).get("results", [])
+            if not isinstance(items, list):
+                raise ValueError("results bukan list")
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                n = item.pop("index", 0)
+                if isinstance(n, int) and 1 <= n <= len(todo):
+                    i = todo[n - 1]
+                    if results[i] is None:
+                        llm_cache.put(keys[i], json.dumps(item, ensure_ascii=False))
+                        results[i] = _validate_analysis(item, records[i])
+        except Exception as exc:
+            logger.error("    ✗ Batch analysis error: %s", exc)
+
+    for i, r in enumerate(results):
+        if r is None:
+            logger.warning(
+                "    ⚠ [%s] missing from batch, analyzing alone",
+                records[i].get("id", "?"),
+            )
+            results[i] = analyze_single(
+                groq, records[i], use_cache=use_cache, content=contents[i]
+            )
+    return results  # type: ignore[return-value]
+
+
+def analyze_many(
+    groq: GroqClient,
+    records: Iterable[Dict[str, Any]],
+    use_cache: bool = True,
+    workers: int = GROQ_MAX_CONCURRENCY,
+    batch_size: int = GROQ_ANALYSIS_BATCH_SIZE,
+) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Analyze banyak berita paralel; yield (record, analysis) sesuai urutan input.
+    Tiap job menganalisis batch_size berita dalam satu request (analyze_batch).
+    records boleh iterator/stream — maksimal 2 × workers job in-flight.
+    Jarak antar request Groq tetap dijaga _groq_limiter.
+    """
+    def _run(batch: List[Tuple[int, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        for i, record in batch:
+            logger.info("[%d] [%s] %s", i, record.get("id", "?"), record.get("title", "")[:70])
+        return analyze_batch(groq, [r for _, r in batch], use_cache=use_cache)
+
+    numbered = enumerate(records, 1)
+    pending: Deque[Tuple[List[Dict[str, Any]], Future]] = deque()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analyze") as ex:
+        while True:
+            batch = list(islice(numbered, max(1, batch_size)))
+            if not batch:
+                break
+            pending.append(([r for _, r in batch], ex.submit(_run, batch)))
+            if len(pending) >= workers * 2:
+                batch_records, future = pending.popleft()
+                yield from zip(batch_records, future.result())
+        while pending:
+            batch_records, future = pending.popleft()
+            yield from zip(batch_records, future.result())
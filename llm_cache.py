@@ -0,0 +1,69 @@
+"""
+LLM Response Cache — SQLite exact-match cache untuk respon Groq.
+Prompt yang identik (batch filter yang sama, artikel yang sama) tidak
+dikirim ulang ke LLM selama masih dalam TTL.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from config import LLM_CACHE_FILE, logger
+
+FILTER_TTL = 24 * 3600  # detik
+ANALYSIS_TTL = 7 * 24 * 3600
+
+_conn: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+
+def _connect() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(str(LLM_CACHE_FILE), check_same_thread=False)
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, payload TEXT NOT NULL, ts INTEGER NOT NULL)"
+        )
+        # Buang entry yang sudah lewat TTL terpanjang sekali saat startup
+        _conn.execute(
+            "DELETE FROM llm_cache WHERE ts < ?", (int(time.time()) - ANALYSIS_TTL,)
+        )
+        _conn.commit()
+    return _conn
+
+
+def make_key(*parts: str) -> str:
+    return hashlib.sha1("\n".join(parts).encode()).hexdigest()
+
+
+def get(key: str, ttl: int) -> Optional[str]:
+    """Return payload untuk key kalau ada dan belum expired, else None."""
+    try:
+        with _lock:
+            row = _connect().execute(
+                "SELECT payload, ts FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+    except sqlite3.Error as exc:
+        logger.warning("    ⚠ LLM cache read failed: %s", exc)
+        return None
+    if row is None or time.time() - row[1] > ttl:
+        return None
+    return row[0]
+
+
+def put(key: str, payload: str) -> None:
+    try:
+        with _lock:
+            conn = _connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, payload, ts) VALUES (?, ?, ?)",
+                (key, payload, int(time.time())),
+            )
+            conn.commit()
+    except sqlite3.Error as exc:
+        logger.warning("    ⚠ LLM cache write failed: %s", exc)
@@ -23,6 +23,8 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from config import load_env, logger
 from browser import BrowserManager
+import notifier
+from llm import close_groq_clients
 from commands import cmd_collect, cmd_list, cmd_analyze, cmd_stats
 
 
@@ -95,4 +97,7 @@ if __name__ == "__main__":
         logger.critical("Unhandled exception:\n%s", traceback.format_exc())
         sys.exit(1)
     finally:
-        BrowserManager.close()
\ No newline at end of file
+        # Tunggu notifikasi Telegram yang masih antri sebelum proses exit
+        notifier.drain()
+        BrowserManager.close()
+        close_groq_clients()
\ No newline at end of file
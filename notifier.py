@@ -0,0 +1,43 @@
+"""
+Notifier — Antrian notifikasi Telegram di background thread.
+collect / analyze cukup enqueue lalu lanjut, tidak menunggu round-trip Telegram.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Any, Callable, Optional, Tuple
+
+from config import logger
+
+_queue: "queue.Queue[Tuple[Callable[..., Any], Tuple[Any, ...]]]" = queue.Queue()
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+
+def _worker() -> None:
+    while True:
+        func, args = _queue.get()
+        try:
+            func(*args)
+        except Exception as exc:
+            logger.warning("Telegram notification failed: %s", exc)
+        finally:
+            _queue.task_done()
+
+
+def enqueue(func: Callable[..., Any], *args: Any) -> None:
+    """Jadwalkan func(*args) di worker thread (urutan FIFO dipertahankan)."""
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_worker, daemon=True, name="notify-queue")
+            _thread.start()
+    _queue.put((func, args))
+
+
+def drain() -> None:
+    """Tunggu semua notifikasi terkirim (panggil sebelum proses CLI exit)."""
+    if _thread is not None:
+        _queue.join()
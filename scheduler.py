@@ -7,16 +7,23 @@ from __future__ import annotations
 
 import time
 import threading
-import schedule
 from datetime import datetime, timezone, timedelta
+from typing import Optional
 
 from config import logger, load_env
 
+COLLECT_INTERVAL = 5 * 60  # detik
+STARTUP_DELAY = 10  # delay run pertama biar bot siap
+
+# Di-set saat shutdown → loop scheduler berhenti tanpa menunggu interval habis
+stop = threading.Event()
+
 
 def _job_collect() -> None:
     """Jalankan collect dan notify jika ada berita baru."""
     from store import get_store
     from commands import cmd_collect
+    import cache
 
     try:
         wib = timezone(timedelta(hours=7))
@@ -24,18 +31,18 @@ def _job_collect() -> None:
         logger.info("⏰ [Scheduler] Running collect job at %s", now)
 
         store = get_store()
-        before = store.stats().get("total", 0)
+        before = store.count()
 
         groq_api_key = load_env()
         cmd_collect(groq_api_key)
 
-        # Cek berita baru
-        store = get_store()
-        after = store.stats().get("total", 0)
+        # Cek berita baru (handle store yang sama)
+        after = store.count()
         new_count = after - before
 
         if new_count > 0:
             logger.info("⏰ [Scheduler] %d berita baru ditemukan!", new_count)
+            cache.invalidate_all()
             # Notifikasi sudah dihandle di cmd_collect → notify_new_articles
         else:
             logger.info("⏰ [Scheduler] Tidak ada berita baru.")
@@ -45,24 +52,41 @@ def _job_collect() -> None:
 
 
 def _run_scheduler() -> None:
-    """Loop scheduler (blocking, jalankan di thread)."""
+    """Loop scheduler (blocking, jalankan di thread). Berhenti saat stop di-set."""
     logger.info("⏰ Scheduler started — collect setiap 5 menit")
 
-    # Jalankan pertama kali saat startup (delay 10 detik biar bot siap)
-    time.sleep(10)
-    _job_collect()
-
-    # Schedule tiap 5 menit
-    schedule.every(5).minutes.do(_job_collect)
+    # Jadwal absolut (monotonic) → tidak drift walau job makan waktu lama
+    next_run = time.monotonic() + STARTUP_DELAY
+    while not stop.wait(max(0.0, next_run - time.monotonic())):
+        _job_collect()
+        next_run += COLLECT_INTERVAL
+        # Job lebih lama dari interval: jangan kejar run yang terlewat
+        now = time.monotonic()
+        if next_run < now:
+            next_run = now
 
-    while True:
-        schedule.run_pending()
-        time.sleep(30)
+    logger.info("⏰ Scheduler stopped")
 
 
 def start_scheduler() -> threading.Thread:
     """Start scheduler di background thread."""
+    stop.clear()
     t = threading.Thread(target=_run_scheduler, daemon=True, name="scheduler")
     t.start()
     logger.info("⏰ Scheduler thread started (daemon)")
-    return t
\ No newline at end of file
+    return t
+
+
+def stop_scheduler(thread: threading.Thread, timeout: Optional[float] = None) -> None:
+    """
+    Minta loop scheduler berhenti dan tunggu job collect yang sedang jalan
+    sampai selesai (default tanpa batas). Dengan timeout, thread yang masih
+    jalan setelahnya ditinggal (daemon) — collect-nya terpotong saat proses exit.
+    """
+    stop.set()
+    thread.join(timeout)
+    if thread.is_alive():
+        logger.warning(
+            "⏰ Scheduler belum berhenti setelah %.0f detik; collect yang sedang jalan ditinggal",
+            timeout,
+        )
@@ -5,16 +5,42 @@ Supports both sync (CLI) and async (Telegram bot) contexts.
 
 from __future__ import annotations
 
-import base64
+import atexit
+import multiprocessing
 import os
+import queue
+import re
 import tempfile
-from io import BytesIO
-from typing import Optional
-
-import requests
-
-from config import MIN_CONTENT_LENGTH, logger
-from helpers import clean_text, generate_id, is_cloudflare_blocked
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+from config import (
+    BROWSER_BLOCKED_RESOURCES,
+    BROWSER_CONTEXT_REUSE,
+    BROWSER_POOL_SIZE,
+    MIN_CONTENT_LENGTH,
+    PDF_MAX_BYTES,
+    PDF_PARALLEL_MIN_PAGES,
+    PDF_WORKERS,
+    SCRAPE_MAX_CHARS,
+    logger,
+)
+from helpers import (
+    BROWSER_USER_AGENT,
+    clean_text,
+    generate_id,
+    http_download,
+    http_get,
+    is_cloudflare_blocked,
+)
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # fallback ke BeautifulSoup
+    LexborHTMLParser = None
 
 
 # ---------------------------------------------------------------------------
@@ -22,17 +48,54 @@ from helpers import clean_text, generate_id, is_cloudflare_blocked
 # ---------------------------------------------------------------------------
 
 
+def _extract_page_range(pdf_bytes: bytes, start: int, stop: int) -> str:
+    """Teks halaman [start, stop) — dijalankan di proses worker (Document sendiri)."""
+    import fitz
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        return "\n".join(doc[pno].get_text("text", sort=False) for pno in range(start, stop))
+
+
+@lru_cache(maxsize=1)
+def _pdf_process_pool() -> ProcessPoolExecutor:
+    # spawn: jangan fork proses yang sedang memegang thread Playwright/executor
+    pool = ProcessPoolExecutor(
+        max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn")
+    )
+    atexit.register(pool.shutdown, wait=False, cancel_futures=True)
+    return pool
+
+
 def extract_pdf_text_from_bytes(pdf_bytes: bytes) -> str:
     import fitz
-    text_parts = []
-    with fitz.open(stream=BytesIO(pdf_bytes), filetype="pdf") as doc:
-        for pg in doc:
-            text_parts.append(pg.get_text())
-    return clean_text("\n".join(text_parts))
+    # bytes langsung ke fitz (tanpa salinan BytesIO); mode "text" polos, tanpa sort
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        page_count = doc.page_count
+        if page_count < PDF_PARALLEL_MIN_PAGES or PDF_WORKERS < 2:
+            return clean_text(
+                "\n".join(pg.get_text("text", sort=False) for pg in doc)
+            )
+
+    # PDF besar (lapkeu 50-200 halaman): PyMuPDF tidak thread-safe & memegang GIL,
+    # jadi dibagi per rentang halaman ke beberapa proses, digabung sesuai urutan
+    step = -(-page_count // PDF_WORKERS)
+    starts = range(0, page_count, step)
+    stops = [min(start + step, page_count) for start in starts]
+    try:
+        parts = _pdf_process_pool().map(
+            _extract_page_range, [pdf_bytes] * len(starts), starts, stops
+        )
+        return clean_text("\n".join(parts))
+    except Exception as exc:
+        logger.warning("    ⚠ Parallel PDF extraction failed (%s), serial", exc)
+        return clean_text(_extract_page_range(pdf_bytes, 0, page_count))
+
+
+# ".pdf" di akhir path (boleh diikuti ?query / #fragment) atau segmen /pdf/
+_PDF_URL_RE = re.compile(r"\.pdf(?:[?#]|$)|/pdf/", re.I)
 
 
 def is_pdf_url(url: str) -> bool:
-    return url.lower().endswith(".pdf") or "/pdf/" in url.lower()
+    return _PDF_URL_RE.search(url) is not None
 
 
 # ---------------------------------------------------------------------------
@@ -69,57 +132,181 @@ ARTICLE_SELECTORS = [
     "article",
 ]
 
+# Host → selector yang memang dipakai situs itu (dicoba duluan, sisanya fallback)
+_HOST_SELECTORS: Dict[str, Tuple[str, ...]] = {
+    "bloombergtechnoz": ("div.detail-in",),
+    "detik.com": (".detail__body-text",),
+    "kompas.com": (".read__content",),
+}
+_HOST_SELECTOR_IDX = {
+    host: tuple(ARTICLE_SELECTORS.index(sel) for sel in sels)
+    for host, sels in _HOST_SELECTORS.items()
+}
+# Host → index selector yang terakhir berhasil (dipelajari saat jalan)
+_learned_selector: Dict[str, int] = {}
+
+
+def _selector_order(host: str) -> List[int]:
+    """Index ARTICLE_SELECTORS: selector terakhir yang berhasil + hint host dulu, lalu urutan asli."""
+    preferred: List[int] = []
+    if host:
+        learned = _learned_selector.get(host)
+        if learned is not None:
+            preferred.append(learned)
+        for key, idxs in _HOST_SELECTOR_IDX.items():
+            if key in host:
+                preferred.extend(idxs)
+    if not preferred:
+        return list(range(len(ARTICLE_SELECTORS)))
+    preferred = list(dict.fromkeys(preferred))
+    rest = set(preferred)
+    return preferred + [i for i in range(len(ARTICLE_SELECTORS)) if i not in rest]
+
+
+_NOISE_TAGS = ["script", "style", "nav", "aside", "footer", "iframe", "noscript"]
+_NOISE_CLASSES = [
+    "related", "banner", "ads", "promo", "social",
+    "share", "comment", "sidebar", "widget", "tag",
+]
+# Versi CSS dari filter noise di atas: pencocokan substring class dikerjakan C.
+# Flag " i": selector atribut Lexbor case-sensitive, filter bs4 me-lowercase
+# class dulu ("RelatedNews" harus tetap kena)
+_NOISE_CSS = ",".join(_NOISE_TAGS + [f'[class*="{c}" i]' for c in _NOISE_CLASSES])
+
+
+def _extract_with_lexbor(
+    html_content: str, order: Sequence[int]
+) -> Tuple[Optional[str], Optional[int]]:
+    """_extract_from_selectors versi selectolax (Lexbor): logika sama, tanpa objek bs4."""
+    tree = LexborHTMLParser(html_content)
+
+    for i in order:
+        el = tree.css_first(ARTICLE_SELECTORS[i])
+        if el is None:
+            continue
+
+        # Remove noise + ads / related articles
+        for node in el.css(_NOISE_CSS):
+            node.decompose()
+
+        # Extract paragraphs
+        paragraphs = el.css("p")
+        if paragraphs:
+            text = _join_paragraphs((p.text(strip=True) for p in paragraphs), 20)
+            if len(text) >= MIN_CONTENT_LENGTH:
+                return text, i
+
+        # No <p> tags? Try all text
+        text = el.text(separator="\n", strip=True)
+        if len(text) >= MIN_CONTENT_LENGTH:
+            return text, i
+
+    # Last resort: all <p> tags in body
+    combined = _join_paragraphs((p.text(strip=True) for p in tree.css("p")), 30)
+    if len(combined) >= MIN_CONTENT_LENGTH:
+        return combined, None
+
+    return None, None
+
+
+def _join_paragraphs(texts: Iterable[str], min_len: int) -> str:
+    """
+    Gabung paragraf yang lebih panjang dari min_len (skip paragraf pendek/noise).
+    Berhenti setelah SCRAPE_MAX_CHARS — analisis hanya memakai awal artikel,
+    sisa paragraf (footer, related) tidak perlu di-extract.
+    """
+    kept: List[str] = []
+    total = 0
+    for t in texts:
+        if len(t) > min_len:
+            kept.append(t)
+            total += len(t)
+            if total >= SCRAPE_MAX_CHARS:
+                break
+    return "\n\n".join(kept)
+
+
+_NOISE_CLASS_RE = re.compile("|".join(_NOISE_CLASSES), re.I)
+
+
+@lru_cache(maxsize=1)
+def _compiled_selectors() -> list:
+    """ARTICLE_SELECTORS dikompilasi soupsieve sekali, bukan parse ulang per artikel."""
+    import soupsieve
+
+    return [soupsieve.compile(sel) for sel in ARTICLE_SELECTORS]
+
+
+# Parser C (lxml) jauh lebih cepat & hemat memori; html.parser kalau lxml tidak ada
+_SOUP_PARSER = "lxml"
+
+
+def _make_soup(html_content: str):
+    global _SOUP_PARSER
+    from bs4 import BeautifulSoup, FeatureNotFound
 
-def _extract_from_selectors(html_content: str) -> Optional[str]:
-    """Fallback extraction via BeautifulSoup selectors."""
     try:
-        from bs4 import BeautifulSoup
+        return BeautifulSoup(html_content, _SOUP_PARSER)
+    except FeatureNotFound:
+        logger.warning("    ⚠ lxml not installed, using html.parser")
+        _SOUP_PARSER = "html.parser"
+        return BeautifulSoup(html_content, _SOUP_PARSER)
+
+
+def _extract_from_selectors(html_content: str, url: Optional[str] = None) -> Optional[str]:
+    """
+    Fallback extraction via CSS selectors (selectolax kalau ada, else BeautifulSoup).
+    Kalau url diberikan, selector yang dikenal/terakhir berhasil untuk host itu dicoba duluan.
+    """
+    host = (urlparse(url).hostname or "") if url else ""
+    order = _selector_order(host)
+
+    if LexborHTMLParser is not None:
+        try:
+            text, idx = _extract_with_lexbor(html_content, order)
+            if host and idx is not None:
+                _learned_selector[host] = idx
+            return text
+        except Exception as exc:
+            logger.warning("    ⚠ Lexbor extraction failed (%s), using BeautifulSoup", exc)
 
-        soup = BeautifulSoup(html_content, "html.parser")
+    try:
+        soup = _make_soup(html_content)
+        compiled = _compiled_selectors()
 
-        for sel in ARTICLE_SELECTORS:
-            el = soup.select_one(sel)
+        for i in order:
+            el = compiled[i].select_one(soup)
             if not el:
                 continue
 
             # Remove noise
-            for tag in el.find_all(["script", "style", "nav", "aside", "footer", "iframe", "noscript"]):
+            for tag in el.find_all(_NOISE_TAGS):
                 tag.decompose()
 
             # Remove ads / related articles
-            for tag in el.find_all(attrs={"class": lambda c: c and any(
-                x in " ".join(c).lower() for x in [
-                    "related", "banner", "ads", "promo", "social",
-                    "share", "comment", "sidebar", "widget", "tag",
-                ]
-            )}):
+            for tag in el.find_all(class_=_NOISE_CLASS_RE):
                 tag.decompose()
 
             # Extract paragraphs
             paragraphs = el.find_all("p")
             if paragraphs:
-                texts = []
-                for p in paragraphs:
-                    t = p.get_text(strip=True)
-                    # Skip very short / noisy paragraphs
-                    if len(t) > 20:
-                        texts.append(t)
-                text = "\n\n".join(texts)
+                text = _join_paragraphs((p.get_text(strip=True) for p in paragraphs), 20)
                 if len(text) >= MIN_CONTENT_LENGTH:
+                    if host:
+                        _learned_selector[host] = i
                     return text
 
             # No <p> tags? Try all text
             text = el.get_text(separator="\n", strip=True)
             if len(text) >= MIN_CONTENT_LENGTH:
+                if host:
+                    _learned_selector[host] = i
                 return text
 
         # Last resort: all <p> tags in body
-        paragraphs = soup.find_all("p")
-        texts = [p.get_text(strip=True) for p in paragraphs if len(p.get_text(strip=True)) > 30]
-        if texts:
-            combined = "\n\n".join(texts)
-            if len(combined) >= MIN_CONTENT_LENGTH:
-                return combined
+        combined = _join_paragraphs((p.get_text(strip=True) for p in soup.find_all("p")), 30)
+        if len(combined) >= MIN_CONTENT_LENGTH:
+            return combined
 
     except Exception:
         pass
@@ -128,272 +315,372 @@ def _extract_from_selectors(html_content: str) -> Optional[str]:
 
 
 # ---------------------------------------------------------------------------
-# Standalone browser session (thread-safe)
+# Warm browser pool (thread-safe)
 # ---------------------------------------------------------------------------
 
+_BROWSER_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+]
 
-def _run_browser_html(url: str) -> Optional[str]:
-    """Scrape HTML via standalone Playwright. Thread-safe."""
-    from playwright.sync_api import sync_playwright
+_CONTEXT_OPTIONS: Dict[str, Any] = {
+    "user_agent": BROWSER_USER_AGENT,
+    "viewport": {"width": 1920, "height": 1080},
+    "locale": "id-ID",
+    "timezone_id": "Asia/Jakarta",
+}
+
+
+# Tunggu sampai salah satu container artikel muncul, bukan sleep tetap
+_ARTICLE_READY_SELECTOR = ",".join(ARTICLE_SELECTORS[:10])
+
+
+def _wait_quietly(wait: Callable[..., Any], *args: Any, timeout: int) -> None:
+    """Wait event Playwright dengan batas waktu; timeout bukan error (lanjut saja)."""
+    try:
+        wait(*args, timeout=timeout)
+    except Exception:
+        pass
+
+
+def _block_heavy_resources(route: Any) -> None:
+    if route.request.resource_type in BROWSER_BLOCKED_RESOURCES:
+        route.abort()
+    else:
+        route.continue_()
+
+
+def _new_context(browser: Any) -> Any:
+    """
+    Context untuk BROWSER_CONTEXT_REUSE URL; stealth dipasang sekali per context,
+    gambar/font/media/CSS tidak diunduh (hanya DOM yang dipakai).
+    """
     from playwright_stealth import Stealth
-    from newspaper import Article
 
-    stealth = Stealth()
-
-    with sync_playwright() as pw:
-        browser = pw.chromium.launch(
-            headless=True,
-            args=[
-                "--disable-blink-features=AutomationControlled",
-                "--no-sandbox",
-                "--disable-dev-shm-usage",
-                "--disable-gpu",
-            ],
-        )
+    context = browser.new_context(**_CONTEXT_OPTIONS, accept_downloads=True)
+    Stealth().apply_stealth_sync(context)
+    if BROWSER_BLOCKED_RESOURCES:
+        context.route("**/*", _block_heavy_resources)
+    return context
 
-        try:
-            context = browser.new_context(
-                user_agent=(
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/131.0.0.0 Safari/537.36"
-                ),
-                viewport={"width": 1920, "height": 1080},
-                locale="id-ID",
-                timezone_id="Asia/Jakarta",
-            )
-            page = context.new_page()
-            stealth.apply_stealth_sync(page)
 
-            logger.info("    🌐 Browser navigating...")
-            page.goto(url, wait_until="domcontentloaded", timeout=30000)
-            page.wait_for_timeout(3000)
-            html_content = page.content()
-            title = page.title()
+def _close_quietly(obj: Any) -> None:
+    try:
+        obj.close()
+    except Exception:
+        pass
 
-            # Cloudflare retry
-            for attempt in range(3):
-                if not is_cloudflare_blocked(title) and not is_cloudflare_blocked(html_content):
-                    break
-                wait_sec = 8 + (attempt * 5)
-                logger.info(
-                    "    ⏳ Cloudflare challenge (attempt %d/3), waiting %ds...",
-                    attempt + 1, wait_sec,
+
+class _BrowserPool:
+    """
+    Beberapa worker thread, masing-masing memegang satu Chromium yang tetap hidup
+    (Playwright sync API terikat ke thread pembuatnya) plus satu context yang
+    dipakai ulang BROWSER_CONTEXT_REUSE kali (cookie/fingerprint lalu dirotasi).
+    Task per URL hanya membuka page baru — launch Chromium (detik) dan init
+    context + stealth (~100-300ms) tidak dibayar per URL.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._tasks: "queue.Queue[Optional[Tuple[Callable, tuple, Future]]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Jalankan fn(context, *args) di salah satu worker; blocking sampai selesai."""
+        with self._lock:
+            if len(self._threads) < self._size:
+                t = threading.Thread(
+                    target=self._worker, daemon=True,
+                    name=f"browser-{len(self._threads) + 1}",
                 )
-                page.wait_for_timeout(wait_sec * 1000)
-                html_content = page.content()
-                title = page.title()
+                t.start()
+                self._threads.append(t)
+        future: Future = Future()
+        self._tasks.put((fn, args, future))
+        return future.result()
+
+    def _worker(self) -> None:
+        from playwright.sync_api import sync_playwright
 
-            # Cookie/consent wall
+        pw = browser = context = None
+        uses = 0
+        try:
+            while True:
+                task = self._tasks.get()
+                if task is None:
+                    break
+                fn, args, future = task
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    if browser is None or not browser.is_connected():
+                        if pw is None:
+                            pw = sync_playwright().start()
+                        browser = pw.chromium.launch(headless=True, args=_BROWSER_ARGS)
+                        context = None
+                        logger.info("    🌐 Browser launched (%s)", threading.current_thread().name)
+                    if context is None or uses >= BROWSER_CONTEXT_REUSE:
+                        if context is not None:
+                            _close_quietly(context)
+                        context = _new_context(browser)
+                        uses = 0
+                    uses += 1
+                    future.set_result(fn(context, *args))
+                except BaseException as exc:
+                    # Context mungkin rusak setelah error → buat baru di task berikutnya
+                    if context is not None:
+                        _close_quietly(context)
+                        context = None
+                    future.set_exception(exc)
+        finally:
             try:
-                for selector in [
-                    "button:has-text('Accept')",
-                    "button:has-text('Setuju')",
-                    "button:has-text('Agree')",
-                    "[data-testid='close-button']",
-                    ".modal-close",
-                    "#onetrust-accept-btn-handler",
-                ]:
-                    btn = page.query_selector(selector)
-                    if btn and btn.is_visible():
-                        btn.click()
-                        page.wait_for_timeout(1000)
-                        break
+                if context is not None:
+                    context.close()
+                if browser is not None:
+                    browser.close()
+                if pw is not None:
+                    pw.stop()
             except Exception:
                 pass
 
-            # Scroll for lazy-load
-            page.evaluate("window.scrollTo(0, document.body.scrollHeight / 2)")
-            page.wait_for_timeout(2000)
+    def close(self, timeout: float = 10.0) -> None:
+        """Hentikan semua worker; tiap worker menutup browser miliknya sendiri."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._tasks.put(None)
+        for t in threads:
+            t.join(timeout)
 
-            html_content = page.content()
-            page.close()
-            context.close()
-
-            if html_content and not is_cloudflare_blocked(html_content):
-                # Try newspaper3k
-                art = Article(url)
-                art.set_html(html_content)
-                art.parse()
-                if art.text and len(art.text) >= MIN_CONTENT_LENGTH:
-                    logger.info("    🔓 Scraped via stealth browser (%d chars)", len(art.text))
-                    return clean_text(art.text)
-
-                # Fallback: selector extraction
-                text = _extract_from_selectors(html_content)
-                if text and len(text) >= MIN_CONTENT_LENGTH:
-                    logger.info("    🔓 Scraped via browser + selector (%d chars)", len(text))
-                    return clean_text(text)
 
-                logger.warning("    ⚠ Browser got HTML but extraction failed")
-            else:
-                logger.warning("    ⚠ Cloudflare still blocking after retries")
-
-        except Exception as exc:
-            logger.error("    ✗ Browser HTML failed: %s", exc)
-        finally:
-            browser.close()
+_browser_pool = _BrowserPool(BROWSER_POOL_SIZE)
+atexit.register(_browser_pool.close)
 
-    return None
 
+def _browser_html(context: Any, url: str) -> Optional[str]:
+    """Scrape HTML pakai context warm dari pool (page baru per URL)."""
+    page = context.new_page()
+    try:
+        logger.info("    🌐 Browser navigating...")
+        page.goto(url, wait_until="domcontentloaded", timeout=30000)
+        _wait_quietly(page.wait_for_selector, _ARTICLE_READY_SELECTOR, timeout=3000)
+        html_content = page.content()
+        title = page.title()
+
+        # Cloudflare retry
+        for attempt in range(3):
+            if not is_cloudflare_blocked(title) and not is_cloudflare_blocked(html_content):
+                break
+            wait_sec = 8 + (attempt * 5)
+            logger.info(
+                "    ⏳ Cloudflare challenge (attempt %d/3), waiting %ds...",
+                attempt + 1, wait_sec,
+            )
+            page.wait_for_timeout(wait_sec * 1000)
+            html_content = page.content()
+            title = page.title()
 
-def _run_browser_pdf(url: str) -> Optional[str]:
-    """Download & extract PDF via standalone Playwright. Thread-safe."""
-    from playwright.sync_api import sync_playwright
-    from playwright_stealth import Stealth
+        # Cookie/consent wall
+        try:
+            for selector in [
+                "button:has-text('Accept')",
+                "button:has-text('Setuju')",
+                "button:has-text('Agree')",
+                "[data-testid='close-button']",
+                ".modal-close",
+                "#onetrust-accept-btn-handler",
+            ]:
+                btn = page.query_selector(selector)
+                if btn and btn.is_visible():
+                    btn.click()
+                    page.wait_for_timeout(1000)
+                    break
+        except Exception:
+            pass
 
-    stealth = Stealth()
-
-    with sync_playwright() as pw:
-        browser = pw.chromium.launch(
-            headless=True,
-            args=[
-                "--disable-blink-features=AutomationControlled",
-                "--no-sandbox",
-                "--disable-dev-shm-usage",
-                "--disable-gpu",
-            ],
+        # Scroll for lazy-load
+        page.evaluate("window.scrollTo(0, document.body.scrollHeight / 2)")
+        _wait_quietly(
+            page.wait_for_function, "document.readyState === 'complete'", timeout=2000
         )
-        logger.info("    🌐 Browser started for PDF")
 
-        try:
-            context = browser.new_context(
-                user_agent=(
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/131.0.0.0 Safari/537.36"
-                ),
-                viewport={"width": 1920, "height": 1080},
-                locale="id-ID",
-                timezone_id="Asia/Jakarta",
-                accept_downloads=True,
-            )
-            page = context.new_page()
-            stealth.apply_stealth_sync(page)
-
-            if "idx.co.id" in url:
-                page.goto(
-                    "https://www.idx.co.id/id/perusahaan-tercatat/keterbukaan-informasi/",
-                    wait_until="domcontentloaded",
-                    timeout=30000,
-                )
-                page.wait_for_timeout(5000)
+        html_content = page.content()
+    finally:
+        _close_quietly(page)
 
-            # Method A: JavaScript fetch()
-            try:
-                b64_data = page.evaluate(
-                    """async (url) => {
-                    try {
-                        const resp = await fetch(url, {
-                            credentials: 'include',
-                            headers: { 'Accept': 'application/pdf' }
-                        });
-                        if (!resp.ok) return null;
-                        const buffer = await resp.arrayBuffer();
-                        const bytes = new Uint8Array(buffer);
-                        let binary = '';
-                        for (let i = 0; i < bytes.length; i++) {
-                            binary += String.fromCharCode(bytes[i]);
-                        }
-                        return btoa(binary);
-                    } catch(e) {
-                        return null;
-                    }
-                }""",
-                    url,
-                )
+    if html_content and not is_cloudflare_blocked(html_content):
+        text, via = _extract_article(url, html_content)
+        if text:
+            logger.info("    🔓 Scraped via browser + %s (%d chars)", via, len(text))
+            return clean_text(text)
 
-                if b64_data:
-                    pdf_bytes = base64.b64decode(b64_data)
-                    if len(pdf_bytes) > 100:
-                        text = extract_pdf_text_from_bytes(pdf_bytes)
-                        if text and len(text) >= MIN_CONTENT_LENGTH:
-                            logger.info("    �� PDF via JS fetch (%d chars)", len(text))
-                            page.close()
-                            context.close()
-                            return text
-            except Exception as exc:
-                logger.warning("    ⚠ JS fetch failed: %s", exc)
-
-            # Method B: expect_download
-            try:
-                with page.expect_download(timeout=30000) as download_info:
-                    page.evaluate("(url) => { window.location.href = url; }", url)
-                download = download_info.value
+        logger.warning("    ⚠ Browser got HTML but extraction failed")
+    else:
+        logger.warning("    ⚠ Cloudflare still blocking after retries")
+    return None
 
-                tmp_path = os.path.join(
-                    tempfile.gettempdir(), f"idx_{generate_id(url)}.pdf"
-                )
-                download.save_as(tmp_path)
 
-                with open(tmp_path, "rb") as f:
-                    pdf_bytes = f.read()
-                try:
-                    os.remove(tmp_path)
-                except Exception:
-                    pass
+def _run_browser_html(url: str) -> Optional[str]:
+    """Scrape HTML via stealth browser (pool). Thread-safe."""
+    try:
+        return _browser_pool.run(_browser_html, url)
+    except Exception as exc:
+        logger.error("    ✗ Browser HTML failed: %s", exc)
+        return None
+
+
+def _browser_pdf(context: Any, url: str) -> Optional[str]:
+    """Download & extract PDF pakai context warm dari pool (page baru per URL)."""
+    page = context.new_page()
+    try:
+        # Context dipakai ulang: cookie IDX dari kunjungan sebelumnya masih ada
+        if "idx.co.id" in url and not context.cookies("https://www.idx.co.id"):
+            page.goto(
+                "https://www.idx.co.id/id/perusahaan-tercatat/keterbukaan-informasi/",
+                wait_until="domcontentloaded",
+                timeout=30000,
+            )
+            _wait_quietly(page.wait_for_load_state, "networkidle", timeout=5000)
 
-                if pdf_bytes and len(pdf_bytes) > 100:
+        # Method A: APIRequestContext — network stack + cookie context yang sama,
+        # body langsung bytes (tanpa loop base64 di JS lalu decode di Python)
+        try:
+            resp = context.request.get(
+                url, headers={"Accept": "application/pdf"}, timeout=30000
+            )
+            if resp.ok:
+                pdf_bytes = resp.body()
+                if len(pdf_bytes) > 100:
                     text = extract_pdf_text_from_bytes(pdf_bytes)
                     if text and len(text) >= MIN_CONTENT_LENGTH:
-                        logger.info("    📎 PDF via download (%d chars)", len(text))
-                        page.close()
-                        context.close()
+                        logger.info("    📎 PDF via browser request (%d chars)", len(text))
                         return text
-            except Exception as exc:
-                logger.warning("    ⚠ Download method failed: %s", exc)
+        except Exception as exc:
+            logger.warning("    ⚠ Browser request failed: %s", exc)
+
+        # Method B: expect_download
+        try:
+            with page.expect_download(timeout=30000) as download_info:
+                page.evaluate("(url) => { window.location.href = url; }", url)
+            download = download_info.value
+
+            tmp_path = os.path.join(
+                tempfile.gettempdir(), f"idx_{generate_id(url)}.pdf"
+            )
+            download.save_as(tmp_path)
 
-            page.close()
-            context.close()
+            with open(tmp_path, "rb") as f:
+                pdf_bytes = f.read()
+            try:
+                os.remove(tmp_path)
+            except Exception:
+                pass
 
+            if pdf_bytes and len(pdf_bytes) > 100:
+                text = extract_pdf_text_from_bytes(pdf_bytes)
+                if text and len(text) >= MIN_CONTENT_LENGTH:
+                    logger.info("    📎 PDF via download (%d chars)", len(text))
+                    return text
         except Exception as exc:
-            logger.error("    ✗ Browser PDF failed: %s", exc)
-        finally:
-            browser.close()
+            logger.warning("    ⚠ Download method failed: %s", exc)
+    finally:
+        _close_quietly(page)
 
     return None
 
 
+def _run_browser_pdf(url: str) -> Optional[str]:
+    """Download & extract PDF via stealth browser (pool). Thread-safe."""
+    try:
+        return _browser_pool.run(_browser_pdf, url)
+    except Exception as exc:
+        logger.error("    ✗ Browser PDF failed: %s", exc)
+        return None
+
+
 # ---------------------------------------------------------------------------
 # HTML Scraping (requests → stealth browser)
 # ---------------------------------------------------------------------------
 
 
-def _scrape_html(url: str) -> Optional[str]:
-    """Scrape HTML: requests + selector → stealth browser fallback."""
+_HTML_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "id-ID,id;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Referer": "https://www.google.com/",
+}
+
+
+@lru_cache(maxsize=1)
+def _newspaper_config() -> Any:
+    """Config newspaper3k tanpa kerja yang tidak dipakai (gambar, memo, HTML artikel)."""
+    from newspaper import Config
+
+    cfg = Config()
+    cfg.fetch_images = False
+    cfg.memoize_articles = False
+    cfg.keep_article_html = False
+    return cfg
+
+
+def _newspaper_text(url: str, html: str) -> Optional[str]:
     from newspaper import Article
 
-    # 1. requests (cepat)
+    art = Article(url, config=_newspaper_config())
+    art.set_html(html)
+    art.parse()
+    if art.text and len(art.text) >= MIN_CONTENT_LENGTH:
+        return art.text
+    return None
+
+
+def _selector_host_known(url: str) -> bool:
+    """Host ada di _HOST_SELECTORS → selector path dulu (selector-nya sudah terbukti)."""
+    host = urlparse(url).hostname or ""
+    return bool(host) and any(key in host for key in _HOST_SELECTORS)
+
+
+def _extract_article(url: str, html: str) -> Tuple[Optional[str], str]:
+    """
+    (teks mentah, metode) dari HTML: newspaper3k dulu, lalu selector — kecuali
+    host sudah dikenal selector-nya, maka selector dulu (newspaper3k paling mahal).
+    clean_text dipanggil sekali oleh pemanggil setelah lolos MIN_CONTENT_LENGTH.
+    """
+    selector_first = _selector_host_known(url)
+    if selector_first:
+        text = _extract_from_selectors(html, url)
+        if text and len(text) >= MIN_CONTENT_LENGTH:
+            return text, "selector"
+
+    text = _newspaper_text(url, html)
+    if text:
+        return text, "newspaper"
+
+    if not selector_first:
+        text = _extract_from_selectors(html, url)
+        if text and len(text) >= MIN_CONTENT_LENGTH:
+            return text, "selector"
+    return None, ""
+
+
+def _scrape_html(url: str) -> Optional[str]:
+    """Scrape HTML: requests + selector → stealth browser fallback."""
+    # 1. HTTP langsung (cepat)
     try:
-        session = requests.Session()
-        session.headers.update({
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/131.0.0.0 Safari/537.36"
-            ),
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "id-ID,id;q=0.9,en-US;q=0.8,en;q=0.7",
-            "Referer": "https://www.google.com/",
-        })
-        resp = session.get(url, timeout=15)
-
-        if resp.status_code == 200 and not is_cloudflare_blocked(resp.text):
-            # Try newspaper3k first
-            art = Article(url)
-            art.set_html(resp.text)
-            art.parse()
-            if art.text and len(art.text) >= MIN_CONTENT_LENGTH:
-                logger.info("    🌐 Scraped via requests + newspaper (%d chars)", len(art.text))
-                return clean_text(art.text)
-
-            # Fallback: selector extraction
-            text = _extract_from_selectors(resp.text)
-            if text and len(text) >= MIN_CONTENT_LENGTH:
-                logger.info("    🌐 Scraped via requests + selector (%d chars)", len(text))
+        resp = http_get(url, headers=_HTML_HEADERS, timeout=15)
+        # resp.text men-decode ulang body tiap diakses → ambil sekali, scan marker sekali
+        html = resp.text if resp.status_code == 200 else ""
+        blocked = bool(html) and is_cloudflare_blocked(html)
+
+        if html and not blocked:
+            text, via = _extract_article(url, html)
+            if text:
+                logger.info("    🌐 Scraped via requests + %s (%d chars)", via, len(text))
                 return clean_text(text)
 
-        if resp.status_code == 200 and is_cloudflare_blocked(resp.text):
+        if blocked:
             logger.info("    🔒 Cloudflare detected, switching to browser...")
 
     except Exception as exc:
@@ -408,18 +695,18 @@ def _scrape_html(url: str) -> Optional[str]:
 # ---------------------------------------------------------------------------
 
 
+_PDF_MAGIC = b"%PDF-"  # boleh didahului sampah, spec: dalam 1024 byte pertama
+
+
 def _scrape_pdf(url: str) -> Optional[str]:
     """Download & extract PDF text."""
 
-    # 1. requests
+    # 1. HTTP langsung: content-type dicek sebelum body diunduh, ukuran dibatasi,
+    # magic %PDF- dicek sebelum masuk PyMuPDF (halaman error HTML gagal cepat)
     try:
-        resp = requests.get(
-            url,
-            headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"},
-            timeout=30,
-        )
-        if resp.status_code == 200 and "pdf" in resp.headers.get("content-type", "").lower():
-            text = extract_pdf_text_from_bytes(resp.content)
+        pdf_bytes = http_download(url, PDF_MAX_BYTES, content_type="pdf", timeout=30)
+        if pdf_bytes and _PDF_MAGIC in pdf_bytes[:1024]:
+            text = extract_pdf_text_from_bytes(pdf_bytes)
             if text and len(text) >= MIN_CONTENT_LENGTH:
                 logger.info("    📎 PDF via requests (%d chars)", len(text))
                 return text
@@ -9,15 +9,19 @@ import os
 import re
 import sys
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from bs4 import BeautifulSoup
 
 import feedparser
-import requests
 
 from tenacity import retry, stop_after_attempt, wait_fixed
 from config import SOURCES_FILE, SUPABASE_URL, SUPABASE_SERVICE_KEY, logger
-from helpers import clean_text, strip_html
+from helpers import html_to_text, http_get
+
+try:
+    from orjson import loads as _json_loads  # parser Rust, jauh lebih cepat
+except ImportError:  # fallback ke stdlib
+    _json_loads = json.loads
 
 
 # ---------------------------------------------------------------------------
@@ -54,13 +58,50 @@ def load_sources() -> List[Dict[str, Any]]:
 # ---------------------------------------------------------------------------
 
 
-def parse_feed(feed_url: str) -> List[Dict[str, Any]]:
-    feed = feedparser.parse(feed_url)
+def parse_feed(
+    feed_url: str, validators: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Parse RSS. Kalau validators ({etag, last_modified}) diberikan, pakai
+    conditional GET; 304 Not Modified → []. validators di-update in-place.
+    """
+    # Fetch lewat client bersama (HTTP/2 / keep-alive + gzip per host); feedparser
+    # hanya parse bytes. Paralelisme antar feed ada di pool collect (commands.py).
+    resp = http_get(feed_url, headers=_conditional_headers(validators), timeout=15)
+    if resp.status_code == 304:
+        logger.info("    ✓ Not modified (304)")
+        return []
+    resp.raise_for_status()
+    # feedparser mencari header dengan key lowercase (content-type → charset);
+    # headers httpx/requests case-insensitive, tapi dict() mempertahankan kapitalisasi
+    headers = {k.lower(): v for k, v in resp.headers.items()}
+    feed = feedparser.parse(resp.content, response_headers=headers)
     if feed.bozo and not feed.entries:
         raise ValueError(f"Failed to parse feed: {feed.bozo_exception}")
+    _remember_validators(resp, validators)
     return feed.entries
 
 
+def _conditional_headers(validators: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Header If-None-Match / If-Modified-Since dari validators yang tersimpan."""
+    headers: Dict[str, str] = {}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def _remember_validators(resp: Any, validators: Optional[Dict[str, Any]]) -> None:
+    if validators is None:
+        return
+    if resp.headers.get("ETag"):
+        validators["etag"] = resp.headers["ETag"]
+    if resp.headers.get("Last-Modified"):
+        validators["last_modified"] = resp.headers["Last-Modified"]
+
+
 # def extract_rss_summary(entry: Dict[str, Any]) -> str:
 #     for content_item in entry.get("content", []):
 #         text = strip_html(content_item.get("value", ""))
@@ -82,7 +123,7 @@ def extract_rss_summary(entry: Dict[str, Any]) -> str:
     
     # KASUS A: Content adalah STRING (misal: Stockbit API)
     if isinstance(raw_content, str):
-        return clean_text(strip_html(raw_content))[:500]
+        return html_to_text(raw_content, 500)
 
     # KASUS B: Content adalah LIST (misal: RSS Feedparser)
     # Biasanya formatnya: [{'type': 'text/html', 'value': '...'}]
@@ -90,17 +131,52 @@ def extract_rss_summary(entry: Dict[str, Any]) -> str:
         for content_item in raw_content:
             # Pastikan item di dalam list adalah dict sebelum di-.get()
             if isinstance(content_item, dict):
-                text = strip_html(content_item.get("value", ""))
+                text = html_to_text(content_item.get("value", ""), 500)
                 if text:
-                    return clean_text(text)[:500]
+                    return text
 
     # 2. Fallback ke field 'summary' (biasanya RSS punya ini jika content kosong)
+    return _summary_text(entry)
+
+
+def _summary_text(entry: Dict[str, Any]) -> str:
     summary = entry.get("summary", "")
-    if summary:
-        text = strip_html(summary)
-        return clean_text(text)[:500]
+    return html_to_text(summary, 500) if summary else ""
 
-    return ""
+
+def _content_str_text(entry: Dict[str, Any]) -> str:
+    raw_content = entry.get("content")
+    if raw_content:
+        return html_to_text(raw_content, 500)
+    return _summary_text(entry)
+
+
+def _content_list_text(entry: Dict[str, Any]) -> str:
+    for content_item in entry.get("content") or ():
+        text = html_to_text(content_item.get("value", ""), 500)
+        if text:
+            return text
+    return _summary_text(entry)
+
+
+def summary_extractor(entries: List[Dict[str, Any]]) -> Callable[[Dict[str, Any]], str]:
+    """
+    Pilih extractor summary sekali per feed: bentuk 'content' satu feed seragam
+    (feedparser selalu list of dict, Stockbit selalu string), jadi cek tipe cukup
+    di entry pertama yang punya content. Bentuk tak dikenal → extract_rss_summary.
+    """
+    for entry in entries:
+        raw_content = entry.get("content")
+        if not raw_content:
+            continue
+        if isinstance(raw_content, str):
+            return _content_str_text
+        if isinstance(raw_content, list) and all(
+            isinstance(item, dict) for item in raw_content
+        ):
+            return _content_list_text
+        return extract_rss_summary
+    return _summary_text
 
 
 # ---------------------------------------------------------------------------
@@ -130,19 +206,26 @@ def get_new_entries(
 # Investor.id Sitemap XML
 # ---------------------------------------------------------------------------
 
-def fetch_investor_sitemap(sitemap_url: str) -> list:
+def fetch_investor_sitemap(
+    sitemap_url: str, validators: Optional[Dict[str, Any]] = None
+) -> list:
     """
     Fetch dan parse artikel dari Google News Sitemap (investor.id).
     Mengembalikan list of dictionaries mirip dengan output feedparser atau Stockbit API.
     """
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "application/xml, text/xml, */*"
+        "Accept": "application/xml, text/xml, */*",
+        **_conditional_headers(validators),
     }
     
     try:
         # 1. Request ke URL Sitemap
-        resp = requests.get(sitemap_url, headers=headers, timeout=15)
+        resp = http_get(sitemap_url, headers=headers, timeout=15)
+
+        if resp.status_code == 304:
+            logger.info("    ✓ Not modified (304)")
+            return []
         
         if resp.status_code != 200:
             logger.warning("Investor.id Sitemap status code: %s", resp.status_code)
@@ -188,6 +271,7 @@ def fetch_investor_sitemap(sitemap_url: str) -> list:
                 })
                 
         logger.info("    📋 Parsed %d investor.id sitemap entries", len(entries))
+        _remember_validators(resp, validators)
         return entries
 
     except Exception as exc:
@@ -212,29 +296,26 @@ def fetch_idx_announcements(api_url: str) -> List[Dict[str, Any]]:
     return _parse_idx_data(data)
 
 
+_IDX_API_HEADERS = {
+    "Accept": "application/json",
+    "Referer": "https://www.idx.co.id/id/perusahaan-tercatat/keterbukaan-informasi/",
+    "Origin": "https://www.idx.co.id",
+    "X-Requested-With": "XMLHttpRequest",
+}
+
+
 def _fetch_idx_via_requests(api_url: str) -> Optional[Dict[str, Any]]:
     try:
-        session = requests.Session()
-        session.headers.update({
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/131.0.0.0 Safari/537.36"
-            ),
-            "Accept": "application/json",
-            "Referer": "https://www.idx.co.id/id/perusahaan-tercatat/keterbukaan-informasi/",
-            "Origin": "https://www.idx.co.id",
-            "X-Requested-With": "XMLHttpRequest",
-        })
-
-        session.get(
+        # Client bersama: cookie IDX dari kunjungan sebelumnya ikut dipakai ulang,
+        # halaman + API di-multiplex di satu koneksi HTTP/2
+        http_get(
             "https://www.idx.co.id/id/perusahaan-tercatat/keterbukaan-informasi/",
             timeout=15,
         )
 
         today = datetime.now().strftime("%Y%m%d")
         url = re.sub(r"dateTo=\d+", f"dateTo={today}", api_url)
-        resp = session.get(url, timeout=30)
+        resp = http_get(url, headers=_IDX_API_HEADERS, timeout=30)
 
         if resp.status_code != 200:
             return None
@@ -243,14 +324,14 @@ def _fetch_idx_via_requests(api_url: str) -> Optional[Dict[str, Any]]:
         if "json" not in content_type:
             return None
 
-        return resp.json()
+        # Parse langsung dari bytes: tanpa decode ke str dulu
+        return _json_loads(resp.content)
 
     except Exception:
         return None
 
 
 def _fetch_idx_via_browser(api_url: str) -> Optional[Dict[str, Any]]:
-    import json as _json
     from playwright.sync_api import sync_playwright
     from playwright_stealth import Stealth
 
@@ -263,9 +344,7 @@ def _fetch_idx_via_browser(api_url: str) -> Optional[Dict[str, Any]]:
     def _on_response(response):
         if "GetAnnouncement" in response.url:
             try:
-                body = response.text()
-                parsed = _json.loads(body)
-                api_data.append(parsed)
+                api_data.append(_json_loads(response.body()))
             except Exception:
                 pass
 
@@ -308,7 +387,7 @@ def _fetch_idx_via_browser(api_url: str) -> Optional[Dict[str, Any]]:
                 body_text = page.inner_text("body")
                 page.close()
                 context.close()
-                return _json.loads(body_text)
+                return _json_loads(body_text)
             except Exception:
                 pass
 
@@ -324,6 +403,23 @@ def _fetch_idx_via_browser(api_url: str) -> Optional[Dict[str, Any]]:
             browser.close()
 
 
+# Nama field IDX berbeda antar versi API; urutan = prioritas (yang umum duluan)
+_EMITEN_KEYS = ("Kode_Emiten", "kode_emiten")
+_JUDUL_KEYS = ("JudulPengumuman", "judul", "PerihalPengumuman", "perihal")
+_TANGGAL_KEYS = ("TglPengumuman", "tanggal", "CreatedDate")
+_FILE_PATH_KEYS = ("file_path", "FilePath")
+_FILENAME_KEYS = ("OriginalFilename", "PDFFilename")
+
+
+def _first(d: Dict[str, Any], keys: Tuple[str, ...]) -> Any:
+    """Nilai truthy pertama dari keys (berhenti di key pertama yang terisi), else ""."""
+    for key in keys:
+        value = d.get(key)
+        if value:
+            return value
+    return ""
+
+
 def _parse_idx_data(data: Dict[str, Any]) -> List[Dict[str, Any]]:
     replies = data.get("Replies", [])
 
@@ -342,22 +438,9 @@ def _parse_idx_data(data: Dict[str, Any]) -> List[Dict[str, Any]]:
         pengumuman = reply.get("pengumuman", {})
         attachments = reply.get("attachments", [])
 
-        emiten = pengumuman.get("Kode_Emiten", "").strip()
-        if not emiten:
-            emiten = pengumuman.get("kode_emiten", "").strip()
-
-        judul = (
-            pengumuman.get("JudulPengumuman", "")
-            or pengumuman.get("judul", "")
-            or pengumuman.get("PerihalPengumuman", "")
-            or pengumuman.get("perihal", "")
-        ).strip()
-
-        tanggal = (
-            pengumuman.get("TglPengumuman", "")
-            or pengumuman.get("tanggal", "")
-            or pengumuman.get("CreatedDate", "")
-        )
+        emiten = _first(pengumuman, _EMITEN_KEYS).strip()
+        judul = _first(pengumuman, _JUDUL_KEYS).strip()
+        tanggal = _first(pengumuman, _TANGGAL_KEYS)
 
         no_pengumuman = pengumuman.get("NoPengumuman", "").strip()
         jenis = pengumuman.get("JenisPengumuman", "").strip()
@@ -367,13 +450,11 @@ def _parse_idx_data(data: Dict[str, Any]) -> List[Dict[str, Any]]:
         for att in attachments:
             pdf_url = att.get("FullSavePath", "")
             if not pdf_url:
-                pdf_url = att.get("file_path", att.get("FilePath", ""))
+                pdf_url = _first(att, _FILE_PATH_KEYS)
                 if pdf_url and not pdf_url.startswith("http"):
                     pdf_url = f"https://www.idx.co.id{pdf_url}"
 
-            original_name = (
-                att.get("OriginalFilename", "") or att.get("PDFFilename", "")
-            ).strip()
+            original_name = _first(att, _FILENAME_KEYS).strip()
 
             is_attachment = att.get("IsAttachment", False)
 
@@ -418,18 +499,25 @@ def _parse_idx_data(data: Dict[str, Any]) -> List[Dict[str, Any]]:
     logger.info("    📋 Parsed %d IDX announcements", len(entries))
     return entries
 
-def fetch_stockbit_news(feed_url: str) -> list:
+def fetch_stockbit_news(
+    feed_url: str, validators: Optional[Dict[str, Any]] = None
+) -> list:
     """
     Fetch news from Stockbit API.
     Prioritizes 'titleurl' (external news link) over Stockbit post link.
     """
     headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        **_conditional_headers(validators),
     }
     
     try:
         # 1. Request ke API
-        resp = requests.get(feed_url, headers=headers, timeout=15)
+        resp = http_get(feed_url, headers=headers, timeout=15)
+
+        if resp.status_code == 304:
+            logger.info("    ✓ Not modified (304)")
+            return []
         
         if resp.status_code != 200:
             logger.warning("Stockbit API status code: %s", resp.status_code)
@@ -482,7 +570,8 @@ def fetch_stockbit_news(feed_url: str) -> list:
                 # Username di JSON Anda adalah string "StockbitNews", aman diambil langsung
                 "username": item.get("username", "StockbitNews"),
             })
-            
+
+        _remember_validators(resp, validators)
         return entries
 
     except Exception as exc:
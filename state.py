@@ -4,33 +4,70 @@ State Management — auto-select JSON file atau Supabase
 
 from __future__ import annotations
 
-import json
 import os
-from typing import Any, Dict
+import threading
+from typing import Any, Dict, Optional
 
 from config import STATE_FILE, logger
+from helpers import read_json, write_json
+
+# Snapshot state terakhir yang diketahui sama dengan storage (hasil load/save).
+# save_state hanya menulis entry yang berubah; tidak ada yang berubah → no-op.
+_snapshot: Optional[Dict[str, Any]] = None
+_snapshot_lock = threading.Lock()
+
+
+def _copy_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Salinan per source (nilai state = dict datar), aman dari mutasi pemanggil."""
+    return {k: dict(v) if isinstance(v, dict) else v for k, v in state.items()}
+
+
+def _remember(state: Dict[str, Any]) -> None:
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = _copy_state(state)
 
 
 def load_state(db=None) -> Dict[str, Any]:
     """Load state. Pakai Supabase kalau db tersedia."""
     if db and hasattr(db, "load_state"):
-        return db.load_state()
+        state = db.load_state()
+        _remember(state)
+        return state
 
     if not STATE_FILE.exists():
         return {}
     try:
-        with open(STATE_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, ValueError):
+        state = read_json(STATE_FILE)
+    except ValueError:
         logger.warning("state.json corrupt, resetting.")
         return {}
+    _remember(state)
+    return state
 
 
 def save_state(state: Dict[str, Any], db=None) -> None:
-    """Simpan state. Pakai Supabase kalau db tersedia."""
+    """
+    Simpan state. Pakai Supabase kalau db tersedia. Dibanding snapshot terakhir:
+    Supabase hanya di-upsert entry yang berubah, file JSON hanya ditulis ulang
+    kalau ada perubahan sama sekali.
+    """
+    with _snapshot_lock:
+        previous = _snapshot
+    changed = (
+        state
+        if previous is None
+        else {k: v for k, v in state.items() if previous.get(k) != v}
+    )
+    removed = previous is not None and any(k not in state for k in previous)
+
     if db and hasattr(db, "save_state"):
-        db.save_state(state)
+        # Upsert gagal → snapshot tidak diperbarui, entry dicoba lagi di save berikutnya
+        if not changed or db.save_state(changed) is not False:
+            _remember(state)
         return
 
-    with open(STATE_FILE, "w", encoding="utf-8") as f:
-        json.dump(state, f, indent=2, ensure_ascii=False)
\ No newline at end of file
+    if not changed and not removed and STATE_FILE.exists():
+        return
+    write_json(STATE_FILE, state)
+    _remember(state)
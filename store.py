@@ -4,136 +4,490 @@ News Store — Auto-select JSON files atau Supabase
 
 from __future__ import annotations
 
-import json
 import os
 import re
+import threading
+from bisect import bisect_left, insort
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from config import NEWS_DIR, SIMILARITY_THRESHOLD, logger
-from helpers import generate_id, similarity
+from helpers import (
+    TitleIndex,
+    generate_id,
+    json_line,
+    json_loads,
+    normalize_url,
+    read_json,
+    write_json,
+)
 
 
 # ---------------------------------------------------------------------------
 # JSON File Store (local development)
 # ---------------------------------------------------------------------------
 
+# (collected_at, -urutan insert, id) — key urutan baca JSONStore
+_TimeKey = Tuple[str, int, str]
+# (st_mtime_ns, st_size) file berita — dicatat di index untuk deteksi file berubah
+_FileStat = Tuple[int, int]
+
+# Nama file dari judul: buang karakter non-word, whitespace → "_"
+_UNSAFE_FILENAME_RE = re.compile(r"[^\w\s-]")
+_WHITESPACE_RUN_RE = re.compile(r"\s+")
+
+
+def _file_stat(fp: str) -> Optional[_FileStat]:
+    try:
+        st = os.stat(fp)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _read_record(fp: str) -> Optional[Dict[str, Any]]:
+    """Satu file berita → dict, None kalau rusak / bukan object."""
+    try:
+        data = read_json(fp)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
 
 class JSONStore:
-    """Penyimpanan berita ke JSON files (local)."""
+    """
+    Penyimpanan berita ke JSON files (local). File per berita tetap sumber
+    kebenaran; index.jsonl (append-only, baris terakhir per id menang) adalah
+    salinan semua record supaya startup cukup baca satu file berurutan, dan
+    save/update cukup append satu baris — bukan glob + parse ulang semua file.
+    Tiap baris index membawa mtime + size file-nya; saat load, file yang
+    berubah di luar proses ini (CLI lain, crash sebelum append) dibaca ulang.
+    """
+
+    INDEX_NAME = "index.jsonl"
+    COMPACT_RATIO = 0.3  # baris usang / total baris di atas ini → index ditulis ulang
+    PARALLEL_SCAN_MIN = 64  # di bawah ini scan serial (overhead thread tidak sebanding)
 
     def __init__(self, news_dir: Path = NEWS_DIR) -> None:
         self.news_dir = news_dir
         self.news_dir.mkdir(exist_ok=True)
+        self.index_path = news_dir / self.INDEX_NAME
         self._cache: Optional[Dict[str, Dict[str, Any]]] = None
+        self._index_lines = 0
+        self._skipped: set = set()  # file *.json yang tidak masuk record (rusak, tanpa id)
+        self._file_stats: Dict[str, Optional[_FileStat]] = {}  # path → stat saat terakhir dibaca/ditulis
+        # Store = singleton per proses (get_store), dipakai bersamaan oleh handler
+        # bot (asyncio.to_thread) dan thread scheduler: semua baca/ubah cache +
+        # index turunan (_by_time, _by_status, judul, URL) lewat lock ini.
+        # Reentrant: _put → _load_all → _write_index.
+        self._lock = threading.RLock()
+        # Judul untuk cek redundan (pre-filter LSH kalau datasketch ada); diperbarui per save,
+        # bukan dibangun + di-lowercase ulang dari semua record per insert
+        self._title_index: Optional[TitleIndex] = None
+        self._urls: Optional[set] = None
+        # Urutan baca collected_at: key (collected_at, -seq, id) ascending; dibaca
+        # terbalik = terbaru dulu, seri tetap urutan insert (= sort stabil lama)
+        self._by_time: Optional[List[_TimeKey]] = None
+        self._by_status: Dict[str, List[_TimeKey]] = {}
+        self._seq: Dict[str, int] = {}
+        # Key + status yang sedang terindeks per id; record di cache bisa sudah
+        # di-mutate pemanggil sebelum update(), jadi key lama tidak dibangun dari prev
+        self._keys: Dict[str, Tuple[_TimeKey, Any]] = {}
 
     def _load_all(self) -> Dict[str, Dict[str, Any]]:
-        if self._cache is not None:
-            return self._cache
+        with self._lock:
+            if self._cache is not None:
+                return self._cache
+            records = self._read_index()
+            if records is None:
+                records = self._scan_files()
+                self._write_index(records)
+                logger.info("📇 News index rebuilt (%d records)", len(records))
+            self._cache = records
+            return records
+
+    def _json_files(self) -> Dict[str, _FileStat]:
+        """
+        Path file *.json di news_dir (urut nama) → (mtime_ns, size). os.scandir:
+        nama & tipe dari readdir langsung, tanpa objek Path + fnmatch per entry
+        seperti glob.
+        """
+        files: Dict[str, _FileStat] = {}
+        with os.scandir(self.news_dir) as it:
+            for e in it:
+                if not e.name.endswith(".json") or not e.is_file(follow_symlinks=False):
+                    continue
+                try:
+                    st = e.stat(follow_symlinks=False)
+                except OSError:  # dihapus di antara readdir dan stat
+                    continue
+                files[e.path] = (st.st_mtime_ns, st.st_size)
+        return {fp: files[fp] for fp in sorted(files)}
+
+    def _scan_files(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Legacy: list + parse semua file berita. Baca file I/O-bound (lepas GIL),
+        jadi di-fan-out ke thread pool; dict dirakit di thread ini sesuai urutan
+        nama file, sama seperti scan serial.
+        """
+        files = self._json_files()
+        paths = list(files)
+        if len(paths) < self.PARALLEL_SCAN_MIN:
+            loaded = map(_read_record, paths)
+        else:
+            workers = min(32, (os.cpu_count() or 1) * 4)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="store-scan") as ex:
+                loaded = list(ex.map(_read_record, paths))
+
         records: Dict[str, Dict[str, Any]] = {}
-        for fp in sorted(self.news_dir.glob("*.json")):
-            try:
-                with open(fp, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    news_id = data.get("id", "")
-                    if news_id:
-                        data["_filepath"] = str(fp)
-                        records[news_id] = data
-            except (json.JSONDecodeError, KeyError):
+        for fp, data in zip(paths, loaded):
+            if data is None:
                 continue
-        self._cache = records
+            news_id = data.get("id", "")
+            if news_id:
+                data["_filepath"] = fp
+                records[news_id] = data
+        self._skipped = set(paths) - {r["_filepath"] for r in records.values()}
+        self._file_stats = dict(files)
+        return records
+
+    def _read_index(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Record dari index.jsonl; None kalau index tidak ada atau rusak. File
+        yang mtime/size-nya beda dari catatan index, baru, atau hilang (diubah
+        proses lain, baris hilang karena compact proses lain, crash di antara
+        tulis file dan append index) dibaca ulang satu per satu, lalu index
+        ditulis ulang.
+        """
+        if not self.index_path.exists():
+            return None
+        records: Dict[str, Dict[str, Any]] = {}
+        stats: Dict[str, Optional[_FileStat]] = {}
+        skipped: Dict[str, Optional[_FileStat]] = {}
+        lines = 0
+        try:
+            with open(self.index_path, "rb") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    data = json_loads(line)
+                    if "_skipped" in data:
+                        for fp, mtime_ns, size in data["_skipped"]:
+                            skipped[fp] = (mtime_ns, size)
+                        continue
+                    stat = data.pop("_stat", None)
+                    records[data["id"]] = data
+                    stats[data["_filepath"]] = tuple(stat) if stat else None
+                    lines += 1
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.warning("⚠ News index unreadable, rescanning files")
+            return None
+
+        on_disk = self._json_files()
+        known = dict(skipped)
+        for r in records.values():
+            known[r["_filepath"]] = stats.get(r["_filepath"])
+        changed = [fp for fp, stat in on_disk.items() if known.get(fp) != stat]
+        removed = known.keys() - on_disk.keys()
+        self._file_stats = dict(on_disk)
+        if not changed and not removed:
+            self._skipped = set(skipped)
+            self._index_lines = lines
+            return records
+
+        stale = removed.union(changed)
+        records = {k: r for k, r in records.items() if r["_filepath"] not in stale}
+        self._skipped = {fp for fp in skipped if fp not in stale}
+        for fp, data in zip(changed, map(_read_record, changed)):
+            news_id = data.get("id", "") if data is not None else ""
+            if news_id:
+                data["_filepath"] = fp
+                records[news_id] = data
+            else:
+                self._skipped.add(fp)
+        logger.info(
+            "📇 News index: %d file berubah, %d hilang — dibaca ulang",
+            len(changed), len(removed),
+        )
+        self._write_index(records)
         return records
 
+    def _write_index(self, records: Dict[str, Dict[str, Any]]) -> None:
+        """Tulis ulang index (compact: satu baris per record), atomic via rename."""
+        tmp = self.index_path.with_suffix(".jsonl.tmp")
+        with self._lock:
+            with open(tmp, "wb") as f:
+                # File rusak / tanpa id / id dobel tetap dicatat, supaya index
+                # tetap dianggap cocok dengan isi folder di startup berikutnya
+                stats = self._file_stats
+                if self._skipped:
+                    f.write(json_line({"_skipped": [
+                        [fp, *(stats.get(fp) or (0, -1))] for fp in sorted(self._skipped)
+                    ]}))
+                for data in records.values():
+                    f.write(json_line(dict(data, _stat=stats.get(data["_filepath"]))))
+            os.replace(tmp, self.index_path)
+            self._index_lines = len(records)
+
     def _invalidate(self) -> None:
-        self._cache = None
+        """Buang cache + index; dibangun ulang dari file saat akses berikutnya."""
+        with self._lock:
+            self._cache = None
+            self._title_index = None
+            self._urls = None
+            self._by_time = None
+            self._keys = {}
+            self._file_stats = {}
+            try:
+                self.index_path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _put(self, news_id: str, data: Dict[str, Any]) -> None:
+        """Update cache in-place + append ke index; compact kalau baris usang kebanyakan."""
+        with self._lock:
+            if self._cache is None:
+                # Cache belum dimuat: cukup pastikan index tidak basi (dibangun ulang nanti)
+                self._load_all()
+            prev = self._cache.get(news_id)
+            self._cache[news_id] = data
+            if self._title_index is not None:
+                title = data.get("title", "")
+                if prev is None:
+                    self._title_index.add(title)
+                elif prev.get("title", "") != title:
+                    self._title_index = None
+            if self._urls is not None:
+                if prev is not None and prev.get("url", "") != data.get("url", ""):
+                    self._urls = None
+                else:
+                    self._urls.add(normalize_url(data.get("url", "")))
+            if self._by_time is not None:
+                self._unindex_time(news_id)
+                self._index_time(news_id, data)
+            stat = self._file_stats[data["_filepath"]] = _file_stat(data["_filepath"])
+            with open(self.index_path, "ab") as f:
+                f.write(json_line(dict(data, _stat=stat)))
+            self._index_lines += 1
+            stale = self._index_lines - len(self._cache)
+            if stale > self.COMPACT_RATIO * self._index_lines:
+                self._write_index(self._cache)
 
     def get_by_id(self, news_id: str) -> Optional[Dict[str, Any]]:
-        all_news = self._load_all()
-        if news_id in all_news:
-            return all_news[news_id]
-        matches = [k for k in all_news if k.startswith(news_id)]
-        if len(matches) == 1:
-            return all_news[matches[0]]
-        if len(matches) > 1:
-            logger.error("Ambiguous ID '%s'. Matches: %s", news_id, matches)
+        with self._lock:
+            all_news = self._load_all()
+            if news_id in all_news:
+                return all_news[news_id]
+            matches = [k for k in all_news if k.startswith(news_id)]
+            if len(matches) == 1:
+                return all_news[matches[0]]
+            if len(matches) > 1:
+                logger.error("Ambiguous ID '%s'. Matches: %s", news_id, matches)
+                return None
             return None
-        return None
+
+    def _time_key(self, news_id: str, data: Dict[str, Any]) -> _TimeKey:
+        seq = self._seq.get(news_id)
+        if seq is None:
+            seq = self._seq[news_id] = len(self._seq)
+        return (data.get("collected_at", ""), -seq, news_id)
+
+    def _index_time(self, news_id: str, data: Dict[str, Any]) -> None:
+        key = self._time_key(news_id, data)
+        status = data.get("status")
+        insort(self._by_time, key)
+        insort(self._by_status.setdefault(status, []), key)
+        self._keys[news_id] = (key, status)
+
+    def _unindex_time(self, news_id: str) -> None:
+        entry = self._keys.pop(news_id, None)
+        if entry is None:
+            return
+        key, status = entry
+        for keys in (self._by_time, self._by_status.get(status, [])):
+            i = bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                del keys[i]
+
+    def _sorted_keys(self) -> List[_TimeKey]:
+        """Key urut collected_at; dibangun sekali, lalu dijaga per save/update."""
+        with self._lock:
+            if self._by_time is None or self._cache is None:
+                records = self._load_all()
+                self._seq = {news_id: i for i, news_id in enumerate(records)}
+                self._by_time = sorted(self._time_key(k, r) for k, r in records.items())
+                self._by_status = {}
+                self._keys = {}
+                for key in self._by_time:
+                    status = records[key[2]].get("status")
+                    self._by_status.setdefault(status, []).append(key)
+                    self._keys[key[2]] = (key, status)
+            return self._by_time
 
     def get_all(self) -> List[Dict[str, Any]]:
-        items = list(self._load_all().values())
-        items.sort(key=lambda x: x.get("collected_at", ""), reverse=True)
-        return items
+        with self._lock:
+            keys = self._sorted_keys()
+            records = self._cache
+            return [records[key[2]] for key in reversed(keys)]
+
+    def iter_all(self, page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        yield from self.get_all()
 
     def get_all_urls(self) -> set:
-        return {r.get("url", "") for r in self._load_all().values()}
+        """
+        Set URL tersimpan (bentuk normalize_url); dibangun sekali lalu diperbarui
+        per save (jangan di-mutate).
+        """
+        with self._lock:
+            if self._urls is None or self._cache is None:
+                self._urls = {normalize_url(r.get("url", "")) for r in self._load_all().values()}
+            return self._urls
 
     def get_all_titles(self) -> List[str]:
-        return [r.get("title", "") for r in self._load_all().values()]
+        with self._lock:
+            return list(self._get_title_index().titles)
+
+    def _get_title_index(self) -> TitleIndex:
+        with self._lock:
+            if self._title_index is None or self._cache is None:
+                self._title_index = TitleIndex(
+                    r.get("title", "") for r in self._load_all().values()
+                )
+            return self._title_index
 
     def get_by_status(
         self, status: str, limit: Optional[int] = None
     ) -> List[Dict[str, Any]]:
-        items = [r for r in self._load_all().values() if r.get("status") == status]
-        items.sort(key=lambda x: x.get("collected_at", ""), reverse=True)
-        if limit:
-            items = items[:limit]
-        return items
+        with self._lock:
+            self._sorted_keys()
+            keys = self._by_status.get(status, [])
+            if limit:
+                keys = keys[-limit:]
+            records = self._cache
+            return [records[key[2]] for key in reversed(keys)]
+
+    def iter_by_status(
+        self, status: str, limit: Optional[int] = None, page_size: int = 200
+    ) -> Iterator[Dict[str, Any]]:
+        # File lokal sudah dimuat penuh; page_size hanya untuk kompatibilitas API
+        yield from self.get_by_status(status, limit=limit)
+
+    def get_news_page(
+        self,
+        limit: int,
+        offset: int = 0,
+        category: Optional[str] = None,
+        source_id: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        items = self.get_all()
+        if category:
+            items = [r for r in items if r.get("category") == category]
+        if source_id is not None:
+            items = [r for r in items if r.get("source_id") == source_id]
+        return items[offset: offset + limit], len(items)
+
+    def search_news(self, keyword: str) -> List[Dict[str, Any]]:
+        """Cari berita berdasarkan keyword pada judul ATAU rss_summary."""
+        kw = keyword.lower()
+        return [
+            r for r in self.get_all()
+            if kw in r.get("title", "").lower()
+            or kw in (r.get("rss_summary") or "").lower()
+        ]
+
+    def group_counts(
+        self, column: str, default: Optional[str] = None
+    ) -> Dict[str, int]:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for r in self._load_all().values():
+                key = r.get(column) or default
+                if key is not None:
+                    counts[key] = counts.get(key, 0) + 1
+            return counts
 
     def is_duplicate_url(self, url: str) -> bool:
-        return url in self.get_all_urls()
+        # http://x/a/ vs http://x/a, query beda urutan, #fragment → satu URL
+        return normalize_url(url) in self.get_all_urls()
 
     def is_redundant_title(self, title: str) -> Tuple[bool, Optional[str]]:
-        for existing in self.get_all_titles():
-            if similarity(title, existing) >= SIMILARITY_THRESHOLD:
-                return True, existing
-        return False, None
+        with self._lock:
+            index = self._get_title_index()
+            idx = index.find(title)
+            if idx is None:
+                return False, None
+            return True, index.titles[idx]
 
     def save(self, record: Dict[str, Any]) -> bool:
-        url = record.get("url", "")
-
-        if self.is_duplicate_url(url):
-            logger.warning("    ⚠ Duplicate URL: %s", url[:60])
-            return False
-
-        is_redundant, matched = self.is_redundant_title(record.get("title", ""))
-        if is_redundant:
-            logger.warning(
-                "    ⚠ Redundant (~%s): '%s'",
-                f"{SIMILARITY_THRESHOLD:.0%}",
-                matched[:50],
-            )
-            return False
-
-        news_id = generate_id(url)
-        record["id"] = news_id
-
-        safe_title = re.sub(r"[^\w\s-]", "", record.get("title", "untitled"))[:50]
-        safe_title = re.sub(r"\s+", "_", safe_title).strip("_")
-        filename = f"{news_id}_{safe_title}.json"
-
-        filepath = self.news_dir / filename
-        save_data = {k: v for k, v in record.items() if not k.startswith("_")}
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(save_data, f, indent=2, ensure_ascii=False, default=str)
-
-        self._invalidate()
-        return True
+        # Cek duplikat sampai _put dalam satu lock: dua save paralel URL sama
+        # tidak bisa sama-sama lolos
+        with self._lock:
+            url = record.get("url", "")
+
+            if self.is_duplicate_url(url):
+                logger.warning("    ⚠ Duplicate URL: %s", url[:60])
+                return False
+
+            is_redundant, matched = self.is_redundant_title(record.get("title", ""))
+            if is_redundant:
+                logger.warning(
+                    "    ⚠ Redundant (~%s): '%s'",
+                    f"{SIMILARITY_THRESHOLD:.0%}",
+                    matched[:50],
+                )
+                return False
+
+            # Pakai id dari caller kalau sudah di-set (cmd_collect), jangan hash ulang
+            news_id = record.get("id") or generate_id(url)
+            record["id"] = news_id
+
+            safe_title = _UNSAFE_FILENAME_RE.sub("", record.get("title", "untitled"))[:50]
+            safe_title = _WHITESPACE_RUN_RE.sub("_", safe_title).strip("_")
+            filename = f"{news_id}_{safe_title}.json"
+
+            filepath = self.news_dir / filename
+            save_data = {k: v for k, v in record.items() if not k.startswith("_")}
+            write_json(filepath, save_data, pretty=False)
+
+            save_data["_filepath"] = str(filepath)
+            self._put(news_id, save_data)
+            return True
+
+    def save_many(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Simpan banyak berita; return record yang berhasil disimpan."""
+        return [r for r in records if self.save(r)]
 
     def update(self, record: Dict[str, Any]) -> None:
-        filepath = record.get("_filepath")
-        if not filepath:
-            logger.error("Cannot update without _filepath")
-            return
-        save_data = {k: v for k, v in record.items() if not k.startswith("_")}
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(save_data, f, indent=2, ensure_ascii=False, default=str)
-        self._invalidate()
+        with self._lock:
+            filepath = record.get("_filepath")
+            if not filepath:
+                logger.error("Cannot update without _filepath")
+                return
+            save_data = {k: v for k, v in record.items() if not k.startswith("_")}
+            write_json(Path(filepath), save_data, pretty=False)
+
+            news_id = save_data.get("id", "")
+            if news_id:
+                save_data["_filepath"] = str(filepath)
+                self._put(news_id, save_data)
+            else:
+                self._invalidate()
+
+    def count(self) -> int:
+        return len(self._load_all())
 
     def stats(self) -> Dict[str, int]:
-        all_news = self._load_all()
-        raw = sum(1 for r in all_news.values() if r.get("status") == "raw")
-        analyzed = sum(1 for r in all_news.values() if r.get("status") == "analyzed")
-        return {"total": len(all_news), "raw": raw, "analyzed": analyzed}
+        with self._lock:
+            # Panjang list per status (dijaga per save/update), bukan scan semua record
+            total = len(self._sorted_keys())
+            by_status = self._by_status
+            return {
+                "total": total,
+                "raw": len(by_status.get("raw", ())),
+                "analyzed": len(by_status.get("analyzed", ())),
+            }
 
 
 # ---------------------------------------------------------------------------
@@ -141,11 +495,13 @@ class JSONStore:
 # ---------------------------------------------------------------------------
 
 
+@lru_cache(maxsize=1)
 def get_store():
     """
     Auto-select store backend:
       - SUPABASE_URL set → SupabaseDB
       - Otherwise → JSONStore (local)
+    Dibuat sekali per proses; client & cache dipakai ulang oleh semua pemanggil.
     """
     supabase_url = os.environ.get("SUPABASE_URL", "")
     supabase_key = os.environ.get("SUPABASE_SERVICE_KEY", "")
@@ -0,0 +1,129 @@
+"""
+Test JSONStore — index collected_at / status dijaga per save & update
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from helpers import write_json
+from store import JSONStore
+
+
+_TITLES = [
+    "BBCA catat laba bersih naik 12 persen",
+    "Harga minyak dunia melemah jelang rapat OPEC",
+    "Rupiah menguat terhadap dolar AS pagi ini",
+    "TLKM umumkan pembagian dividen interim",
+    "Bank Indonesia tahan suku bunga acuan",
+]
+
+
+def _record(i: int, **extra):
+    rec = {
+        "url": f"https://example.com/berita/{i}",
+        "title": _TITLES[i],
+        "collected_at": f"2024-01-01T00:00:{i:02d}",
+        "status": "raw",
+    }
+    rec.update(extra)
+    return rec
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = JSONStore(news_dir=tmp_path)
+    for i in range(5):
+        assert s.save(_record(i))
+    return s
+
+
+def test_update_after_in_place_mutation_moves_status(store):
+    # Alur cmd_analyze: ambil dari get_by_status, mutate dict-nya, lalu update
+    record = store.get_by_status("raw")[0]
+    record["status"] = "analyzed"
+    record["analysis"] = {"summary": "ok"}
+    store.update(record)
+
+    raw_ids = [r["id"] for r in store.get_by_status("raw")]
+    analyzed_ids = [r["id"] for r in store.get_by_status("analyzed")]
+    assert record["id"] not in raw_ids
+    assert analyzed_ids == [record["id"]]
+    assert len(store.get_all()) == 5
+
+
+def test_update_after_in_place_mutation_of_collected_at(store):
+    record = store.get_by_status("raw", limit=1)[0]
+    record["collected_at"] = "2023-12-31T00:00:00"
+    store.update(record)
+
+    ids = [r["id"] for r in store.get_all()]
+    assert ids.count(record["id"]) == 1
+    assert ids[-1] == record["id"]
+
+
+def test_stats_consistent_after_update(store, tmp_path):
+    for record in store.get_by_status("raw", limit=2):
+        record["status"] = "analyzed"
+        store.update(record)
+
+    stats = store.stats()
+    assert stats == {"total": 5, "raw": 3, "analyzed": 2}
+    # Sama dengan store yang dibangun ulang dari disk
+    assert JSONStore(news_dir=tmp_path).stats() == stats
+
+
+def test_load_rereads_file_rewritten_by_other_process(store, tmp_path):
+    record = store.get_by_status("raw")[0]
+    # Proses lain (CLI analyze) menulis ulang file tanpa menyentuh index ini
+    other = JSONStore(news_dir=tmp_path)
+    rewritten = {k: v for k, v in other.get_by_id(record["id"]).items() if not k.startswith("_")}
+    rewritten.update(status="analyzed", analysis={"summary": "ok"})
+    write_json(Path(record["_filepath"]), rewritten, pretty=False)
+
+    fresh = JSONStore(news_dir=tmp_path)
+    assert fresh.get_by_id(record["id"])["status"] == "analyzed"
+    assert fresh.stats() == {"total": 5, "raw": 4, "analyzed": 1}
+
+
+def test_load_picks_up_file_missing_from_index(store, tmp_path):
+    # Crash di antara tulis file berita dan append index
+    rec = _record(0, url="https://example.com/lain", id="deadbeef")
+    rec["title"] = "Saham energi reli di akhir sesi"
+    write_json(tmp_path / "deadbeef_crash.json", rec, pretty=False)
+
+    fresh = JSONStore(news_dir=tmp_path)
+    assert fresh.get_by_id("deadbeef")["title"] == rec["title"]
+    assert fresh.count() == 6
+
+
+def test_concurrent_save_and_update_keep_indexes_consistent(store, tmp_path):
+    def collect(worker):
+        for i in range(20):
+            store.save({
+                "url": f"https://example.com/w{worker}/{i}",
+                "title": f"{worker}-{i} " + "xyz"[worker % 3] * (i + 5) + f" kode{worker * 100 + i}",
+                "collected_at": f"2024-01-02T00:{worker:02d}:{i:02d}",
+                "status": "raw",
+            })
+
+    def analyze():
+        for _ in range(20):
+            for record in store.get_by_status("raw", limit=3):
+                record["status"] = "analyzed"
+                store.update(record)
+
+    threads = [threading.Thread(target=collect, args=(w,)) for w in range(4)]
+    threads += [threading.Thread(target=analyze) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = store.stats()
+    assert stats["total"] == len(store.get_all()) == store.count()
+    assert stats == JSONStore(news_dir=tmp_path).stats()
@@ -0,0 +1,63 @@
+"""
+Test TitleIndex — recall cek redundan harus sama dengan scan exact
+"""
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from helpers import TitleIndex, find_similar_title
+
+_WORDS = (
+    "saham bank laba rupiah dolar dividen emiten ihsg naik turun melemah menguat "
+    "investor asing net buy sell kuartal tahun bersih harga minyak batu bara "
+    "nikel ekspor impor suku bunga inflasi obligasi ipo right issue akuisisi"
+).split()
+
+
+def _corpus(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(_WORDS) for _ in range(rng.randint(4, 10))) for _ in range(n)]
+
+
+def _perturb(title: str, rng: random.Random) -> str:
+    words = title.split()
+    op = rng.randrange(4)
+    if op == 0 and len(words) > 1:
+        words.pop(rng.randrange(len(words)))
+    elif op == 1:
+        words.insert(rng.randrange(len(words) + 1), rng.choice(_WORDS))
+    elif op == 2:
+        i = rng.randrange(len(words))
+        words[i] = words[i][::-1]
+    else:
+        rng.shuffle(words)
+    return " ".join(words).upper() if rng.random() < 0.2 else " ".join(words)
+
+
+def test_find_recall_matches_exact_scan():
+    pytest.importorskip("datasketch")
+    stored = _corpus(300)
+    index = TitleIndex(stored)
+    titles_lower = [t.lower() for t in stored]
+
+    rng = random.Random(11)
+    queries = [_perturb(rng.choice(stored), rng) for _ in range(300)] + _corpus(100, seed=99)
+
+    expected = [find_similar_title(q, titles_lower) is not None for q in queries]
+    found = [index.find(q) is not None for q in queries]
+    hits = sum(e and f for e, f in zip(expected, found))
+    assert sum(expected) > 0
+    assert hits / sum(expected) == 1.0
+    assert found == expected
+
+
+def test_find_returns_matching_title():
+    index = TitleIndex(["BBCA catat laba bersih naik 12 persen"])
+    idx = index.find("bbca catat laba bersih naik 12%")
+    assert idx == 0
+    assert index.find("Harga minyak dunia melemah") is None